@@ -2,6 +2,8 @@
 from .models import Module
 from ..deployments.models import Instance
 from ..hosts.models import DockerHost
+from core.utils.counters import get_counter, user_counter
+from core.utils.permissions_check import get_capabilities
 
 
 def global_user_context(request):
@@ -19,26 +21,25 @@ def global_user_context(request):
             "can_deploy": False,
         }
 
-    is_admin = user.is_superuser
-    is_editor = user.groups.filter(name="editor").exists()
-    is_user = user.groups.filter(name="user").exists()
+    capabilities = get_capabilities(user)
 
-    user_instances_count = Instance.objects.filter(owner=user).count()
-    all_instances_count = Instance.objects.count()
-    all_modules_count = Module.objects.count()
-    can_deploy = is_admin or is_editor or is_user
+    user_instances_count = get_counter(
+        user_counter(user.pk), Instance.objects.filter(owner=user).count
+    )
+    all_instances_count = get_counter("instances", Instance.objects.count)
+    all_modules_count = get_counter("modules", Module.objects.count)
 
     return {
-        "is_admin": is_admin,
-        "is_editor": is_editor,
-        "is_user": is_user,
+        "is_admin": capabilities.is_admin,
+        "is_editor": capabilities.is_editor,
+        "is_user": capabilities.is_user,
         "user_instances_count": user_instances_count,
         "all_instances_count": all_instances_count,
         "all_modules_count": all_modules_count,
-        "can_deploy": can_deploy,
+        "can_deploy": capabilities.can_deploy,
     }
 
 
 def global_host_context(self):
-    active = DockerHost.objects.filter(active=True).first()
-    return {"active_host": active}
+    # Templates call it, so only pages showing the host run the query.
+    return {"active_host": DockerHost.objects.filter(active=True).first}
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_delete_instance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="module",
+            name="idle_timeout",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Minutes without activity before instances are paused, 0 to never pause them; empty uses IDLE_SUSPEND_AFTER",
+                null=True,
+            ),
+        ),
+    ]
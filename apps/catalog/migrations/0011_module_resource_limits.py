@@ -0,0 +1,51 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_module_idle_timeout"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="module",
+            name="blkio_weight",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Relative block I/O weight between 10 and 1000",
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(10),
+                    django.core.validators.MaxValueValidator(1000),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="cpu_limit",
+            field=models.FloatField(
+                blank=True,
+                help_text="CPU limit in cores, e.g. 0.5",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(0.01)],
+            ),
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="memory_limit",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Memory limit in MiB, e.g. 512", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="pids_limit",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Maximum number of processes, e.g. 256", null=True
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 
 from django.contrib.auth.models import User
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils.text import slugify
 
@@ -41,6 +42,32 @@ class Module(models.Model):
     )
     module_image = models.ImageField(upload_to="images/", blank=True)
 
+    # Default resource limits of instances, empty for no limit
+    memory_limit = models.PositiveIntegerField(
+        blank=True, null=True, help_text="Memory limit in MiB, e.g. 512"
+    )
+    cpu_limit = models.FloatField(
+        blank=True,
+        null=True,
+        validators=[MinValueValidator(0.01)],
+        help_text="CPU limit in cores, e.g. 0.5",
+    )
+    pids_limit = models.PositiveIntegerField(
+        blank=True, null=True, help_text="Maximum number of processes, e.g. 256"
+    )
+    blkio_weight = models.PositiveSmallIntegerField(
+        blank=True,
+        null=True,
+        validators=[MinValueValidator(10), MaxValueValidator(1000)],
+        help_text="Relative block I/O weight between 10 and 1000",
+    )
+    idle_timeout = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text="Minutes without activity before instances are paused, "
+        "0 to never pause them; empty uses IDLE_SUSPEND_AFTER",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
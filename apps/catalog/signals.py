@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.catalog.models import Module
+from apps.deployments.jobs import enqueue_job
+from apps.deployments.models import Job
+from apps.hosts.models import DockerHost
+from core.utils.counters import adjust_counter
+
+
+@receiver(pre_save, sender=Module)
+def remember_image_name(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._previous_image_name = None
+    if update_fields is not None and "image_name" not in update_fields:
+        return
+    if not raw and instance.pk:
+        instance._previous_image_name = (
+            Module.objects.filter(pk=instance.pk)
+            .values_list("image_name", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Module)
+def warm_module_image(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Pre-pull the image of a new module, or a module whose image changed, so
+    its first deploy starts fast. Hosts already warming it are skipped.
+    """
+    if raw or instance.image_name == instance._previous_image_name:
+        return
+    if update_fields is not None and "image_name" not in update_fields:
+        return
+
+    warming = set(
+        Job.objects.filter(
+            action="warm",
+            image_name=instance.image_name,
+            status__in=["queued", "running"],
+        ).values_list("host_id", flat=True)
+    )
+    for host in DockerHost.objects.filter(active=True).exclude(pk__in=warming):
+        enqueue_job("warm", host=host, image_name=instance.image_name)
+
+
+@receiver(post_save, sender=Module)
+def count_created_module(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter("modules", 1)
+
+
+@receiver(post_delete, sender=Module)
+def count_deleted_module(sender, instance, **kwargs):
+    adjust_counter("modules", -1)
@@ -1,12 +1,23 @@
 from django.contrib.auth.models import Group, User, AnonymousUser
-from django.test import TestCase, RequestFactory
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
 from apps.catalog.context_processors import global_user_context, global_host_context
 from apps.hosts.models import DockerHost
 
 
+# Counters are cached; keep them out of the shared file cache.
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "context-processor-tests",
+        }
+    }
+)
 class ContextProcessorTestCase(TestCase):
 
     def setUp(self):
+        cache.clear()
         self.factory = RequestFactory()
 
         self.user = User.objects.create_user(username="normalo")
@@ -46,9 +57,10 @@ class ContextProcessorTestCase(TestCase):
         self.assertEqual(result["user_instances_count"], 0)
 
     def test_global_host_context(self):
-        result = global_host_context(self)
-        self.assertIsNone(result["active_host"])
+        with self.assertNumQueries(0):
+            result = global_host_context(self)
+        self.assertIsNone(result["active_host"]())
 
         host = DockerHost.objects.create(name="Server1", active=True)
         result = global_host_context(self)
-        self.assertEqual(result["active_host"], host)
+        self.assertEqual(result["active_host"](), host)
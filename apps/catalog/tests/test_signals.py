@@ -0,0 +1,47 @@
+from django.core import serializers
+from django.test import TestCase
+
+from apps.catalog.models import Module
+from apps.deployments.models import Job
+from apps.hosts.models import DockerHost
+
+
+class WarmModuleImageTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+        self.module = Module.objects.create(name="web", image_name="nginx:1.27")
+
+    def warm_jobs(self):
+        return Job.objects.filter(action="warm")
+
+    def test_new_module_is_warmed_once_per_host(self):
+        self.assertEqual(
+            list(self.warm_jobs().values_list("host", "image_name")),
+            [(self.host.pk, "nginx:1.27")],
+        )
+
+    def test_saving_without_image_change_queues_nothing(self):
+        self.module.description = "Web server"
+        self.module.save()
+
+        self.assertEqual(self.warm_jobs().count(), 1)
+
+    def test_changed_image_is_warmed_unless_already_queued(self):
+        self.module.image_name = "nginx:1.28"
+        self.module.save()
+        self.module.image_name = "nginx:1.27"
+        self.module.save()
+
+        self.assertEqual(
+            sorted(self.warm_jobs().values_list("image_name", flat=True)),
+            ["nginx:1.27", "nginx:1.28"],
+        )
+
+    def test_loaddata_queues_nothing(self):
+        data = serializers.serialize("json", [self.module])
+        self.warm_jobs().delete()
+        for obj in serializers.deserialize("json", data):
+            obj.save()
+
+        self.assertFalse(self.warm_jobs().exists())
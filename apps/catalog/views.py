@@ -3,7 +3,7 @@ from django.shortcuts import render
 from django.views import generic
 from django.views.decorators.http import require_safe
 
-from core.utils.permissions_check import user_can_edit
+from core.utils.permissions_check import get_capabilities, user_can_edit
 from .models import Module
 from django.views.generic.edit import CreateView
 from django.views.generic.edit import UpdateView
@@ -36,10 +36,9 @@ class ModuleDetailView(generic.DetailView):
             context["user_instances"] = self.object.instances.all()
         else:
             context["user_instances"] = []
-        context["can_deploy"] = (
-            self.request.user.groups.filter(name="user").exists()
-            or self.request.user.groups.filter(name="editor").exists()
-        )
+        capabilities = get_capabilities(self.request.user)
+        # Only members of the user or editor group deploy from the catalog.
+        context["can_deploy"] = capabilities.is_user or capabilities.is_editor
         return context
 
 
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from apps.deployments.models import Instance
+from apps.deployments.models import Instance, InstanceStatusChange, Job
 
 # Register your models here.
 admin.site.register(Instance)
+admin.site.register(Job)
+admin.site.register(InstanceStatusChange)
@@ -0,0 +1,212 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.deployments.models import Instance, Job, unique_slug
+from core.docker.capacity import (
+    NoCapacityError,
+    admission_status,
+    requested_resources,
+)
+from core.docker.deploy import (
+    apply_pangolin_labels,
+    deploy_instance,
+    get_image,
+    keep_images_in_budget,
+)
+from core.docker.ports import reserve_ports
+from core.docker.scheduler import pick_host
+from core.utils.budgets import check_budget
+from core.utils.counters import adjust_counter, user_counter
+
+logger = logging.getLogger(__name__)
+
+
+class BatchDeployError(Exception):
+    pass
+
+
+def batch_names(name: str, owner, count: int) -> list[str]:
+    """Instance names of a batch, e.g. workshop-1_alice … workshop-30_alice."""
+    return [f"{name}-{i}_{owner.username}" for i in range(1, count + 1)]
+
+
+def create_batch(module, owner, name: str, count: int, enqueue: bool = True):
+    """
+    Create ``count`` identical instances of ``module`` on one host.
+
+    Names are checked, instances inserted, ports reserved and a batch job
+    queued with one query each, however large the batch. Raises
+    ``BatchDeployError`` if any name is too long or taken,
+    ``BudgetExceededError`` if
+    the batch does not fit into the owner's budgets, and the scheduler's,
+    admission's and port ledger's errors if there is no room for the whole
+    batch. Batches the host cannot take yet are queued as a whole.
+    """
+    if not 1 <= count <= settings.BATCH_DEPLOY_MAX:
+        raise BatchDeployError(
+            f"A batch has between 1 and {settings.BATCH_DEPLOY_MAX} instances"
+        )
+
+    names = batch_names(name, owner, count)
+    max_length = Instance._meta.get_field("name").max_length
+    if len(names[-1]) > max_length:
+        raise BatchDeployError(
+            f"Instance names are limited to {max_length} characters: {names[-1]}"
+        )
+
+    taken = list(
+        Instance.objects.annotate(name_lower=Lower("name"))
+        .filter(name_lower__in=[instance_name.lower() for instance_name in names])
+        .values_list("name", flat=True)
+    )
+    if taken:
+        raise BatchDeployError(f"Names already taken: {', '.join(taken)}")
+
+    slugs = [slugify(instance_name) for instance_name in names]
+    clashing = set(
+        Instance.objects.filter(slug__in=slugs).values_list("slug", flat=True)
+    )
+
+    instances = [
+        Instance.for_module(
+            module,
+            name=instance_name,
+            slug=unique_slug(slug) if slug in clashing else slug,
+            owner=owner,
+        )
+        for instance_name, slug in zip(names, slugs)
+    ]
+
+    with transaction.atomic():
+        check_budget(owner, module, count)
+        requested = requested_resources(module)
+        host = pick_host(requested, count)
+        status = admission_status(host, requested, count)
+        for instance in instances:
+            instance.host = host
+            instance.status = status
+        Instance.objects.bulk_create(instances)
+        if module.container_port:
+            reserve_ports(instances, host)
+        for instance in instances:
+            apply_pangolin_labels(instance, host, False)
+        Instance.objects.bulk_update(
+            instances,
+            [
+                "pangolin_name",
+                "pangolin_resource_domain",
+                "pangolin_protocol",
+                "pangolin_target_protocol",
+                "pangolin_port",
+            ],
+        )
+        if enqueue:
+            enqueue_batch(instances, host)
+
+    # bulk_create sends no post_save signals.
+    adjust_counter("instances", count)
+    adjust_counter(user_counter(owner.pk), count)
+    logger.info(f"Created batch of {count} {module.name} instances on {host}")
+    return instances
+
+
+def enqueue_batch(instances, host) -> Job:
+    """
+    Queue the deployment of a batch as a single job, so it runs with
+    ``BATCH_DEPLOY_PARALLELISM`` instead of the per-host job limit.
+    """
+    return Job.objects.create(
+        action="batch",
+        host=host,
+        payload={"instance_ids": [str(instance.pk) for instance in instances]},
+        progress={"total": len(instances), "done": 0, "failed": {}},
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def run_batch_deploy(job: Job):
+    """
+    Deploy the instances of a batch job that are not deployed yet. Instances
+    still waiting for capacity afterwards defer the job with
+    ``NoCapacityError``, so only they are deployed on the next run.
+    """
+    instances = list(
+        Instance.objects.filter(
+            pk__in=job.payload["instance_ids"], status__in=["queued", "pending"]
+        )
+        .select_related("host")
+        .order_by("created_at", "id")
+    )
+    results = deploy_batch(instances)
+
+    waiting = [result for result in results if result["status"] == "queued"]
+    progress = job.progress
+    progress["done"] += len(results) - len(waiting)
+    progress["failed"].update(
+        {
+            result["name"]: result["error"]
+            for result in results
+            if result["error"] and result["status"] != "queued"
+        }
+    )
+    Job.objects.filter(pk=job.pk).update(progress=progress, updated_at=timezone.now())
+
+    if waiting:
+        raise NoCapacityError(
+            f"{len(waiting)} instances of the batch are waiting for capacity"
+        )
+
+
+def deploy_batch(instances, parallelism: int | None = None) -> list[dict]:
+    """
+    Deploy the instances of a batch in this process, at most ``parallelism``
+    at a time, and report the outcome of each.
+
+    The image is pulled once up front, so the containers only have to start.
+    """
+    parallelism = parallelism or settings.BATCH_DEPLOY_PARALLELISM
+    pulled = False
+    if instances:
+        first = instances[0]
+        pulled = get_image(first.image_name, host=first.host)
+
+    def deploy(instance):
+        started = time.monotonic()
+        try:
+            deploy_instance(instance.id)
+            error = ""
+        except Exception as e:
+            error = str(e)
+        finally:
+            close_old_connections()
+        return error, round(time.monotonic() - started, 2)
+
+    with ThreadPoolExecutor(
+        max_workers=parallelism, thread_name_prefix="batch"
+    ) as pool:
+        outcomes = list(pool.map(deploy, instances))
+    if pulled:
+        keep_images_in_budget(instances[0].host)
+
+    statuses = dict(
+        Instance.objects.filter(
+            pk__in=[instance.pk for instance in instances]
+        ).values_list("pk", "status")
+    )
+    return [
+        {
+            "name": instance.name,
+            "host_port": instance.host_port,
+            "status": statuses.get(instance.pk, "destroyed"),
+            "error": error,
+            "seconds": seconds,
+        }
+        for instance, (error, seconds) in zip(instances, outcomes)
+    ]
@@ -0,0 +1,226 @@
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from docker.errors import NotFound
+
+from apps.deployments.models import Instance, Job
+from core.docker.capacity import (
+    HOLDING_STATUSES,
+    fits,
+    free_resources,
+    requested_resources,
+)
+from core.docker.client import get_docker_client
+from core.docker.deploy import get_instance_host
+from core.utils.permissions_check import user_can_administrate
+
+logger = logging.getLogger(__name__)
+
+# Docker call and resulting instance status of every bulk action. The calls
+# go to the API directly, skipping the inspect of ``containers.get``.
+BULK_ACTIONS = {
+    "pause": (lambda client, name: client.api.stop(name), "paused"),
+    "unpause": (lambda client, name: client.api.start(name), "running"),
+    "destroy": (
+        lambda client, name: client.api.remove_container(name, force=True),
+        None,
+    ),
+}
+
+
+class BulkActionError(Exception):
+    pass
+
+
+def select_instances(user, ids=None, owner="", module="", status="", older_than=None):
+    """
+    Instances a bulk action applies to: the given IDs, or those matching the
+    owner username, module slug, status and minimum age in hours. Users other
+    than admins only ever select their own instances.
+    """
+    if not (ids or owner or module or status or older_than):
+        raise BulkActionError("Select instances by ID or by at least one filter")
+
+    instances = Instance.objects.all()
+    if not user_can_administrate(user):
+        instances = instances.filter(owner=user)
+    elif owner:
+        instances = instances.filter(owner__username=owner)
+
+    if ids:
+        instances = instances.filter(pk__in=ids)
+    if module:
+        instances = instances.filter(module__slug=module)
+    if status:
+        instances = instances.filter(status=status)
+    if older_than:
+        instances = instances.filter(
+            created_at__lt=timezone.now() - timedelta(hours=older_than)
+        )
+    return instances
+
+
+def enqueue_bulk_action(action: str, instances, user) -> Job:
+    """Queue ``action`` for the selected instances as a single job."""
+    if action not in BULK_ACTIONS:
+        raise BulkActionError(f"Unknown action: {action}")
+
+    instance_ids = [str(pk) for pk in instances.values_list("pk", flat=True)]
+    if not instance_ids:
+        raise BulkActionError("No instances selected")
+
+    return Job.objects.create(
+        action="bulk",
+        payload={"action": action, "instance_ids": instance_ids, "user_id": user.pk},
+        progress={"total": len(instance_ids), "done": 0, "failed": {}, "skipped": {}},
+        max_attempts=1,
+    )
+
+
+class BulkActionRun:
+    """
+    Executes a bulk job: Docker calls run concurrently, at most
+    ``concurrency`` at a time, while finished instances are written back
+    in batches at most every ``flush_interval`` seconds, each batch being a
+    single UPDATE (or DELETE) plus the progress of the job.
+
+    Unpausing needs capacity: the selection is admitted per host up front,
+    and instances that do not fit are skipped and listed in the progress.
+    """
+
+    def __init__(self, job: Job, concurrency: int, flush_interval: float = 0.5):
+        self.job = job
+        self.action = job.payload["action"]
+        self.call, self.status = BULK_ACTIONS[self.action]
+        self.concurrency = concurrency
+        self.flush_interval = flush_interval
+        self.progress = {"total": 0, "done": 0, "failed": {}, "skipped": {}}
+        self._succeeded = []
+        self._failed = []
+        self._admitted = set()
+
+    def run(self):
+        instances = list(
+            Instance.objects.filter(
+                pk__in=self.job.payload["instance_ids"]
+            ).select_related("host")
+        )
+        self.progress["total"] = len(instances)
+        if self.action == "unpause":
+            instances = self.admit(instances)
+        last_flush = time.monotonic()
+
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="bulk"
+        ) as pool:
+            futures = {
+                pool.submit(self.execute, instance): instance for instance in instances
+            }
+            for future in as_completed(futures):
+                instance = futures[future]
+                error = future.result()
+                self.progress["done"] += 1
+                if error:
+                    self.progress["failed"][instance.name] = error
+                    self._failed.append(instance)
+                else:
+                    self._succeeded.append(instance)
+
+                if time.monotonic() - last_flush >= self.flush_interval:
+                    self.flush()
+                    last_flush = time.monotonic()
+
+        self.progress["finished"] = True
+        self.flush()
+        logger.info(
+            f"Bulk {self.action} done: {self.progress['done']} instances, "
+            f"{len(self.progress['failed'])} failed, "
+            f"{len(self.progress['skipped'])} skipped"
+        )
+        return self.progress
+
+    def admit(self, instances) -> list[Instance]:
+        """
+        Move the instances that fit on their host to pending, one locked
+        admission per host, and skip the others. Returns the admitted ones
+        along with those that already hold their resources.
+        """
+        by_host = defaultdict(list)
+        admitted = []
+        for instance in instances:
+            if instance.status in HOLDING_STATUSES:
+                admitted.append(instance)
+            else:
+                by_host[get_instance_host(instance)].append(instance)
+
+        for host, group in by_host.items():
+            if host is None:
+                for instance in group:
+                    self.progress["skipped"][instance.name] = "no active Docker host"
+                continue
+
+            with transaction.atomic():
+                free = free_resources(host)
+                fitting = []
+                for instance in group:
+                    requested = requested_resources(instance)
+                    if not fits(free, requested):
+                        reason = f"no capacity left on {host}"
+                        self.progress["skipped"][instance.name] = reason
+                        continue
+                    free = {
+                        resource: free[resource] - requested[resource]
+                        for resource in free
+                    }
+                    fitting.append(instance)
+                Instance.bulk_transition(fitting, "pending", reason="bulk unpause")
+            self._admitted.update(instance.pk for instance in fitting)
+            admitted += fitting
+
+        self.progress["done"] += len(instances) - len(admitted)
+        return admitted
+
+    def execute(self, instance) -> str:
+        """Docker call for one instance; returns the error, if any."""
+        try:
+            client = get_docker_client(get_instance_host(instance))
+            self.call(client, instance.container_id or instance.name)
+        except NotFound:
+            if self.action != "destroy":
+                return "container not found"
+        except Exception as e:
+            logger.warning(f"Bulk {self.action} failed: {instance.name} | {e}")
+            return str(e)
+        finally:
+            close_old_connections()
+        return ""
+
+    def flush(self):
+        succeeded, self._succeeded = self._succeeded, []
+        failed, self._failed = self._failed, []
+        # Admitted instances whose container did not start give their
+        # capacity back.
+        released = [instance for instance in failed if instance.pk in self._admitted]
+        if released:
+            Instance.bulk_transition(released, "paused", reason="bulk unpause failed")
+        if succeeded and self.status:
+            Instance.bulk_transition(
+                succeeded, self.status, reason=f"bulk {self.action}"
+            )
+        elif succeeded:
+            Instance.objects.filter(
+                pk__in=[instance.pk for instance in succeeded]
+            ).delete()
+        Job.objects.filter(pk=self.job.pk).update(
+            progress=self.progress, updated_at=timezone.now()
+        )
+
+
+def run_bulk_action(job: Job):
+    BulkActionRun(job, settings.BULK_ACTION_CONCURRENCY).run()
@@ -1,15 +1,39 @@
 import asyncio
+import codecs
 import json
-import threading
+import logging
+import uuid
+
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 
-from apps.deployments.models import Instance
-from core.docker.client import get_docker_client
-from core.docker.deploy import get_instance_stats
+from apps.deployments.models import Instance, Job
+from apps.deployments.progress_relay import progress_relay
+from apps.deployments.stats_sampler import stats_group_name, stats_sampler
+from apps.deployments.status_hub import status_group_name, status_hub
+from core.docker.aio import get_async_docker_client
+from core.docker.inventory import get_container_inventory
+from core.docker.deploy import DOCKER_TO_INSTANCE_STATUS
+from core.utils.permissions_check import user_can_administrate
+
+logger = logging.getLogger(__name__)
 
 
 class DockerLogConsumer(AsyncWebsocketConsumer):
+    """
+    Follows the logs of a container and sends them in batched frames.
+
+    A bounded queue of stream frames sits between the Docker stream and the
+    socket: frames that do not fit are dropped and reported, in bytes,
+    instead of piling up in memory, and both tasks are cancelled as soon as
+    the client disconnects.
+    """
+
+    queue_size = 1000
+    flush_interval = 0.1
+    flush_bytes = 64 * 1024
+
     async def connect(self):
         user = self.scope["user"]
 
@@ -25,35 +49,61 @@ class DockerLogConsumer(AsyncWebsocketConsumer):
             return
 
         await self.accept()
-        self.keep_running = True
 
-        self.loop = asyncio.get_running_loop()
-        self.thread = threading.Thread(target=self._stream_logs_thread)
-        self.thread.start()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.dropped_bytes = 0
+        self.tasks = [
+            asyncio.create_task(self.read_logs()),
+            asyncio.create_task(self.send_batches()),
+        ]
 
     async def disconnect(self, close_code):
-        self.keep_running = False
+        for task in getattr(self, "tasks", ()):
+            task.cancel()
 
-    def _stream_logs_thread(self):
-        """runs in background and streams logs"""
-        client = get_docker_client()
+    async def read_logs(self):
+        client = get_async_docker_client(self.docker_base_url)
+        # Characters may be split across frames.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
         try:
-            container = client.containers.get(self.container_name)
-            log_stream = container.logs(
-                stream=True, follow=True, stdout=True, stderr=True, tail=50
-            )
-
-            for line in log_stream:
-                if not self.keep_running:
+            async for chunk in client.logs(self.container_name, follow=True, tail=50):
+                text = decoder.decode(chunk)
+                if not text:
+                    continue
+                try:
+                    self.queue.put_nowait(text)
+                except asyncio.QueueFull:
+                    self.dropped_bytes += len(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(f"Log stream failed: {self.container_name}")
+
+    async def send_batches(self):
+        """Flush queued frames every ``flush_interval`` or ``flush_bytes``."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            frames = [await self.queue.get()]
+            size = len(frames[0])
+            deadline = loop.time() + self.flush_interval
+
+            while size < self.flush_bytes:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
                     break
+                try:
+                    frame = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                frames.append(frame)
+                size += len(frame)
 
-                decoded_line = line.decode("utf-8", errors="replace")
+            if self.dropped_bytes:
+                frames.append(f"--- {self.dropped_bytes} bytes dropped ---\n")
+                self.dropped_bytes = 0
 
-                asyncio.run_coroutine_threadsafe(
-                    self.send(text_data=decoded_line), self.loop
-                )
-        except Exception as e:
-            pass
+            await self.send(text_data="".join(frames))
 
 
 class InstanceStatusConsumer(AsyncWebsocketConsumer):
@@ -70,31 +120,112 @@ class InstanceStatusConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
 
+        self.group_name = status_group_name(self.instance_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
-        self.keep_running = True
 
-        self.loop = asyncio.get_running_loop()
-        self.thread = threading.Thread(target=self._stream_status_thread)
-        self.thread.start()
+        status_hub.ensure_started()
+        status = await get_container_status(self.container_name, self.docker_host)
+        if status:
+            await self.send(text_data=status)
 
     async def disconnect(self, close_code):
-        self.keep_running = False
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def status_update(self, event):
+        """Forward a status change published by the status hub."""
+        await self.send(text_data=event["status"])
+
+    async def pull_progress(self, event):
+        """The plain status protocol has no room for pull progress."""
+
+
+class InstanceDashboardConsumer(AsyncWebsocketConsumer):
+    """
+    Streams status for many instances over a single socket.
+
+    The client sends ``{"subscribe": [<instance id>, ...]}``; the consumer
+    answers with a snapshot and afterwards with batched deltas, both shaped
+    as ``{"s": {<instance id>: <status>}}``. While an image is pulled, its
+    progress arrives under ``"p"`` in the same frames.
+    """
+
+    max_subscriptions = 500
+    flush_interval = 0.25
 
-    def _stream_status_thread(self):
-        """runs in background and streams the container status"""
-        client = get_docker_client()
-        status_cache = None
+    async def connect(self):
+        if not self.scope["user"].is_authenticated:
+            await self.close()
+            return
+
+        self.group_names = set()
+        self.instance_ids = set()
+        self.pending = {"s": {}, "p": {}}
+        self.flush_task = None
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if getattr(self, "flush_task", None):
+            self.flush_task.cancel()
+        for group_name in getattr(self, "group_names", ()):
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+        progress_relay.unwatch(getattr(self, "instance_ids", ()))
+
+    async def receive(self, text_data=None, bytes_data=None):
         try:
-            container = client.containers.get(self.container_name)
-            while self.keep_running:
-                status = container.status
-                if status_cache != status:
-                    asyncio.run_coroutine_threadsafe(
-                        self.send(text_data=status), self.loop
-                    )
-                    status_cache = status
-        except Exception as e:
-            pass
+            requested = json.loads(text_data or "{}").get("subscribe", [])
+        except (ValueError, AttributeError):
+            return
+        if not isinstance(requested, list):
+            return
+
+        statuses = await get_visible_statuses(
+            self.scope["user"], requested[: self.max_subscriptions]
+        )
+        # The limit applies to the socket, not to each message.
+        room = max(self.max_subscriptions - len(self.instance_ids), 0)
+        new_ids = set(sorted(set(statuses) - self.instance_ids)[:room])
+        statuses = {
+            instance_id: status
+            for instance_id, status in statuses.items()
+            if instance_id in self.instance_ids or instance_id in new_ids
+        }
+        for instance_id in new_ids:
+            group_name = status_group_name(instance_id)
+            await self.channel_layer.group_add(group_name, self.channel_name)
+            self.group_names.add(group_name)
+        self.instance_ids |= new_ids
+
+        status_hub.ensure_started()
+        progress_relay.watch(
+            new_ids, {instance_id: statuses[instance_id] for instance_id in new_ids}
+        )
+        await self.send_frame({"s": statuses})
+
+    async def status_update(self, event):
+        """Collect a status change and flush it with the next batch."""
+        self.queue_update("s", event["instance_id"], event["status"])
+
+    async def pull_progress(self, event):
+        """Collect pull progress and flush it with the next batch."""
+        self.queue_update("p", event["instance_id"], event["progress"])
+
+    def queue_update(self, kind, instance_id, value):
+        self.pending[kind][instance_id] = value
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        pending, self.pending = self.pending, {"s": {}, "p": {}}
+        self.flush_task = None
+        await self.send_frame(pending)
+
+    async def send_frame(self, frame):
+        frame = {kind: values for kind, values in frame.items() if values}
+        if frame:
+            await self.send(text_data=json.dumps(frame, separators=(",", ":")))
 
 
 class InstanceStatsConsumer(AsyncWebsocketConsumer):
@@ -111,70 +242,123 @@ class InstanceStatsConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
 
+        self.group_name = stats_group_name(self.instance_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
-        self.keep_running = True
 
-        self.loop = asyncio.get_running_loop()
-        self.thread = threading.Thread(target=self._stream_stats_thread)
-        self.thread.start()
+        history = stats_sampler.subscribe(
+            self.instance_id, self.container_name, self.docker_base_url
+        )
+        await self.send(text_data=json.dumps({"history": history}))
 
     async def disconnect(self, close_code):
-        self.keep_running = False
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            stats_sampler.unsubscribe(self.instance_id)
 
-    def _stream_stats_thread(self):
-        client = get_docker_client()
-        try:
-            container = client.containers.get(self.container_name)
-            stats_stream = container.stats(stream=True, decode=True)
+    async def stats_sample(self, event):
+        """Forward a sample published by the shared stats sampler."""
+        await self.send(text_data=json.dumps(event["sample"]))
 
-            for stats in stats_stream:
-                if not self.keep_running:
-                    break
 
-                if "cpu_stats" not in stats or "precpu_stats" not in stats:
-                    continue
+class BulkActionConsumer(AsyncWebsocketConsumer):
+    """
+    Streams the progress of a bulk job to the user who queued it.
 
-                cpu_percent = 0.0
-                cpu_delta = (
-                    stats["cpu_stats"]["cpu_usage"]["total_usage"]
-                    - stats["precpu_stats"]["cpu_usage"]["total_usage"]
-                )
-                system_delta = stats["cpu_stats"].get("system_cpu_usage", 0) - stats[
-                    "precpu_stats"
-                ].get("system_cpu_usage", 0)
+    Bulk jobs run in the worker process and write their progress to the
+    job, which is polled every ``interval`` seconds; changes are sent as
+    JSON frames and the socket closes once the job has finished.
+    """
 
-                if system_delta > 0.0 and cpu_delta > 0.0:
-                    online_cpus = stats["cpu_stats"].get("online_cpus", 1)
-                    cpu_percent = (cpu_delta / system_delta) * online_cpus * 100.0
+    interval = 1.0
 
-                mem_stats = stats.get("memory_stats", {})
-                usage = mem_stats.get("usage", 0)
-                inactive_file = mem_stats.get("stats", {}).get("inactive_file", 0)
-                memory_mib = round((usage - inactive_file) / (1024 * 1024), 2)
+    async def connect(self):
+        user = self.scope["user"]
+        if not user.is_authenticated:
+            await self.close()
+            return
 
-                data = {
-                    "memory_mib": memory_mib,
-                    "cpu_percent": round(cpu_percent, 2),
-                }
+        self.job_id = int(self.scope["url_route"]["kwargs"]["pk"])
+        if await get_bulk_progress(user, self.job_id) is None:
+            await self.close()
+            return
 
-                if self.loop.is_running():
-                    asyncio.run_coroutine_threadsafe(
-                        self.send(text_data=json.dumps(data)), self.loop
-                    )
+        await self.accept()
+        self.task = asyncio.create_task(self.relay_progress())
 
-        except Exception as e:
-            pass
+    async def disconnect(self, close_code):
+        if hasattr(self, "task"):
+            self.task.cancel()
+
+    async def relay_progress(self):
+        sent = None
+        while True:
+            state = await get_bulk_progress(self.scope["user"], self.job_id)
+            if state != sent:
+                sent = state
+                await self.send(text_data=json.dumps(state))
+            if state is None or state["status"] in ("done", "failed"):
+                await self.close()
+                return
+            await asyncio.sleep(self.interval)
 
 
 @database_sync_to_async
 def get_container_id(self, pk):
     try:
 
+        instances = Instance.objects.select_related("host")
         if self.scope["user"].is_superuser:
-            instance = Instance.objects.get(pk=pk)
+            instance = instances.get(pk=pk)
         else:
-            instance = Instance.objects.get(pk=pk, owner=self.scope["user"])
+            instance = instances.get(pk=pk, owner=self.scope["user"])
 
+        # Remember where the container runs for the Docker calls that follow.
+        self.docker_host = instance.host
+        self.docker_base_url = instance.host.base_url if instance.host else None
         return instance.container_id or instance.name
     except Instance.DoesNotExist:
         return None
+
+
+@sync_to_async
+def get_container_status(container_name, host=None):
+    """Current instance status of a container, used as the socket's first frame."""
+    try:
+        docker_status = get_container_inventory(host).status(container_name)
+    except Exception:
+        return None
+    if docker_status is None:
+        return None
+    return DOCKER_TO_INSTANCE_STATUS.get(docker_status, "pending")
+
+
+@database_sync_to_async
+def get_visible_statuses(user, instance_ids):
+    """Statuses of the requested instances the user may see, in one query."""
+    valid_ids = []
+    for instance_id in instance_ids:
+        try:
+            valid_ids.append(uuid.UUID(str(instance_id)))
+        except ValueError:
+            continue
+
+    instances = Instance.objects.filter(pk__in=valid_ids)
+    if not user_can_administrate(user):
+        instances = instances.filter(owner=user)
+
+    return {
+        str(instance_id): status
+        for instance_id, status in instances.values_list("id", "status")
+    }
+
+
+@database_sync_to_async
+def get_bulk_progress(user, job_id):
+    """Status and progress of a bulk job, if the user may follow it."""
+    job = Job.objects.filter(pk=job_id, action="bulk").first()
+    if job is None:
+        return None
+    if not user_can_administrate(user) and job.payload.get("user_id") != user.pk:
+        return None
+    return {"status": job.status, "error": job.last_error, **job.progress}
@@ -0,0 +1,126 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Max, Min, Sum
+from django.utils import timezone
+
+from apps.deployments.metrics import MINUTE, RAW, RETENTION
+from apps.deployments.models import Instance, InstanceMetric, InstanceStatusChange, Job
+
+logger = logging.getLogger(__name__)
+
+# Status change reasons of instances paused for inactivity start with this.
+IDLE_REASON = "idle"
+
+
+def idle_timeout(module) -> int:
+    """Minutes of inactivity after which instances of ``module`` are paused."""
+    if module.idle_timeout is None:
+        return settings.IDLE_SUSPEND_AFTER
+    return module.idle_timeout
+
+
+def find_idle_instances(now=None) -> list[tuple[Instance, str]]:
+    """
+    Running instances without activity for their module's idle timeout,
+    with the reason to record.
+
+    An instance counts as idle if its CPU never exceeded IDLE_CPU_PERCENT
+    and its network traffic stayed below IDLE_NETWORK_BYTES_PER_MINUTE
+    throughout the window. Instances whose samples do not cover the whole
+    window, e.g. because they were started or unpaused within it, are left
+    alone. One query per distinct timeout reads the stored metrics.
+    """
+    now = now or timezone.now()
+    by_timeout = defaultdict(dict)
+    for instance in Instance.objects.filter(status="running").select_related(
+        "module", "host"
+    ):
+        minutes = idle_timeout(instance.module)
+        if minutes:
+            by_timeout[minutes][instance.pk] = instance
+
+    idle = []
+    for minutes, instances in by_timeout.items():
+        since = now - timedelta(minutes=minutes)
+        resolution = RAW if minutes * 60 <= RETENTION[RAW] else MINUTE
+        # Samples start up to one interval (or bucket) after the window does.
+        slack = timedelta(seconds=2 * max(settings.METRICS_INTERVAL, resolution))
+
+        changed = set(
+            InstanceStatusChange.objects.filter(
+                instance__in=instances, changed_at__gte=since
+            ).values_list("instance_id", flat=True)
+        )
+        activity = (
+            InstanceMetric.objects.filter(
+                instance__in=instances, resolution=resolution, timestamp__gte=since
+            )
+            .values("instance")
+            .annotate(
+                first=Min("timestamp"),
+                cpu=Max("cpu_percent"),
+                network=Sum(F("net_rx_bytes") + F("net_tx_bytes")),
+            )
+            .order_by()
+        )
+        for row in activity:
+            if row["instance"] in changed or row["first"] > since + slack:
+                continue
+            if (
+                row["cpu"] < settings.IDLE_CPU_PERCENT
+                and row["network"] < settings.IDLE_NETWORK_BYTES_PER_MINUTE * minutes
+            ):
+                reason = (
+                    f"{IDLE_REASON} for {minutes} min: peak CPU {row['cpu']:.1f}%, "
+                    f"{row['network'] // 1024} KiB network"
+                )
+                idle.append((instances[row["instance"]], reason))
+    return idle
+
+
+def suspend_idle_instances() -> int:
+    """Queue a pause for every idle instance that has no job pending."""
+    from apps.deployments.jobs import enqueue_job
+
+    idle = find_idle_instances()
+    pending = set(
+        Job.objects.filter(
+            instance_id__in=[instance.pk for instance, _ in idle],
+            status__in=["queued", "running"],
+        ).values_list("instance_id", flat=True)
+    )
+
+    suspended = 0
+    for instance, reason in idle:
+        if instance.pk in pending:
+            continue
+        enqueue_job(
+            "pause", instance.pk, host=instance.host, payload={"reason": reason}
+        )
+        logger.info(f"Suspending {instance.name}: {reason}")
+        suspended += 1
+    return suspended
+
+
+def is_idle_suspended(instance: Instance) -> bool:
+    """Whether the instance was last paused for inactivity."""
+    if instance.status != "paused":
+        return False
+    last_change = instance.status_changes.order_by("-changed_at").first()
+    return last_change is not None and last_change.reason.startswith(IDLE_REASON)
+
+
+def wake_instance(instance: Instance) -> bool:
+    """Queue an unpause of an instance suspended for inactivity."""
+    from apps.deployments.jobs import enqueue_job
+
+    if not is_idle_suspended(instance):
+        return False
+    if not Job.objects.filter(
+        instance_id=instance.pk, action="unpause", status__in=["queued", "running"]
+    ).exists():
+        enqueue_job("unpause", instance.pk, host=instance.host)
+    return True
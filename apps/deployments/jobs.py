@@ -0,0 +1,222 @@
+import logging
+import socket
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from apps.deployments.batch import run_batch_deploy
+from apps.deployments.bulk import run_bulk_action
+from apps.deployments.idle import suspend_idle_instances
+from apps.deployments.models import Instance, Job
+from apps.hosts.models import DockerHost
+from core.docker.capacity import NoCapacityError
+from core.docker.deploy import (
+    deploy_instance,
+    destroy_instance,
+    pause_instance,
+    unpause_instance,
+)
+from core.docker.ports import reconcile_ports
+from core.docker.warmup import schedule_image_warmup, warm_image
+
+logger = logging.getLogger(__name__)
+
+
+def _deploy(job):
+    # A previous attempt may have left a half-started container behind, and
+    # the instance only fails once no attempts are left.
+    deploy_instance(
+        job.instance_id,
+        replace_existing=job.attempts > 1,
+        retry=job.attempts < job.max_attempts,
+    )
+
+
+JOB_HANDLERS = {
+    "deploy": _deploy,
+    "pause": lambda job: pause_instance(job.instance_id, **job.payload),
+    "unpause": lambda job: unpause_instance(job.instance_id),
+    "destroy": lambda job: destroy_instance(job.instance_id),
+    "warm": lambda job: warm_image(job.image_name, job.host),
+    "bulk": run_bulk_action,
+    "batch": run_batch_deploy,
+}
+
+
+def enqueue_job(
+    action: str, instance_id=None, host=None, image_name="", payload=None
+) -> Job:
+    """
+    Queue a lifecycle action; it runs as soon as a worker is free. Jobs of
+    an instance run against the host it was placed on. ``payload`` holds
+    extra arguments of the handler.
+    """
+    host_id = host.pk if host else None
+    if host_id is None and instance_id is not None:
+        host_id = (
+            Instance.objects.filter(id=instance_id)
+            .values_list("host", flat=True)
+            .first()
+        )
+    if host_id is None:
+        host_id = (
+            DockerHost.objects.filter(active=True).values_list("pk", flat=True).first()
+        )
+    return Job.objects.create(
+        action=action,
+        instance_id=instance_id,
+        image_name=image_name,
+        payload=payload or {},
+        host_id=host_id,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim_job(worker_name: str, per_host_limit: int) -> Job | None:
+    """
+    Take the next due job whose host is below its concurrency limit.
+
+    Claiming is a conditional UPDATE, so concurrent workers never run the
+    same job, without needing row locks.
+    """
+    now = timezone.now()
+    busy_hosts = Counter(
+        dict(
+            Job.objects.filter(status="running")
+            .values_list("host_id")
+            .annotate(running=Count("id"))
+            .order_by()
+        )
+    )
+
+    for job in Job.objects.filter(status="queued", run_after__lte=now)[:20]:
+        if job.host_id and busy_hosts[job.host_id] >= per_host_limit:
+            continue
+
+        claimed = Job.objects.filter(pk=job.pk, status="queued").update(
+            status="running",
+            locked_by=worker_name,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run_job(job: Job):
+    """Execute a claimed job and reschedule it with backoff if it fails."""
+    close_old_connections()
+    try:
+        JOB_HANDLERS[job.action](job)
+        Job.objects.filter(pk=job.pk).update(
+            status="done", last_error="", updated_at=timezone.now()
+        )
+        logger.info(f"Job done: {job}")
+    except NoCapacityError as e:
+        # Waiting for capacity is not a failed attempt.
+        logger.info(f"Job deferred: {job} | {e}")
+        Job.objects.filter(pk=job.pk).update(
+            status="queued",
+            attempts=F("attempts") - 1,
+            run_after=timezone.now()
+            + timedelta(seconds=settings.ADMISSION_RETRY_INTERVAL),
+            last_error=str(e),
+            updated_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.exception(f"Job failed: {job}")
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status="queued",
+                run_after=timezone.now() + timedelta(seconds=delay),
+                last_error=str(e),
+                updated_at=timezone.now(),
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status="failed", last_error=str(e), updated_at=timezone.now()
+            )
+    finally:
+        close_old_connections()
+
+
+def requeue_interrupted_jobs(worker_name: str, stale_after: int) -> int:
+    """
+    Put jobs back into the queue whose worker went away mid-run: those left
+    behind by this worker's previous run and those locked for too long.
+    """
+    stale = timezone.now() - timedelta(seconds=stale_after)
+    return Job.objects.filter(
+        Q(locked_by=worker_name) | Q(locked_at__lt=stale), status="running"
+    ).update(status="queued", locked_by="", locked_at=None)
+
+
+class Worker:
+    """
+    Runs queued jobs on a bounded thread pool.
+
+    Between jobs the worker also triggers housekeeping tasks, each at its
+    own interval in seconds.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        per_host_limit: int,
+        name: str | None = None,
+        poll_interval: float = 1.0,
+    ):
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.name = name or socket.gethostname()
+        self.poll_interval = poll_interval
+        self.periodic_tasks = [
+            (settings.IMAGE_WARMUP_INTERVAL, schedule_image_warmup),
+            (settings.PORT_RECONCILE_INTERVAL, reconcile_ports),
+            (settings.IDLE_CHECK_INTERVAL, suspend_idle_instances),
+        ]
+        self._next_runs = {}
+
+    def run_periodic_tasks(self):
+        now = time.monotonic()
+        for interval, task in self.periodic_tasks:
+            if not interval or self._next_runs.get(task, 0) > now:
+                continue
+            self._next_runs[task] = now + interval
+            try:
+                task()
+            except Exception:
+                logger.exception(f"Periodic task failed: {task.__name__}")
+
+    def run(self):
+        requeued = requeue_interrupted_jobs(self.name, settings.JOB_STALE_AFTER)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted jobs")
+
+        running = set()
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="job"
+        ) as pool:
+            while True:
+                self.run_periodic_tasks()
+                running = {future for future in running if not future.done()}
+                job = None
+                if len(running) < self.concurrency:
+                    close_old_connections()
+                    job = claim_job(self.name, self.per_host_limit)
+
+                if job is None:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                logger.info(f"Running job: {job}")
+                running.add(pool.submit(run_job, job))
@@ -0,0 +1,90 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.models import Module
+from apps.deployments.batch import BatchDeployError, create_batch, deploy_batch
+from core.docker.capacity import NoCapacityError
+from core.docker.ports import NoFreePortError
+from core.docker.scheduler import NoHostAvailableError
+from core.utils.budgets import BudgetExceededError
+
+
+class Command(BaseCommand):
+    help = "Deploy many identical instances of a module at once, e.g. for a workshop."
+
+    def add_arguments(self, parser):
+        parser.add_argument("module", help="Slug of the module to deploy.")
+        parser.add_argument("count", type=int, help="Number of instances.")
+        parser.add_argument(
+            "--name",
+            required=True,
+            help="Instances are named <name>-<n>_<owner>.",
+        )
+        parser.add_argument(
+            "--owner", required=True, help="Username owning the instances."
+        )
+        parser.add_argument(
+            "--parallel",
+            type=int,
+            default=settings.BATCH_DEPLOY_PARALLELISM,
+            help="Number of containers started at a time.",
+        )
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Leave the deployments to manage.py worker instead of waiting.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            module = Module.objects.get(slug=options["module"])
+            owner = User.objects.get(username=options["owner"])
+        except (Module.DoesNotExist, User.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        started = time.monotonic()
+        try:
+            instances = create_batch(
+                module,
+                owner,
+                options["name"],
+                options["count"],
+                enqueue=options["queue"],
+            )
+        except (
+            BatchDeployError,
+            BudgetExceededError,
+            NoCapacityError,
+            NoHostAvailableError,
+            NoFreePortError,
+        ) as e:
+            raise CommandError(str(e))
+
+        if options["queue"]:
+            for instance in instances:
+                self.stdout.write(f"queued   {instance.name} :{instance.host_port}")
+            return
+
+        try:
+            results = deploy_batch(instances, options["parallel"])
+        except Exception as e:
+            # The image is pulled once for the whole batch before any start.
+            raise CommandError(f"Could not pull {module.image_name}: {e}")
+        for result in results:
+            line = (
+                f"{result['status']:<8} {result['name']} :{result['host_port']} "
+                f"({result['seconds']}s) {result['error']}"
+            )
+            style = self.style.ERROR if result["error"] else self.style.SUCCESS
+            self.stdout.write(style(line.rstrip()))
+
+        failed = sum(bool(result["error"]) for result in results)
+        self.stdout.write(
+            f"{len(results) - failed}/{len(results)} deployed "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+        if failed:
+            raise CommandError(f"{failed} deployments failed")
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.deployments.metrics import run_collector
+
+
+class Command(BaseCommand):
+    help = (
+        "Continuously sample CPU, memory, network and block I/O of running instances."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.METRICS_INTERVAL,
+            help="Seconds between two samples of an instance.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.METRICS_WORKERS,
+            help="Number of parallel Docker stats requests.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Collecting metrics every {options['interval']}s "
+            f"with {options['workers']} workers"
+        )
+        run_collector(interval=options["interval"], workers=options["workers"])
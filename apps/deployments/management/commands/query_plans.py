@@ -0,0 +1,206 @@
+import re
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance, InstanceMetric, Job
+
+# Plan fragments naming the index a lookup is answered from. On SQLite only
+# a SEARCH uses the index to find rows; a SCAN ... USING INDEX reads all of
+# it, which is only cheap for pages taken in index order.
+INDEX_SEARCH = {
+    "postgresql": re.compile(
+        r"Index (?:Only )?Scan (?:Backward )?using (\S+)|Bitmap Index Scan on (\S+)"
+    ),
+    "sqlite": re.compile(
+        r"SEARCH \S+ USING (?:COVERING )?INDEX (\S+)"
+        r"|SEARCH \S+ USING (INTEGER PRIMARY KEY)"
+    ),
+}
+INDEX_WALK = {
+    "postgresql": INDEX_SEARCH["postgresql"],
+    "sqlite": re.compile(r"SCAN \S+ USING (?:COVERING )?INDEX (\S+)"),
+}
+
+# Share of sample instances per status; live ones are a small minority.
+SAMPLE_STATUSES = ["running"] + ["paused"] * 4 + ["exited"] * 5 + ["destroyed"] * 10
+
+
+def hot_queries():
+    """
+    The lookups the app runs most, with placeholder values: name, queryset,
+    the index expected to answer it (None for any) and whether it is a page
+    read in index order.
+    """
+    now = timezone.now()
+    return [
+        (
+            "instance list page",
+            Instance.objects.order_by("-created_at", "-id")[:13],
+            "instance_list_order",
+            True,
+        ),
+        (
+            "instance list page of an owner",
+            Instance.objects.filter(owner_id=0).order_by("-created_at", "-id")[:13],
+            "instance_owner_order",
+            True,
+        ),
+        ("instance by slug", Instance.objects.filter(slug="web"), None, False),
+        (
+            "instance name check",
+            Instance.objects.annotate(name_lower=Lower("name")).filter(
+                name_lower="web"
+            ),
+            "unique_instance_name",
+            False,
+        ),
+        (
+            "running instances",
+            Instance.objects.filter(status="running"),
+            "instance_live_status",
+            False,
+        ),
+        (
+            "metrics of an instance",
+            InstanceMetric.objects.filter(
+                instance_id=uuid.uuid4(),
+                resolution=InstanceMetric.RESOLUTION_RAW,
+                timestamp__gte=now,
+            ),
+            "instance_metric_lookup",
+            False,
+        ),
+        (
+            "due jobs",
+            Job.objects.filter(status="queued", run_after__lte=now),
+            "job_queue_lookup",
+            False,
+        ),
+    ]
+
+
+def add_sample_rows(count: int):
+    """
+    Insert ``count`` instances, metrics and jobs shaped like production
+    data and refresh the planner statistics. Call it in a transaction that
+    is rolled back afterwards.
+    """
+    tag = uuid.uuid4().hex[:8]
+    owners = User.objects.bulk_create(
+        User(username=f"query-plans-{tag}-{i}") for i in range(max(count // 20, 1))
+    )
+    module = Module.objects.bulk_create(
+        [
+            Module(
+                name=f"query-plans-{tag}",
+                slug=f"query-plans-{tag}",
+                image_name="query-plans:sample",
+            )
+        ]
+    )[0]
+    instances = Instance.objects.bulk_create(
+        Instance(
+            name=f"plans-{tag}-{i}",
+            slug=f"plans-{tag}-{i}",
+            owner=owners[i % len(owners)],
+            module=module,
+            status=SAMPLE_STATUSES[i % len(SAMPLE_STATUSES)],
+        )
+        for i in range(count)
+    )
+
+    now = timezone.now()
+    InstanceMetric.objects.bulk_create(
+        InstanceMetric(
+            instance=instances[i % count],
+            resolution=InstanceMetric.RESOLUTION_RAW,
+            timestamp=now - timedelta(seconds=i),
+            cpu_percent=0,
+            memory_mib=0,
+        )
+        for i in range(count)
+    )
+    Job.objects.bulk_create(
+        Job(
+            action="deploy",
+            instance_id=instances[i % count].pk,
+            status="queued" if i % 50 == 0 else "done",
+            run_after=now - timedelta(seconds=i),
+        )
+        for i in range(count)
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the query plans of the hottest lookups and whether they use the "
+        "index meant for them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sample-rows",
+            type=int,
+            default=10000,
+            help=(
+                "Plan against this many extra instances, metrics and jobs, "
+                "inserted for the run and rolled back (0 plans against the "
+                "tables as they are)."
+            ),
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Fail if any lookup is not answered from its index.",
+        )
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the full plan of every lookup.",
+        )
+
+    def handle(self, *args, **options):
+        search = INDEX_SEARCH.get(connection.vendor)
+        if search is None:
+            raise CommandError(f"Unsupported database: {connection.vendor}")
+        walk = INDEX_WALK[connection.vendor]
+
+        missing = []
+        with transaction.atomic():
+            if options["sample_rows"] > 0:
+                add_sample_rows(options["sample_rows"])
+
+            for name, queryset, expected, ordered in hot_queries():
+                plan = queryset.explain()
+                found = search.search(plan) or (ordered and walk.search(plan))
+                index = next(filter(None, found.groups()), None) if found else None
+                uses_index = index is not None and expected in (None, index)
+                if not uses_index:
+                    missing.append(name)
+
+                status = (
+                    self.style.SUCCESS("index")
+                    if uses_index
+                    else self.style.ERROR("scan ")
+                )
+                detail = f"{index or 'no index'}"
+                if expected and index != expected:
+                    detail += f", expected {expected}"
+                self.stdout.write(f"{status}  {name} ({detail})")
+                if options["verbose_plans"] or not uses_index:
+                    self.stdout.write(f"       {plan}".replace("\n", "\n       "))
+
+            transaction.set_rollback(True)
+
+        if missing and options["strict"]:
+            raise CommandError(f"Lookups without their index: {', '.join(missing)}")
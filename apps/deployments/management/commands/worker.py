@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.deployments.jobs import Worker
+from apps.deployments.reconciler import StatusReconciler
+
+
+class Command(BaseCommand):
+    help = "Run queued jobs and keep instance statuses in sync with Docker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.WORKER_CONCURRENCY,
+            help="Number of jobs run at the same time.",
+        )
+        parser.add_argument(
+            "--per-host-limit",
+            type=int,
+            default=settings.WORKER_PER_HOST_LIMIT,
+            help="Number of jobs run at the same time against one Docker host.",
+        )
+        parser.add_argument(
+            "--name",
+            help="Unique worker name, defaults to the hostname.",
+        )
+        parser.add_argument(
+            "--no-reconcile",
+            action="store_true",
+            help="Do not follow Docker events to keep instance statuses in sync.",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options["concurrency"],
+            per_host_limit=options["per_host_limit"],
+            name=options["name"],
+        )
+        self.stdout.write(
+            f"Worker {worker.name} started with concurrency {worker.concurrency}"
+        )
+        if not options["no_reconcile"]:
+            StatusReconciler().start()
+        worker.run()
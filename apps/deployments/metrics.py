@@ -0,0 +1,213 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import close_old_connections
+from django.db.models import F, Max, Sum
+from django.db.models.functions import TruncHour, TruncMinute
+from django.utils import timezone
+
+from apps.deployments.models import Instance, InstanceMetric
+from core.docker.client import get_docker_client
+from core.docker.stats import calculate_cpu_percent, calculate_memory_mib, io_counters
+
+logger = logging.getLogger(__name__)
+
+RAW = InstanceMetric.RESOLUTION_RAW
+MINUTE = InstanceMetric.RESOLUTION_MINUTE
+HOUR = InstanceMetric.RESOLUTION_HOUR
+
+# How long samples of each resolution are kept, in seconds.
+RETENTION = {
+    RAW: 6 * 3600,
+    MINUTE: 7 * 86400,
+    HOUR: 90 * 86400,
+}
+
+# Source resolution, target resolution and how to truncate into the target.
+ROLLUPS = [
+    (RAW, MINUTE, TruncMinute),
+    (MINUTE, HOUR, TruncHour),
+]
+
+COUNTER_FIELDS = ["net_rx_bytes", "net_tx_bytes", "blk_read_bytes", "blk_write_bytes"]
+
+
+class MetricsCollector:
+    """
+    Samples every running instance and appends one row per instance and tick.
+
+    Stats are read one-shot, without Docker's built-in second reading, and
+    the deltas are computed against the previous tick instead. A whole tick
+    is written with a single bulk insert.
+    """
+
+    def __init__(self, workers: int = 8):
+        self._previous = {}
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="metrics"
+        )
+
+    def _read_stats(self, target):
+        container_name, host = target
+        try:
+            return get_docker_client(host).api.stats(
+                container_name, stream=False, one_shot=True
+            )
+        except Exception as e:
+            logger.warning(f"Reading stats failed: {container_name} | {e}")
+            return None
+
+    def collect(self) -> int:
+        instances = list(
+            Instance.objects.filter(status="running")
+            .select_related("host")
+            .only("id", "name", "host")
+        )
+        now = timezone.now()
+        payloads = self._pool.map(
+            self._read_stats, [(instance.name, instance.host) for instance in instances]
+        )
+
+        previous, self._previous = self._previous, {}
+        rows = []
+        for instance, stats in zip(instances, payloads):
+            instance_id = instance.id
+            if not stats or "cpu_stats" not in stats:
+                continue
+            self._previous[instance_id] = stats
+
+            # The first reading of an instance only serves as the baseline.
+            before = previous.get(instance_id)
+            if before is None:
+                continue
+
+            counters = io_counters(stats)
+            counters_before = io_counters(before)
+            rows.append(
+                InstanceMetric(
+                    instance_id=instance_id,
+                    timestamp=now,
+                    cpu_percent=round(
+                        calculate_cpu_percent(stats["cpu_stats"], before["cpu_stats"]),
+                        2,
+                    ),
+                    memory_mib=calculate_memory_mib(stats),
+                    **{
+                        field: max(counters[field] - counters_before[field], 0)
+                        for field in COUNTER_FIELDS
+                    },
+                )
+            )
+
+        InstanceMetric.objects.bulk_create(rows, batch_size=500)
+        return len(rows)
+
+
+def bucket_start(moment: datetime, resolution: int) -> datetime:
+    seconds = int(moment.timestamp()) // resolution * resolution
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc)
+
+
+def rollup_metrics(now: datetime | None = None):
+    """
+    Fold finished buckets into the next coarser resolution and drop samples
+    that are past their retention.
+    """
+    now = now or timezone.now()
+
+    for source, target, trunc in ROLLUPS:
+        pending = InstanceMetric.objects.filter(
+            resolution=source, timestamp__lt=bucket_start(now, target)
+        )
+        last_bucket = InstanceMetric.objects.filter(resolution=target).aggregate(
+            last=Max("timestamp")
+        )["last"]
+        if last_bucket:
+            pending = pending.filter(
+                timestamp__gte=last_bucket + timedelta(seconds=target)
+            )
+
+        buckets = (
+            pending.annotate(bucket=trunc("timestamp", tzinfo=dt_timezone.utc))
+            .values("instance_id", "bucket")
+            .annotate(
+                total_samples=Sum("samples"),
+                cpu_total=Sum(F("cpu_percent") * F("samples")),
+                memory_total=Sum(F("memory_mib") * F("samples")),
+                **{f"{field}_total": Sum(field) for field in COUNTER_FIELDS},
+            )
+            .order_by()
+        )
+        InstanceMetric.objects.bulk_create(
+            [
+                InstanceMetric(
+                    instance_id=bucket["instance_id"],
+                    resolution=target,
+                    timestamp=bucket["bucket"],
+                    samples=bucket["total_samples"],
+                    cpu_percent=round(bucket["cpu_total"] / bucket["total_samples"], 2),
+                    memory_mib=round(
+                        bucket["memory_total"] / bucket["total_samples"], 2
+                    ),
+                    **{field: bucket[f"{field}_total"] for field in COUNTER_FIELDS},
+                )
+                for bucket in buckets
+            ],
+            batch_size=500,
+        )
+
+    for resolution, seconds in RETENTION.items():
+        InstanceMetric.objects.filter(
+            resolution=resolution, timestamp__lt=now - timedelta(seconds=seconds)
+        ).delete()
+
+
+def query_metrics(
+    instance_id, window: timedelta, resolution: int | None = None
+) -> list[dict]:
+    """
+    Samples of an instance within the last ``window``.
+
+    Without an explicit resolution the finest one that still covers the
+    whole window is used.
+    """
+    if resolution is None:
+        resolution = next(
+            (
+                candidate
+                for candidate, seconds in RETENTION.items()
+                if window.total_seconds() <= seconds
+            ),
+            HOUR,
+        )
+
+    return list(
+        InstanceMetric.objects.filter(
+            instance_id=instance_id,
+            resolution=resolution,
+            timestamp__gte=timezone.now() - window,
+        ).values("timestamp", "cpu_percent", "memory_mib", *COUNTER_FIELDS)
+    )
+
+
+def run_collector(interval: int = 5, workers: int = 8, rollup_interval: int = 60):
+    """Collect metrics every ``interval`` seconds until interrupted."""
+    collector = MetricsCollector(workers=workers)
+    next_rollup = time.monotonic()
+
+    while True:
+        started = time.monotonic()
+        close_old_connections()
+        try:
+            written = collector.collect()
+            logger.debug(f"Stored {written} metric samples")
+
+            if started >= next_rollup:
+                rollup_metrics()
+                next_rollup = started + rollup_interval
+        except Exception:
+            logger.exception("Collecting metrics failed")
+
+        time.sleep(max(interval - (time.monotonic() - started), 0))
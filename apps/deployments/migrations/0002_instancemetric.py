@@ -0,0 +1,60 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InstanceMetric",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.PositiveIntegerField(
+                        choices=[(0, "Raw"), (60, "1 minute"), (3600, "1 hour")],
+                        default=0,
+                    ),
+                ),
+                ("timestamp", models.DateTimeField()),
+                ("samples", models.PositiveIntegerField(default=1)),
+                ("cpu_percent", models.FloatField()),
+                ("memory_mib", models.FloatField()),
+                ("net_rx_bytes", models.BigIntegerField(default=0)),
+                ("net_tx_bytes", models.BigIntegerField(default=0)),
+                ("blk_read_bytes", models.BigIntegerField(default=0)),
+                ("blk_write_bytes", models.BigIntegerField(default=0)),
+                (
+                    "instance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="metrics",
+                        to="deployments.instance",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["timestamp"],
+                "indexes": [
+                    models.Index(
+                        fields=["instance", "resolution", "timestamp"],
+                        name="instance_metric_lookup",
+                    )
+                ],
+            },
+        ),
+    ]
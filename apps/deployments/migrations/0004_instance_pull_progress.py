@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0003_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="instance",
+            name="pull_progress",
+            field=models.JSONField(
+                blank=True,
+                help_text="Progress of the image pull while deploying",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0004_instance_pull_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="image_name",
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("deploy", "Deploy"),
+                    ("pause", "Pause"),
+                    ("unpause", "Unpause"),
+                    ("destroy", "Destroy"),
+                    ("warm", "Warm image"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="instance_id",
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0005_job_image_name_alter_job_action_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InstanceStatusChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "old_status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("paused", "Paused"),
+                            ("exited", "Exited"),
+                            ("stopped", "Stopped"),
+                            ("destroyed", "Destroyed"),
+                            ("failed", "Failed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "new_status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("paused", "Paused"),
+                            ("exited", "Exited"),
+                            ("stopped", "Stopped"),
+                            ("destroyed", "Destroyed"),
+                            ("failed", "Failed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("reason", models.CharField(blank=True, max_length=100)),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "instance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_changes",
+                        to="deployments.instance",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-changed_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["instance", "-changed_at"], name="status_change_lookup"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_default_host(apps, schema_editor):
+    # Until now there was a single Docker host, so existing instances run there.
+    DockerHost = apps.get_model("hosts", "DockerHost")
+    Instance = apps.get_model("deployments", "Instance")
+    host = DockerHost.objects.order_by("-active").first()
+    if host is not None:
+        Instance.objects.filter(host__isnull=True).update(host=host)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0006_instancestatuschange"),
+        ("hosts", "0005_portreservation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="instance",
+            name="host",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Docker host the instance was placed on",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="instances",
+                to="hosts.dockerhost",
+            ),
+        ),
+        migrations.RunPython(assign_default_host, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_delete_instance"),
+        ("deployments", "0007_instance_host"),
+        ("hosts", "0005_portreservation"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="instance",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="instance_list_order"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="instance",
+            index=models.Index(
+                fields=["owner", "-created_at", "-id"], name="instance_owner_order"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:45
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def deduplicate_slugs(apps, schema_editor):
+    # Slugs were not unique so far; suffix repeated ones before enforcing it.
+    Instance = apps.get_model("deployments", "Instance")
+    taken = set()
+    for instance in Instance.objects.order_by("created_at", "id"):
+        base = instance.slug or slugify(instance.name)
+        slug, suffix = base, 2
+        while slug in taken:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        taken.add(slug)
+        if slug != instance.slug:
+            Instance.objects.filter(pk=instance.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_delete_instance"),
+        ("deployments", "0008_instance_list_indexes"),
+        ("hosts", "0005_portreservation"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="instance",
+            name="slug",
+            field=models.SlugField(blank=True, max_length=120, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name="instance",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "running"])),
+                fields=["status"],
+                name="instance_live_status",
+            ),
+        ),
+    ]
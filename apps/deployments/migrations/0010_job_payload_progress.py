@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0009_instance_unique_slug"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="payload",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="progress",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("deploy", "Deploy"),
+                    ("pause", "Pause"),
+                    ("unpause", "Unpause"),
+                    ("destroy", "Destroy"),
+                    ("warm", "Warm image"),
+                    ("bulk", "Bulk action"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0010_job_payload_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="instance",
+            name="blkio_weight",
+            field=models.PositiveSmallIntegerField(
+                blank=True, help_text="Relative block I/O weight", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="instance",
+            name="cpu_limit",
+            field=models.FloatField(
+                blank=True, help_text="CPU limit in cores", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="instance",
+            name="memory_limit",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Memory limit in MiB", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="instance",
+            name="pids_limit",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Maximum number of processes", null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0011_instance_resource_limits"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="instance",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "Queued"),
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("paused", "Paused"),
+                    ("exited", "Exited"),
+                    ("stopped", "Stopped"),
+                    ("destroyed", "Destroyed"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="instancestatuschange",
+            name="new_status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "Queued"),
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("paused", "Paused"),
+                    ("exited", "Exited"),
+                    ("stopped", "Stopped"),
+                    ("destroyed", "Destroyed"),
+                    ("failed", "Failed"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="instancestatuschange",
+            name="old_status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "Queued"),
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("paused", "Paused"),
+                    ("exited", "Exited"),
+                    ("stopped", "Stopped"),
+                    ("destroyed", "Destroyed"),
+                    ("failed", "Failed"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-17 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0012_instance_queued_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="job",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("deploy", "Deploy"),
+                    ("pause", "Pause"),
+                    ("unpause", "Unpause"),
+                    ("destroy", "Destroy"),
+                    ("warm", "Warm image"),
+                    ("bulk", "Bulk action"),
+                    ("batch", "Batch deploy"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
@@ -2,12 +2,33 @@ import uuid
 
 from django.contrib.auth.models import User
 from django.db import models
-from django.db.models import UniqueConstraint
+from django.db.models import Q, UniqueConstraint
 from django.db.models.functions import Lower
+from django.utils import timezone
 from django.utils.text import slugify
 
 from apps.catalog.models import Module
-from core.utils.common import restart_choices, STATUS_CHOICES
+from apps.hosts.models import DockerHost
+from core.utils.common import (
+    JOB_ACTION_CHOICES,
+    JOB_STATUS_CHOICES,
+    restart_choices,
+    STATUS_CHOICES,
+)
+
+
+def unique_slug(slug: str) -> str:
+    """``slug``, or ``slug-2``, ``slug-3``… if instances already use it."""
+    taken = set(
+        Instance.objects.filter(slug__startswith=slug)
+        .order_by()
+        .values_list("slug", flat=True)
+    )
+    candidate, suffix = slug, 2
+    while candidate in taken:
+        candidate = f"{slug}-{suffix}"
+        suffix += 1
+    return candidate
 
 
 class Instance(models.Model):
@@ -19,12 +40,20 @@ class Instance(models.Model):
     name = models.CharField(
         max_length=50, unique=True, help_text="Unique name for the instance"
     )
-    slug = models.SlugField(max_length=120, blank=True)
+    slug = models.SlugField(max_length=120, unique=True, blank=True)
 
     owner = models.ForeignKey(User, on_delete=models.RESTRICT, related_name="instances")
     module = models.ForeignKey(
         Module, on_delete=models.CASCADE, related_name="instances"
     )
+    host = models.ForeignKey(
+        DockerHost,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="instances",
+        help_text="Docker host the instance was placed on",
+    )
     image_name = models.CharField(
         max_length=200,
         help_text="Docker image name, e.g., nginx:latest",
@@ -45,6 +74,16 @@ class Instance(models.Model):
     environment = models.JSONField(
         blank=True, null=True, help_text="Environment variables used"
     )
+    memory_limit = models.PositiveIntegerField(
+        blank=True, null=True, help_text="Memory limit in MiB"
+    )
+    cpu_limit = models.FloatField(blank=True, null=True, help_text="CPU limit in cores")
+    pids_limit = models.PositiveIntegerField(
+        blank=True, null=True, help_text="Maximum number of processes"
+    )
+    blkio_weight = models.PositiveSmallIntegerField(
+        blank=True, null=True, help_text="Relative block I/O weight"
+    )
     default_restart_policy = models.CharField(
         blank=True,
         null=True,
@@ -56,6 +95,9 @@ class Instance(models.Model):
     docker_output = models.JSONField(
         blank=True, null=True, help_text="Docker API output or metadata"
     )
+    pull_progress = models.JSONField(
+        blank=True, null=True, help_text="Progress of the image pull while deploying"
+    )
 
     pangolin_name = models.CharField(max_length=100, blank=True, null=True)
     pangolin_resource_domain = models.URLField(max_length=200, blank=True, null=True)
@@ -75,25 +117,252 @@ class Instance(models.Model):
                 violation_error_message="This instance name is already in use.",
             ),
         ]
+        indexes = [
+            # Keyset pagination of the instance list, overall and per owner.
+            models.Index(fields=["-created_at", "-id"], name="instance_list_order"),
+            models.Index(
+                fields=["owner", "-created_at", "-id"], name="instance_owner_order"
+            ),
+            # Workers and the scheduler only ever look for live instances.
+            models.Index(
+                fields=["status"],
+                condition=Q(status__in=["pending", "running"]),
+                name="instance_live_status",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.module.name})"
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = unique_slug(slugify(self.name))
         super().save(*args, **kwargs)
 
+    @classmethod
+    def for_module(cls, module, **fields):
+        """Unsaved instance with the defaults and resource limits of ``module``."""
+        return cls(
+            module=module,
+            image_name=module.image_name,
+            container_port=module.container_port,
+            environment=module.default_env,
+            default_restart_policy=module.default_restart_policy,
+            memory_limit=module.memory_limit,
+            cpu_limit=module.cpu_limit,
+            pids_limit=module.pids_limit,
+            blkio_weight=module.blkio_weight,
+            **fields,
+        )
+
+    @classmethod
+    def name_taken(cls, name: str) -> bool:
+        """Case-insensitive name check matching the ``Lower("name")`` index."""
+        return (
+            cls.objects.annotate(name_lower=Lower("name"))
+            .filter(name_lower=name.lower())
+            .exists()
+        )
+
+    def container_limits(self) -> dict:
+        """Resource limits as keyword arguments of ``containers.run``."""
+        limits = {
+            "mem_limit": self.memory_limit and self.memory_limit * 1024 * 1024,
+            "nano_cpus": self.cpu_limit and int(self.cpu_limit * 1_000_000_000),
+            "pids_limit": self.pids_limit,
+            "blkio_weight": self.blkio_weight,
+        }
+        return {key: value for key, value in limits.items() if value}
+
     def is_active(self):
         return self.status == "running"
 
+    def transition_status(self, status: str, reason: str = "") -> bool:
+        """
+        Move the instance to ``status`` with a single conditional UPDATE.
+
+        Nothing is written if the instance already has that status, so
+        repeated checks of an unchanged container cost no writes. Every
+        transition is recorded as an ``InstanceStatusChange``. Returns
+        whether the status changed.
+        """
+        if status == self.status:
+            return False
+
+        now = timezone.now()
+        updated = (
+            Instance.objects.filter(pk=self.pk)
+            .exclude(status=status)
+            .update(status=status, updated_at=now)
+        )
+        if not updated:
+            return False
+
+        InstanceStatusChange.objects.create(
+            instance=self,
+            old_status=self.status,
+            new_status=status,
+            reason=reason[:100],
+            changed_at=now,
+        )
+        self.status = status
+        self.updated_at = now
+        return True
+
+    @classmethod
+    def bulk_transition(cls, instances, status: str, reason: str = "") -> int:
+        """
+        ``transition_status`` for many instances: one UPDATE for all that do
+        not have ``status`` yet, and one insert of their status changes.
+        """
+        changed = [instance for instance in instances if instance.status != status]
+        if not changed:
+            return 0
+
+        now = timezone.now()
+        cls.objects.filter(pk__in=[instance.pk for instance in changed]).exclude(
+            status=status
+        ).update(status=status, updated_at=now)
+        InstanceStatusChange.objects.bulk_create(
+            InstanceStatusChange(
+                instance=instance,
+                old_status=instance.status,
+                new_status=status,
+                reason=reason[:100],
+                changed_at=now,
+            )
+            for instance in changed
+        )
+        for instance in changed:
+            instance.status = status
+            instance.updated_at = now
+        return len(changed)
+
     def get_absolute_url(self):
         from django.urls import reverse
 
         return reverse("deployments:instance-detail", args=[self.slug])
 
     def get_local_resource_url(self):
-        return f"127.0.0.1:{self.host_port}"
+        address = self.host.address if self.host else "127.0.0.1"
+        return f"{address}:{self.host_port}"
 
     def get_external_resource_url(self):
         return self.pangolin_resource_domain
+
+
+class InstanceStatusChange(models.Model):
+    """One status transition of an instance, written by ``transition_status``."""
+
+    instance = models.ForeignKey(
+        Instance, on_delete=models.CASCADE, related_name="status_changes"
+    )
+    old_status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    new_status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    reason = models.CharField(max_length=100, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-changed_at"]
+        indexes = [
+            models.Index(
+                fields=["instance", "-changed_at"], name="status_change_lookup"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.instance_id}: {self.old_status} -> {self.new_status}"
+
+
+class InstanceMetric(models.Model):
+    """
+    One resource usage sample of an instance, or a rollup of several.
+
+    Raw samples are written by the metrics collector and later folded into
+    minute and hour buckets. Network and block I/O are the bytes transferred
+    during the sample, so buckets can simply sum them up.
+    """
+
+    RESOLUTION_RAW = 0
+    RESOLUTION_MINUTE = 60
+    RESOLUTION_HOUR = 3600
+    RESOLUTION_CHOICES = [
+        (RESOLUTION_RAW, "Raw"),
+        (RESOLUTION_MINUTE, "1 minute"),
+        (RESOLUTION_HOUR, "1 hour"),
+    ]
+
+    instance = models.ForeignKey(
+        Instance, on_delete=models.CASCADE, related_name="metrics"
+    )
+    resolution = models.PositiveIntegerField(
+        choices=RESOLUTION_CHOICES, default=RESOLUTION_RAW
+    )
+    timestamp = models.DateTimeField()
+    samples = models.PositiveIntegerField(default=1)
+
+    cpu_percent = models.FloatField()
+    memory_mib = models.FloatField()
+    net_rx_bytes = models.BigIntegerField(default=0)
+    net_tx_bytes = models.BigIntegerField(default=0)
+    blk_read_bytes = models.BigIntegerField(default=0)
+    blk_write_bytes = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["timestamp"]
+        indexes = [
+            models.Index(
+                fields=["instance", "resolution", "timestamp"],
+                name="instance_metric_lookup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.instance_id} @ {self.timestamp:%Y-%m-%d %H:%M:%S}"
+
+
+class Job(models.Model):
+    """
+    A queued lifecycle action for an instance, executed by ``manage.py worker``.
+
+    The instance is referenced by ID only, because destroy jobs outlive the
+    instance they delete. Image warm-up jobs carry an image name instead,
+    bulk jobs their action and instance IDs in ``payload`` and batch
+    deployments their instance IDs; their progress is written to
+    ``progress`` for the web process to relay.
+    """
+
+    action = models.CharField(max_length=20, choices=JOB_ACTION_CHOICES)
+    instance_id = models.UUIDField(blank=True, null=True)
+    image_name = models.CharField(max_length=200, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    progress = models.JSONField(default=dict, blank=True)
+    host = models.ForeignKey(
+        DockerHost,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+    )
+
+    status = models.CharField(
+        max_length=20, choices=JOB_STATUS_CHOICES, default="queued"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="job_queue_lookup"),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.instance_id or self.image_name} ({self.status})"
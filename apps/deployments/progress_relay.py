@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from collections import Counter
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+
+from apps.deployments.models import Instance
+from apps.deployments.status_hub import status_group_name
+
+logger = logging.getLogger(__name__)
+
+
+@database_sync_to_async
+def get_relayed_state(instance_ids):
+    """Status and, while pending, pull progress of the instances."""
+    return list(
+        Instance.objects.filter(pk__in=instance_ids).values_list(
+            "id", "status", "pull_progress"
+        )
+    )
+
+
+class PullProgressRelay:
+    """
+    Pushes state written by the worker to open sockets: image pull progress
+    and the statuses the worker sets itself (queued, pending, failed, ...),
+    which never show up in the Docker events the status hub follows.
+
+    The worker is a separate process, so this state reaches the web process
+    through the database. One task polls it for all watched instances at
+    once and publishes changes to the status groups.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._watched = Counter()
+        self._sent = {}
+        self._sent_status = {}
+        self._task = None
+
+    def watch(self, instance_ids, statuses=None):
+        """
+        Start relaying for ``instance_ids``; ``statuses`` are those the
+        socket already knows, e.g. from its snapshot.
+        """
+        self._watched.update(instance_ids)
+        self._sent_status.update(statuses or {})
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+
+    def unwatch(self, instance_ids):
+        self._watched.subtract(instance_ids)
+        for instance_id in instance_ids:
+            if self._watched[instance_id] <= 0:
+                del self._watched[instance_id]
+                self._sent.pop(instance_id, None)
+                self._sent_status.pop(instance_id, None)
+
+    async def _poll(self):
+        channel_layer = get_channel_layer()
+
+        while self._watched:
+            try:
+                for instance_id, status, summary in await get_relayed_state(
+                    list(self._watched)
+                ):
+                    instance_id = str(instance_id)
+                    if self._sent_status.get(instance_id) != status:
+                        self._sent_status[instance_id] = status
+                        await channel_layer.group_send(
+                            status_group_name(instance_id),
+                            {
+                                "type": "status.update",
+                                "instance_id": instance_id,
+                                "status": status,
+                            },
+                        )
+                    if status != "pending" or summary is None:
+                        continue
+                    if self._sent.get(instance_id) == summary:
+                        continue
+                    self._sent[instance_id] = summary
+                    await channel_layer.group_send(
+                        status_group_name(instance_id),
+                        {
+                            "type": "pull.progress",
+                            "instance_id": instance_id,
+                            "progress": summary,
+                        },
+                    )
+            except Exception:
+                logger.exception("Relaying worker state failed")
+
+            await asyncio.sleep(self.interval)
+
+
+progress_relay = PullProgressRelay()
@@ -0,0 +1,129 @@
+import logging
+import threading
+
+from django.db import close_old_connections
+
+from apps.deployments.models import Instance
+from apps.hosts.models import DockerHost
+from core.docker.deploy import DOCKER_TO_INSTANCE_STATUS
+from core.docker.events import (
+    container_event_failure,
+    container_event_status,
+    watch_all_hosts,
+)
+from core.docker.inventory import get_container_inventory
+
+logger = logging.getLogger(__name__)
+
+# Instances paused by Heimwerk have a stopped container, so "exited" is
+# their expected Docker state rather than a transition. The same goes for
+# failed instances, e.g. after an OOM kill.
+EQUIVALENT_STATUSES = {"exited": ["exited", "paused", "failed"]}
+
+# Statuses whose container must exist; pending and failed instances may
+# legitimately have none.
+CONTAINER_STATUSES = ["running", "paused", "exited"]
+
+
+def apply_docker_status(name: str, docker_status: str) -> int:
+    """
+    Set the status of the instance owning container ``name`` from its Docker
+    state. Only writes if the status actually changes; returns the number
+    of updated instances.
+    """
+    status = DOCKER_TO_INSTANCE_STATUS.get(docker_status, "pending")
+    instance = Instance.objects.filter(name=name).only("id", "status").first()
+    if instance is None or instance.status in EQUIVALENT_STATUSES.get(status, []):
+        return 0
+    return int(instance.transition_status(status, reason=f"docker: {docker_status}"))
+
+
+def apply_docker_failure(name: str, reason: str) -> int:
+    """Mark the instance owning container ``name`` as failed, if it is not yet."""
+    instance = Instance.objects.filter(name=name).only("id", "status").first()
+    if instance is None or instance.status == "failed":
+        return 0
+    return int(instance.transition_status("failed", reason=f"docker: {reason}"))
+
+
+class StatusReconciler:
+    """
+    Keeps ``Instance.status`` in line with Docker.
+
+    At startup every instance is compared against one container listing of
+    its host, afterwards status follows the Docker events of every host. Rows are only
+    written on real transitions.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def resync(self) -> int:
+        close_old_connections()
+        hosts = list(DockerHost.objects.filter(active=True))
+        if not hosts:
+            logger.info("Status resync skipped: no active Docker host")
+            return 0
+        changed = sum(self.resync_host(host) for host in hosts)
+        logger.info(f"Status resync updated {changed} instances")
+        return changed
+
+    def resync_host(self, host) -> int:
+        containers = {
+            container["name"]: container["status"]
+            for container in get_container_inventory(host).containers(max_age=0)
+        }
+        instances = Instance.objects.filter(host=host)
+
+        changed = 0
+        names = instances.filter(name__in=containers).values_list("name", flat=True)
+        for name in names:
+            changed += apply_docker_status(name, containers[name])
+
+        missing = (
+            instances.filter(status__in=CONTAINER_STATUSES)
+            .exclude(name__in=containers)
+            .only("id", "status")
+        )
+        for instance in missing:
+            changed += instance.transition_status(
+                "destroyed", reason="container missing"
+            )
+        return changed
+
+    def handle_event(self, host, event):
+        get_container_inventory(host).apply_event(event)
+        failure = container_event_failure(event)
+        if failure is not None:
+            name, _, reason = failure
+            close_old_connections()
+            if apply_docker_failure(name, reason):
+                logger.warning(f"[{name}] Failed: {reason}")
+            return
+
+        parsed = container_event_status(event)
+        if parsed is None:
+            return
+
+        name, _, docker_status = parsed
+        close_old_connections()
+        if apply_docker_status(name, docker_status):
+            logger.info(f"[{name}] Status: {docker_status}")
+
+    def run(self):
+        try:
+            self.resync()
+        except Exception:
+            logger.exception("Status resync failed")
+        watch_all_hosts(self.handle_event, self._stop_event, name="reconciler")
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.run, name="status-reconciler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
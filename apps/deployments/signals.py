@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.deployments.models import Instance
+from core.utils.counters import adjust_counter, user_counter
+
+
+@receiver(post_save, sender=Instance)
+def count_created_instance(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter("instances", 1)
+        adjust_counter(user_counter(instance.owner_id), 1)
+
+
+@receiver(post_delete, sender=Instance)
+def count_deleted_instance(sender, instance, **kwargs):
+    adjust_counter("instances", -1)
+    adjust_counter(user_counter(instance.owner_id), -1)
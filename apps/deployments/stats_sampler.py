@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from channels.layers import get_channel_layer
+
+from core.docker.aio import container_stats, get_async_docker_client
+from core.docker.stats import summarize_stats
+
+logger = logging.getLogger(__name__)
+
+HISTORY_SIZE = 50
+
+
+def stats_group_name(instance_id) -> str:
+    """Channels group that receives stats samples for one instance."""
+    return f"instance.stats.{instance_id}"
+
+
+class ContainerSampler:
+    """Stats stream of one container with a ring buffer of its recent samples."""
+
+    def __init__(
+        self,
+        instance_id,
+        container_name: str,
+        history_size: int,
+        base_url: str | None = None,
+    ):
+        self.instance_id = instance_id
+        self.container_name = container_name
+        self.base_url = base_url
+        self.history = deque(maxlen=history_size)
+        self.subscribers = 0
+        self.task = None
+
+
+class StatsSampler:
+    """
+    Shares one Docker stats stream per container between all its viewers.
+
+    Samplers are reference-counted by subscribers and live on the Daphne
+    event loop; the stream is closed once the last viewer leaves.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE, retry_interval: int = 5):
+        self.history_size = history_size
+        self.retry_interval = retry_interval
+        self._samplers = {}
+
+    def subscribe(
+        self, instance_id, container_name: str, base_url: str | None = None
+    ) -> list[dict]:
+        """Register a viewer and return the samples collected so far."""
+        sampler = self._samplers.get(instance_id)
+        if sampler is None:
+            sampler = ContainerSampler(
+                instance_id, container_name, self.history_size, base_url
+            )
+            sampler.task = asyncio.create_task(self._sample(sampler))
+            self._samplers[instance_id] = sampler
+
+        sampler.subscribers += 1
+        return list(sampler.history)
+
+    def unsubscribe(self, instance_id):
+        sampler = self._samplers.get(instance_id)
+        if sampler is None:
+            return
+
+        sampler.subscribers -= 1
+        if sampler.subscribers <= 0:
+            sampler.task.cancel()
+            del self._samplers[instance_id]
+
+    async def _sample(self, sampler: ContainerSampler):
+        channel_layer = get_channel_layer()
+        group_name = stats_group_name(sampler.instance_id)
+
+        while True:
+            try:
+                client = get_async_docker_client(sampler.base_url)
+                async for stats in container_stats(client, sampler.container_name):
+                    sample = summarize_stats(stats)
+                    if sample is None:
+                        continue
+
+                    sample["ts"] = round(time.time(), 3)
+                    sampler.history.append(sample)
+                    await channel_layer.group_send(
+                        group_name, {"type": "stats.sample", "sample": sample}
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Stats stream failed: {sampler.container_name}")
+
+            # The stream ends when the container stops; pick it up again
+            # once it is back as long as someone is watching.
+            await asyncio.sleep(self.retry_interval)
+
+
+stats_sampler = StatsSampler()
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import threading
+
+from channels.layers import get_channel_layer
+from django.db import close_old_connections
+from django.db.models import Q
+
+from apps.deployments.models import Instance
+from core.docker.deploy import DOCKER_TO_INSTANCE_STATUS
+from core.docker.events import (
+    container_event_failure,
+    container_event_status,
+    watch_all_hosts,
+)
+from core.docker.inventory import get_container_inventory
+
+logger = logging.getLogger(__name__)
+
+
+def status_group_name(instance_id) -> str:
+    """Channels group that receives status updates for one instance."""
+    return f"instance.status.{instance_id}"
+
+
+class StatusHub:
+    """
+    Process-wide subscriber to the Docker events stream.
+
+    One background thread per active Docker host follows ``/events`` and
+    fans container status changes out to the Channels group of the matching
+    instance, so the cost of live status is independent of the number of
+    open sockets. Channel layers are not thread-safe, so the sends are
+    handed to the server's event loop, captured by ``ensure_started``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._instance_ids = {}
+        self._loop = None
+
+    def ensure_started(self):
+        """Start the hub; call it from a consumer, i.e. on the server loop."""
+        with self._lock:
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=watch_all_hosts,
+                args=(self._handle_event, self._stop_event),
+                kwargs={"name": "status-hub"},
+                name="docker-status-hub",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _resolve_instance_id(self, name, container_id):
+        if name in self._instance_ids:
+            return self._instance_ids[name]
+
+        close_old_connections()
+        instance_id = (
+            Instance.objects.filter(Q(name=name) | Q(container_id=container_id))
+            .values_list("id", flat=True)
+            .first()
+        )
+        if instance_id is not None:
+            self._instance_ids[name] = instance_id
+        return instance_id
+
+    def _handle_event(self, host, event):
+        get_container_inventory(host).apply_event(event)
+        parsed = container_event_status(event)
+        if parsed is not None:
+            name, container_id, docker_status = parsed
+            status = DOCKER_TO_INSTANCE_STATUS.get(docker_status, "pending")
+        else:
+            parsed = container_event_failure(event)
+            if parsed is None:
+                return
+            name, container_id, _ = parsed
+            docker_status, status = None, "failed"
+
+        instance_id = self._resolve_instance_id(name, container_id)
+        if instance_id is None:
+            return
+
+        if docker_status == "removing":
+            self._instance_ids.pop(name, None)
+
+        if self._loop is None or self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(
+            get_channel_layer().group_send(
+                status_group_name(instance_id),
+                {
+                    "type": "status.update",
+                    "instance_id": str(instance_id),
+                    "status": status,
+                },
+            ),
+            self._loop,
+        )
+
+
+status_hub = StatusHub()
@@ -0,0 +1,133 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group, User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.catalog.models import Module
+from apps.deployments.batch import (
+    BatchDeployError,
+    create_batch,
+    deploy_batch,
+    run_batch_deploy,
+)
+from apps.deployments.models import Instance, Job
+from apps.hosts.models import DockerHost, PortReservation
+from core.docker.capacity import NoCapacityError
+
+
+@override_settings(HOST_PORT_RANGE_START=50000, HOST_PORT_RANGE_END=50099)
+class BatchDeployTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.alice.groups.add(Group.objects.get(name="user"))
+        self.module = Module.objects.create(
+            name="Nginx", image_name="nginx:1.27", container_port=80
+        )
+        self.client.force_login(self.alice)
+        for patcher in [
+            patch("apps.deployments.batch.pick_host", return_value=self.host),
+            patch(
+                "core.docker.capacity.client_pool.info",
+                return_value={"MemTotal": 64 * 1024**3, "NCPU": 16},
+            ),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_post_creates_instances_ports_and_jobs_in_bulk(self):
+        url = reverse("deployments:deploy-batch", args=[self.module.slug])
+
+        with self.assertNumQueries(19):
+            response = self.client.post(url, {"name": "workshop", "count": 30})
+
+        self.assertEqual(response.status_code, 201)
+        instances = response.json()["instances"]
+        self.assertEqual(len(instances), 30)
+        self.assertEqual(instances[0]["name"], "workshop-1_alice")
+        self.assertEqual(len({instance["host_port"] for instance in instances}), 30)
+        self.assertEqual(PortReservation.objects.filter(host=self.host).count(), 30)
+        job = Job.objects.get(action="batch")
+        self.assertEqual(job.host, self.host)
+        self.assertEqual(
+            job.payload["instance_ids"], [instance["id"] for instance in instances]
+        )
+
+        response = self.client.post(url, {"name": "workshop", "count": 2})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("workshop-1_alice", response.json()["error"])
+
+        response = self.client.get(url, {"name": "workshop", "count": 2})
+        self.assertEqual(
+            [instance["status"] for instance in response.json()["instances"]],
+            ["pending", "pending"],
+        )
+        response = self.client.get(url, {"name": "workshop", "count": -1})
+        self.assertEqual(len(response.json()["instances"]), 1)
+
+    def test_deploy_batch_pulls_once_and_reports_each_instance(self):
+        instances = create_batch(self.module, self.alice, "lab", 3, enqueue=False)
+        failing = instances[1].id
+
+        def deploy(instance_id):
+            if instance_id == failing:
+                raise RuntimeError("port already allocated")
+
+        with (
+            patch("apps.deployments.batch.get_image") as get_image,
+            patch("apps.deployments.batch.deploy_instance", side_effect=deploy),
+        ):
+            results = deploy_batch(instances, parallelism=3)
+
+        get_image.assert_called_once_with("nginx:1.27", host=self.host)
+        self.assertFalse(Job.objects.filter(action="deploy").exists())
+        self.assertEqual(
+            [(result["name"], result["error"]) for result in results],
+            [
+                ("lab-1_alice", ""),
+                ("lab-2_alice", "port already allocated"),
+                ("lab-3_alice", ""),
+            ],
+        )
+        self.assertEqual({result["status"] for result in results}, {"pending"})
+
+    def test_command_reports_a_failed_pull(self):
+        with (
+            patch(
+                "apps.deployments.batch.get_image",
+                side_effect=RuntimeError("manifest unknown"),
+            ),
+            self.assertRaisesMessage(CommandError, "manifest unknown"),
+        ):
+            call_command(
+                "batch_deploy", self.module.slug, "2", name="lab", owner="alice"
+            )
+
+    def test_names_longer_than_the_field_are_rejected(self):
+        with self.assertRaises(BatchDeployError):
+            create_batch(self.module, self.alice, "x" * 45, 10)
+        self.assertFalse(Instance.objects.exists())
+
+    def test_batch_job_defers_instances_waiting_for_capacity(self):
+        create_batch(self.module, self.alice, "lab", 3)
+        job = Job.objects.get(action="batch")
+        results = [
+            {"name": "lab-1_alice", "status": "running", "error": ""},
+            {"name": "lab-2_alice", "status": "failed", "error": "port taken"},
+            {"name": "lab-3_alice", "status": "queued", "error": "Waiting"},
+        ]
+
+        with (
+            patch("apps.deployments.batch.deploy_batch", return_value=results),
+            self.assertRaises(NoCapacityError),
+        ):
+            run_batch_deploy(job)
+
+        job.refresh_from_db()
+        self.assertEqual(
+            job.progress,
+            {"total": 3, "done": 2, "failed": {"lab-2_alice": "port taken"}},
+        )
@@ -0,0 +1,169 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import Group, User
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from docker.errors import NotFound
+
+from apps.catalog.models import Module
+from apps.deployments.bulk import BulkActionRun, enqueue_bulk_action
+from apps.deployments.consumers import BulkActionConsumer
+from apps.deployments.models import Instance, InstanceStatusChange, Job
+from apps.hosts.models import DockerHost
+
+
+class BulkActionTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.alice.groups.add(Group.objects.get(name="user"))
+        bob = User.objects.create_user(username="bob")
+        module = Module.objects.create(name="Nginx", image_name="nginx:1.27")
+        for i, owner in enumerate([self.alice, self.alice, self.alice, bob]):
+            Instance.objects.create(
+                name=f"web{i}",
+                owner=owner,
+                module=module,
+                host=self.host,
+                status="paused" if i == 2 else "running",
+            )
+        self.client.force_login(self.alice)
+
+    def test_view_queues_one_job_for_the_users_matching_instances(self):
+        url = reverse("deployments:bulk-action")
+
+        response = self.client.post(url, {"action": "pause", "status": "running"})
+
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(pk=response.json()["job"])
+        self.assertEqual(job.action, "bulk")
+        self.assertCountEqual(
+            Instance.objects.filter(pk__in=job.payload["instance_ids"]).values_list(
+                "name", flat=True
+            ),
+            ["web0", "web1"],
+        )
+        self.assertEqual(self.client.post(url, {"action": "pause"}).status_code, 400)
+        self.assertEqual(
+            self.client.post(url, {"action": "explode", "module": "nginx"}).status_code,
+            400,
+        )
+
+    def test_run_calls_docker_concurrently_and_writes_back_in_batches(self):
+        instances = Instance.objects.filter(owner=self.alice, status="running")
+        job = enqueue_bulk_action("pause", instances, self.alice)
+        client = MagicMock()
+
+        def stop(name):
+            if name == "web1":
+                raise RuntimeError("timeout")
+
+        client.api.stop.side_effect = stop
+
+        with patch("core.docker.client.DockerClientPool.get", return_value=client):
+            with self.assertNumQueries(4):
+                progress = BulkActionRun(job, concurrency=4, flush_interval=60).run()
+
+        self.assertEqual(client.api.stop.call_count, 2)
+        self.assertEqual(progress["done"], 2)
+        self.assertEqual(progress["failed"], {"web1": "timeout"})
+        self.assertEqual(Instance.objects.get(name="web0").status, "paused")
+        self.assertEqual(Instance.objects.get(name="web1").status, "running")
+        self.assertEqual(InstanceStatusChange.objects.get().reason, "bulk pause")
+        job.refresh_from_db()
+        self.assertTrue(job.progress["finished"])
+
+    def test_destroy_deletes_rows_even_if_the_container_is_gone(self):
+        job = enqueue_bulk_action(
+            "destroy", Instance.objects.filter(owner=self.alice), self.alice
+        )
+        client = MagicMock()
+        client.api.remove_container.side_effect = NotFound("gone")
+
+        with patch("core.docker.client.DockerClientPool.get", return_value=client):
+            BulkActionRun(job, concurrency=2).run()
+
+        self.assertEqual(
+            list(Instance.objects.values_list("name", flat=True)), ["web3"]
+        )
+
+    @override_settings(
+        HOST_RESERVED_MEMORY_MIB=0,
+        HOST_MEMORY_OVERCOMMIT=1,
+        HOST_CPU_OVERCOMMIT=1,
+        ADMISSION_DEFAULT_MEMORY_MIB=256,
+        ADMISSION_DEFAULT_CPU=0.25,
+    )
+    def test_unpause_skips_instances_without_capacity(self):
+        paused = Instance.objects.get(name="web2")
+        for name in ("web4", "web5"):
+            Instance.for_module(
+                paused.module,
+                name=name,
+                owner=self.alice,
+                host=self.host,
+                status="paused",
+            ).save()
+        job = enqueue_bulk_action(
+            "unpause", Instance.objects.filter(status="paused"), self.alice
+        )
+        client = MagicMock()
+        info = {"MemTotal": 1024 * 1024 * 1024, "NCPU": 4}
+
+        with (
+            patch("core.docker.client.DockerClientPool.get", return_value=client),
+            patch("core.docker.capacity.client_pool.info", return_value=info),
+        ):
+            progress = BulkActionRun(job, concurrency=2).run()
+
+        self.assertEqual(client.api.start.call_count, 1)
+        self.assertEqual((progress["done"], progress["failed"]), (3, {}))
+        self.assertEqual(
+            set(progress["skipped"].values()), {"no capacity left on Server1"}
+        )
+        self.assertEqual(len(progress["skipped"]), 2)
+        self.assertEqual(
+            Instance.objects.filter(name__in=["web2", "web4", "web5"])
+            .filter(status="running")
+            .count(),
+            1,
+        )
+
+
+class BulkActionConsumerTestCase(TransactionTestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="normalo")
+        self.job = Job.objects.create(
+            action="bulk",
+            status="done",
+            payload={"action": "pause", "instance_ids": [], "user_id": self.owner.pk},
+            progress={"total": 2, "done": 2, "failed": {}, "finished": True},
+        )
+
+    def communicator(self, user):
+        communicator = WebsocketCommunicator(
+            BulkActionConsumer.as_asgi(), f"/ws/bulk/{self.job.pk}/"
+        )
+        communicator.scope["user"] = user
+        communicator.scope["url_route"] = {"kwargs": {"pk": str(self.job.pk)}}
+        return communicator
+
+    async def test_sends_progress_to_the_owner_and_closes_when_done(self):
+        communicator = self.communicator(self.owner)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        frame = json.loads(await communicator.receive_from())
+        self.assertEqual((frame["status"], frame["done"]), ("done", 2))
+        self.assertEqual(
+            (await communicator.receive_output())["type"], "websocket.close"
+        )
+
+    async def test_rejects_other_users(self):
+        stranger = await User.objects.acreate(username="fremder")
+        connected, _ = await self.communicator(stranger).connect()
+        self.assertFalse(connected)
@@ -0,0 +1,113 @@
+import json
+from unittest.mock import patch
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+
+from apps.catalog.models import Module
+from apps.deployments.consumers import InstanceDashboardConsumer
+from apps.deployments.models import Instance
+from apps.deployments.progress_relay import PullProgressRelay
+from apps.deployments.status_hub import status_group_name
+
+
+@patch("apps.deployments.consumers.status_hub")
+class InstanceDashboardConsumerTestCase(TransactionTestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="normalo")
+        other = User.objects.create_user(username="fremder")
+        module = Module.objects.create(name="web")
+        self.own = Instance.objects.create(
+            name="web_normalo", owner=self.owner, module=module, status="running"
+        )
+        self.foreign = Instance.objects.create(
+            name="web_fremder", owner=other, module=module
+        )
+
+    def communicator(self):
+        communicator = WebsocketCommunicator(
+            InstanceDashboardConsumer.as_asgi(), "/ws/instances/"
+        )
+        communicator.scope["user"] = self.owner
+        return communicator
+
+    async def test_snapshot_contains_only_visible_instances(self, status_hub):
+        communicator = self.communicator()
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_to(
+            text_data=json.dumps(
+                {"subscribe": [str(self.own.id), str(self.foreign.id), "nope"]}
+            )
+        )
+        frame = json.loads(await communicator.receive_from())
+        self.assertEqual(frame, {"s": {str(self.own.id): "running"}})
+        await communicator.disconnect()
+
+    async def test_subscriptions_are_limited_per_socket(self, status_hub):
+        second = await Instance.objects.acreate(
+            name="db_normalo", owner=self.owner, module=self.own.module
+        )
+        communicator = self.communicator()
+        await communicator.connect()
+
+        with patch.object(InstanceDashboardConsumer, "max_subscriptions", 1):
+            for instance in (self.own, second):
+                await communicator.send_to(
+                    text_data=json.dumps({"subscribe": [str(instance.id)]})
+                )
+            first = json.loads(await communicator.receive_from())
+            self.assertTrue(await communicator.receive_nothing())
+
+        self.assertEqual(first, {"s": {str(self.own.id): "running"}})
+        await communicator.disconnect()
+
+    async def test_status_changes_are_batched(self, status_hub):
+        communicator = self.communicator()
+        await communicator.connect()
+        await communicator.send_to(
+            text_data=json.dumps({"subscribe": [str(self.own.id)]})
+        )
+        await communicator.receive_from()
+
+        layer = get_channel_layer()
+        for status in ("exited", "running", "paused"):
+            await layer.group_send(
+                status_group_name(self.own.id),
+                {
+                    "type": "status.update",
+                    "instance_id": str(self.own.id),
+                    "status": status,
+                },
+            )
+
+        frame = json.loads(await communicator.receive_from())
+        self.assertEqual(frame, {"s": {str(self.own.id): "paused"}})
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_status_changes_of_the_worker_are_relayed(self, status_hub):
+        with patch(
+            "apps.deployments.consumers.progress_relay",
+            PullProgressRelay(interval=0.05),
+        ):
+            communicator = self.communicator()
+            await communicator.connect()
+            await communicator.send_to(
+                text_data=json.dumps({"subscribe": [str(self.own.id)]})
+            )
+            await communicator.receive_from()
+            self.assertTrue(await communicator.receive_nothing(timeout=0.2))
+
+            await database_sync_to_async(
+                Instance.objects.filter(pk=self.own.pk).update
+            )(status="queued")
+
+            frame = json.loads(await communicator.receive_from())
+            self.assertEqual(frame, {"s": {str(self.own.id): "queued"}})
+            await communicator.disconnect()
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.catalog.models import Module
+from apps.deployments.idle import suspend_idle_instances, wake_instance
+from apps.deployments.jobs import run_job
+from apps.deployments.models import Instance, InstanceMetric, Job
+from apps.hosts.models import DockerHost
+
+
+@override_settings(
+    IDLE_SUSPEND_AFTER=60,
+    IDLE_CPU_PERCENT=2,
+    IDLE_NETWORK_BYTES_PER_MINUTE=1024,
+    METRICS_INTERVAL=60,
+)
+class IdleSuspendTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+        self.owner = User.objects.create_user(username="alice", password="pw")
+        wiki = Module.objects.create(name="Wiki", idle_timeout=30)
+        database = Module.objects.create(name="Postgres", idle_timeout=0)
+        self.instances = {}
+        now = timezone.now()
+        # Name, module, CPU and network per minute, minutes of samples.
+        for name, module, cpu, network, minutes in [
+            ("idle", wiki, 0.5, 100, 40),
+            ("busy", wiki, 35.0, 100, 40),
+            ("chatty", wiki, 0.5, 50_000, 40),
+            ("fresh", wiki, 0.5, 100, 10),
+            ("pinned", database, 0.1, 0, 40),
+        ]:
+            instance = Instance.objects.create(
+                name=name, owner=self.owner, module=module, host=self.host
+            )
+            Instance.objects.filter(pk=instance.pk).update(status="running")
+            InstanceMetric.objects.bulk_create(
+                InstanceMetric(
+                    instance=instance,
+                    timestamp=now - timedelta(minutes=minute),
+                    cpu_percent=cpu if minute == 5 else 0.1,
+                    memory_mib=64,
+                    net_rx_bytes=network,
+                )
+                for minute in range(minutes)
+            )
+            self.instances[name] = instance
+
+    def test_only_instances_idle_for_their_whole_timeout_are_paused(self):
+        self.assertEqual(suspend_idle_instances(), 1)
+        job = Job.objects.get(action="pause")
+        self.assertEqual(job.instance_id, self.instances["idle"].pk)
+        self.assertTrue(job.payload["reason"].startswith("idle for 30 min"))
+
+        # A pending pause is not queued twice.
+        self.assertEqual(suspend_idle_instances(), 0)
+
+    def test_wake_unpauses_only_instances_paused_as_idle(self):
+        suspend_idle_instances()
+        job = Job.objects.get(action="pause")
+        job.attempts = 1
+        with patch("core.docker.client.DockerClientPool.get", return_value=MagicMock()):
+            run_job(job)
+
+        idle = Instance.objects.get(name="idle")
+        self.assertEqual(idle.status, "paused")
+        self.assertTrue(idle.status_changes.get().reason.startswith("idle"))
+
+        busy = Instance.objects.get(name="busy")
+        busy.transition_status("paused", reason="paused by user")
+        self.assertFalse(wake_instance(busy))
+
+        self.client.force_login(self.owner)
+        url = reverse("deployments:instance-wake", args=["idle"])
+        detail = self.client.get(reverse("deployments:instance-detail", args=["idle"]))
+        self.assertContains(detail, f'action="{url}" method="post"')
+        self.assertEqual(self.client.get(url).status_code, 405)
+        response = self.client.post(url)
+        self.assertRedirects(
+            response, reverse("deployments:instance-detail", args=["idle"])
+        )
+        self.assertEqual(
+            list(
+                Job.objects.filter(action="unpause").values_list(
+                    "instance_id", flat=True
+                )
+            ),
+            [idle.pk],
+        )
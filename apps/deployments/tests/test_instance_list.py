@@ -0,0 +1,77 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance
+from apps.deployments.views import InstanceListView
+
+
+class InstanceListViewTestCase(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.alice.groups.add(Group.objects.get(name="user"))
+        bob = User.objects.create_user(username="bob")
+        nginx = Module.objects.create(name="Nginx", image_name="nginx:1.27")
+        redis = Module.objects.create(name="Redis", image_name="redis:7")
+
+        now = timezone.now()
+        for i in range(15):
+            instance = Instance.objects.create(
+                name=f"web{i}",
+                owner=self.alice if i % 3 else bob,
+                module=nginx if i % 2 else redis,
+                status="running" if i % 2 else "paused",
+            )
+            # Two instances per timestamp exercise the id tie-breaker.
+            Instance.objects.filter(pk=instance.pk).update(
+                created_at=now - timedelta(minutes=i // 2)
+            )
+        self.client.force_login(self.alice)
+
+    def names(self, response):
+        return [instance.name for instance in response.context["owned_Instances"]]
+
+    def test_pages_cover_own_instances_once(self):
+        url = reverse("deployments:instance-list")
+        seen = []
+        response = self.client.get(url)
+        while True:
+            seen += self.names(response)
+            cursor = response.context["next_cursor"]
+            if cursor is None:
+                break
+            response = self.client.get(url, {"after": cursor})
+
+        own = Instance.objects.filter(owner=self.alice).values_list("name", flat=True)
+        self.assertEqual(len(own), 10)
+        self.assertLessEqual(
+            len(self.names(self.client.get(url))), InstanceListView.paginate_by
+        )
+        self.assertCountEqual(seen, own)
+
+    def test_filters(self):
+        response = self.client.get(
+            reverse("deployments:instance-list"),
+            {"status": "running", "module": "nginx", "owner": "bob"},
+        )
+        # Owner filtering is reserved to administrators.
+        self.assertTrue(self.names(response))
+        for instance in response.context["owned_Instances"]:
+            self.assertEqual(instance.owner, self.alice)
+            self.assertEqual(instance.status, "running")
+            self.assertEqual(instance.module.slug, "nginx")
+
+    def test_slugs_and_names_are_unique_ignoring_case(self):
+        module = Module.objects.get(name="Nginx")
+        first = Instance.objects.create(name="My App", owner=self.alice, module=module)
+        second = Instance.objects.create(name="my-app", owner=self.alice, module=module)
+
+        self.assertEqual((first.slug, second.slug), ("my-app", "my-app-2"))
+        self.assertTrue(Instance.name_taken("MY APP"))
+        self.assertFalse(Instance.name_taken("my app 2"))
@@ -0,0 +1,59 @@
+import uuid
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from apps.deployments.jobs import (
+    claim_job,
+    enqueue_job,
+    requeue_interrupted_jobs,
+    run_job,
+)
+from apps.deployments.models import Job
+from apps.hosts.models import DockerHost
+
+
+@override_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_BACKOFF=10)
+class JobQueueTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+
+    def test_claim_respects_per_host_limit(self):
+        first = enqueue_job("deploy", uuid.uuid4())
+        enqueue_job("deploy", uuid.uuid4())
+
+        claimed = claim_job("w1", per_host_limit=1)
+        self.assertEqual(claimed, first)
+        self.assertEqual(claimed.status, "running")
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(claim_job("w2", per_host_limit=1))
+
+    def test_failed_job_is_retried_with_backoff_then_failed(self):
+        enqueue_job("pause", uuid.uuid4())
+        handler = patch.dict(
+            "apps.deployments.jobs.JOB_HANDLERS",
+            {"pause": lambda job: 1 / 0},
+        )
+
+        with handler:
+            run_job(claim_job("w1", per_host_limit=1))
+            job = Job.objects.get()
+            self.assertEqual(job.status, "queued")
+            self.assertGreater(job.run_after, job.locked_at)
+
+            Job.objects.update(run_after=job.locked_at)
+            run_job(claim_job("w1", per_host_limit=1))
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("division by zero", job.last_error)
+
+    def test_jobs_of_a_restarted_worker_are_requeued(self):
+        enqueue_job("destroy", uuid.uuid4())
+        claim_job("w1", per_host_limit=1)
+
+        self.assertEqual(requeue_interrupted_jobs("w2", stale_after=3600), 0)
+        self.assertEqual(requeue_interrupted_jobs("w1", stale_after=3600), 1)
+        self.assertEqual(Job.objects.get().status, "queued")
@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apps.deployments.consumers import DockerLogConsumer
+
+
+class FakeLogClient:
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.closed = asyncio.Event()
+
+    async def logs(self, container, follow=False, tail="all"):
+        try:
+            for line in self.lines:
+                yield line
+            await asyncio.Event().wait()
+        finally:
+            self.closed.set()
+
+
+class DockerLogConsumerTestCase(SimpleTestCase):
+
+    def consumer(self, queue_size):
+        consumer = DockerLogConsumer()
+        consumer.container_name = "web"
+        consumer.docker_base_url = None
+        consumer.queue = asyncio.Queue(maxsize=queue_size)
+        consumer.dropped_bytes = 0
+        consumer.frames = []
+
+        async def send(text_data):
+            consumer.frames.append(text_data)
+
+        consumer.send = send
+        return consumer
+
+    async def test_overflow_is_dropped_and_reported(self):
+        client = FakeLogClient([f"line {i}\n".encode() for i in range(10)])
+        consumer = self.consumer(queue_size=4)
+
+        with patch(
+            "apps.deployments.consumers.get_async_docker_client", return_value=client
+        ):
+            reader = asyncio.create_task(consumer.read_logs())
+            await asyncio.sleep(0.01)
+            sender = asyncio.create_task(consumer.send_batches())
+            await asyncio.sleep(0.2)
+
+            self.assertEqual(
+                consumer.frames,
+                ["line 0\nline 1\nline 2\nline 3\n--- 42 bytes dropped ---\n"],
+            )
+
+            consumer.tasks = [reader, sender]
+            await consumer.disconnect(1000)
+            await asyncio.wait_for(client.closed.wait(), 1)
+
+    async def test_characters_split_across_frames_are_kept(self):
+        data = "grüße\n".encode()
+        client = FakeLogClient([data[:3], data[3:]])
+        consumer = self.consumer(queue_size=4)
+
+        with patch(
+            "apps.deployments.consumers.get_async_docker_client", return_value=client
+        ):
+            reader = asyncio.create_task(consumer.read_logs())
+            sender = asyncio.create_task(consumer.send_batches())
+            await asyncio.sleep(0.2)
+
+            self.assertEqual("".join(consumer.frames), "grüße\n")
+
+            consumer.tasks = [reader, sender]
+            await consumer.disconnect(1000)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from apps.catalog.models import Module
+from apps.deployments.metrics import MetricsCollector, rollup_metrics
+from apps.deployments.models import Instance, InstanceMetric
+
+
+def stats_payload(cpu_usage, system_usage, rx_bytes):
+    return {
+        "cpu_stats": {
+            "cpu_usage": {"total_usage": cpu_usage},
+            "system_cpu_usage": system_usage,
+            "online_cpus": 1,
+        },
+        "memory_stats": {"usage": 1024 * 1024},
+        "networks": {"eth0": {"rx_bytes": rx_bytes, "tx_bytes": 0}},
+    }
+
+
+class MetricsTestCase(TestCase):
+
+    def setUp(self):
+        owner = User.objects.create_user(username="normalo")
+        module = Module.objects.create(name="web")
+        self.instance = Instance.objects.create(
+            name="web_normalo", owner=owner, module=module, status="running"
+        )
+
+    @patch("apps.deployments.metrics.get_docker_client")
+    def test_collector_stores_deltas_against_previous_tick(self, get_client):
+        stats = get_client.return_value.api.stats
+        collector = MetricsCollector(workers=1)
+
+        stats.return_value = stats_payload(10, 100, 1000)
+        self.assertEqual(collector.collect(), 0)
+
+        stats.return_value = stats_payload(60, 200, 1500)
+        self.assertEqual(collector.collect(), 1)
+
+        metric = InstanceMetric.objects.get()
+        self.assertEqual(metric.cpu_percent, 50.0)
+        self.assertEqual(metric.memory_mib, 1.0)
+        self.assertEqual(metric.net_rx_bytes, 500)
+
+    def test_rollup_folds_finished_minutes_once(self):
+        start = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        InstanceMetric.objects.bulk_create(
+            InstanceMetric(
+                instance=self.instance,
+                timestamp=start + timedelta(seconds=offset),
+                cpu_percent=cpu,
+                memory_mib=100,
+                net_rx_bytes=10,
+            )
+            for offset, cpu in ((0, 10), (30, 30), (65, 50))
+        )
+
+        now = start + timedelta(seconds=90)
+        rollup_metrics(now=now)
+        rollup_metrics(now=now)
+
+        minute = InstanceMetric.objects.get(resolution=InstanceMetric.RESOLUTION_MINUTE)
+        self.assertEqual(minute.timestamp, start)
+        self.assertEqual(minute.samples, 2)
+        self.assertEqual(minute.cpu_percent, 20.0)
+        self.assertEqual(minute.net_rx_bytes, 20)
@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance, InstanceStatusChange
+from apps.deployments.reconciler import StatusReconciler
+from apps.hosts.models import DockerHost
+
+
+def container_event(action, name):
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {"ID": f"id-{name}", "Attributes": {"name": name}},
+    }
+
+
+class StatusReconcilerTestCase(TestCase):
+
+    def setUp(self):
+        owner = User.objects.create(username="alice")
+        module = Module.objects.create(name="Nginx", image_name="nginx:1.27")
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+        for name, status in [
+            ("web", "pending"),
+            ("db", "running"),
+            ("cache", "paused"),
+            ("gone", "running"),
+        ]:
+            Instance.objects.create(
+                name=name, owner=owner, module=module, host=self.host, status=status
+            )
+
+        client = MagicMock()
+        client.api.containers.return_value = [
+            {"Id": "id-web", "Names": ["/web"], "State": "running"},
+            {"Id": "id-db", "Names": ["/db"], "State": "exited"},
+            {"Id": "id-cache", "Names": ["/cache"], "State": "exited"},
+        ]
+        patcher = patch("core.docker.client.DockerClientPool.get", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def statuses(self):
+        return dict(Instance.objects.values_list("name", "status"))
+
+    def test_resync_only_writes_transitions(self):
+        self.assertEqual(StatusReconciler().resync(), 3)
+        self.assertEqual(
+            self.statuses(),
+            {"web": "running", "db": "exited", "cache": "paused", "gone": "destroyed"},
+        )
+
+    def test_resync_without_active_hosts_is_skipped(self):
+        self.host.active = False
+        self.host.save(update_fields=["active"])
+
+        self.assertEqual(StatusReconciler().resync(), 0)
+        self.assertEqual(
+            self.statuses(),
+            {"web": "pending", "db": "running", "cache": "paused", "gone": "running"},
+        )
+
+    def test_events_update_status_on_change_only(self):
+        reconciler = StatusReconciler()
+        before = Instance.objects.get(name="db").updated_at
+
+        reconciler.handle_event(None, container_event("start", "db"))
+        self.assertEqual(Instance.objects.get(name="db").updated_at, before)
+
+        reconciler.handle_event(None, container_event("die", "db"))
+        reconciler.handle_event(None, container_event("stop", "cache"))
+        self.assertEqual(self.statuses()["db"], "exited")
+        self.assertEqual(self.statuses()["cache"], "paused")
+
+        change = InstanceStatusChange.objects.get()
+        self.assertEqual(
+            (change.instance.name, change.old_status, change.new_status),
+            ("db", "running", "exited"),
+        )
+
+    def test_oom_kill_leaves_instance_failed(self):
+        reconciler = StatusReconciler()
+        reconciler.handle_event(None, container_event("oom", "db"))
+        reconciler.handle_event(None, container_event("die", "db"))
+
+        self.assertEqual(self.statuses()["db"], "failed")
+        self.assertEqual(
+            Instance.objects.get(name="db").status_changes.get().reason,
+            "docker: out of memory",
+        )
+
+    def test_failing_health_check_fails_instance_until_healthy(self):
+        reconciler = StatusReconciler()
+        reconciler.handle_event(None, container_event("health_status: unhealthy", "db"))
+        self.assertEqual(self.statuses()["db"], "failed")
+
+        reconciler.handle_event(None, container_event("health_status: healthy", "db"))
+        self.assertEqual(self.statuses()["db"], "running")
@@ -0,0 +1,64 @@
+import asyncio
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apps.deployments.stats_sampler import StatsSampler
+from core.docker.stats import summarize_stats
+
+
+def stats_payload(total_usage, system_usage):
+    return {
+        "cpu_stats": {
+            "cpu_usage": {"total_usage": total_usage},
+            "system_cpu_usage": system_usage,
+            "online_cpus": 2,
+        },
+        "precpu_stats": {
+            "cpu_usage": {"total_usage": 0},
+            "system_cpu_usage": 0,
+        },
+        "memory_stats": {"usage": 3 * 1024 * 1024, "stats": {"inactive_file": 0}},
+    }
+
+
+class SummarizeStatsTestCase(SimpleTestCase):
+
+    def test_cpu_and_memory(self):
+        self.assertEqual(
+            summarize_stats(stats_payload(25, 100)),
+            {"memory_mib": 3.0, "cpu_percent": 50.0},
+        )
+
+    def test_payload_without_previous_reading(self):
+        self.assertIsNone(summarize_stats({"cpu_stats": {}}))
+
+
+class StatsSamplerTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.streams_opened = 0
+
+    async def fake_stats(self, client, container_name):
+        self.streams_opened += 1
+        for usage in range(1, 5):
+            yield stats_payload(usage, 100)
+        await asyncio.Event().wait()
+
+    @patch("apps.deployments.stats_sampler.get_async_docker_client")
+    async def test_viewers_share_one_stream_and_history(self, _):
+        sampler = StatsSampler(history_size=3)
+        with patch("apps.deployments.stats_sampler.container_stats", self.fake_stats):
+            self.assertEqual(sampler.subscribe("i1", "web"), [])
+            await asyncio.sleep(0.05)
+
+            history = sampler.subscribe("i1", "web")
+            self.assertEqual([s["cpu_percent"] for s in history], [4.0, 6.0, 8.0])
+            self.assertEqual(self.streams_opened, 1)
+
+            task = sampler._samplers["i1"].task
+            sampler.unsubscribe("i1")
+            self.assertFalse(task.cancelled())
+            sampler.unsubscribe("i1")
+            await asyncio.sleep(0)
+            self.assertTrue(task.cancelled())
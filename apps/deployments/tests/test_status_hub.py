@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance
+from apps.deployments.status_hub import StatusHub, status_group_name
+from core.docker.events import container_event_failure, container_event_status
+
+
+def container_event(action, name="web_normalo"):
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {"ID": "abc123", "Attributes": {"name": name}},
+    }
+
+
+class ContainerEventStatusTestCase(TestCase):
+
+    def test_state_changes_are_parsed(self):
+        self.assertEqual(
+            container_event_status(container_event("die")),
+            ("web_normalo", "abc123", "exited"),
+        )
+
+    def test_oom_and_failing_health_checks_are_failures(self):
+        self.assertEqual(
+            container_event_failure(container_event("oom")),
+            ("web_normalo", "abc123", "out of memory"),
+        )
+        self.assertEqual(
+            container_event_failure(container_event("health_status: unhealthy")),
+            ("web_normalo", "abc123", "health check failing"),
+        )
+        self.assertIsNone(container_event_failure(container_event("die")))
+
+    def test_non_state_events_are_ignored(self):
+        self.assertIsNone(container_event_status(container_event("exec_start")))
+        self.assertIsNone(
+            container_event_status(container_event("health_status: unhealthy"))
+        )
+        self.assertIsNone(container_event_status({"Type": "image", "Action": "pull"}))
+
+
+class StatusHubTestCase(TestCase):
+
+    def setUp(self):
+        owner = User.objects.create_user(username="normalo")
+        module = Module.objects.create(name="web")
+        self.instance = Instance.objects.create(
+            name="web_normalo", owner=owner, module=module
+        )
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(
+            status_group_name(self.instance.id), self.channel
+        )
+
+    @patch("apps.deployments.status_hub.watch_all_hosts")
+    async def test_event_is_fanned_out_to_instance_group(self, watch_all_hosts):
+        hub = StatusHub()
+        hub.ensure_started()
+        await sync_to_async(hub._handle_event)(None, container_event("pause"))
+
+        message = await self.layer.receive(self.channel)
+        self.assertEqual(message["type"], "status.update")
+        self.assertEqual(message["instance_id"], str(self.instance.id))
+        self.assertEqual(message["status"], "paused")
@@ -4,21 +4,39 @@ from . import views, consumers
 
 urlpatterns = [
     path("deploy/<slug:slug>", views.DeployView.as_view(), name="deploy-instance"),
+    path(
+        "deploy/<slug:slug>/batch",
+        views.BatchDeployView.as_view(),
+        name="deploy-batch",
+    ),
     path("deployment", views.InstanceListView.as_view(), name="instance-list"),
     path(
         "instance/<slug:slug>",
         views.InstanceDetailView.as_view(),
         name="instance-detail",
     ),
+    path(
+        "instance/<slug:slug>/wake",
+        views.wake_instance_view,
+        name="instance-wake",
+    ),
+    path(
+        "instance/<uuid:instance_id>/metrics",
+        views.InstanceMetricsView.as_view(),
+        name="instance-metrics",
+    ),
     path(
         "instance/<uuid:instance_id>/action/",
         views.instance_action_view,
         name="instance-action",
     ),
+    path("instances/bulk", views.bulk_action_view, name="bulk-action"),
 ]
 
 websocket_urlpatterns = [
     re_path(r"ws/logs/(?P<pk>[^/]+)/$", consumers.DockerLogConsumer.as_asgi()),
     re_path(r"ws/status/(?P<pk>[^/]+)/$", consumers.InstanceStatusConsumer.as_asgi()),
+    re_path(r"ws/instances/$", consumers.InstanceDashboardConsumer.as_asgi()),
     re_path(r"ws/stats/(?P<pk>[^/]+)/$", consumers.InstanceStatsConsumer.as_asgi()),
+    re_path(r"ws/bulk/(?P<pk>\d+)/$", consumers.BulkActionConsumer.as_asgi()),
 ]
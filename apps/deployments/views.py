@@ -1,21 +1,39 @@
-import threading
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views import View, generic
 from django.views.decorators.http import require_POST
 
 from apps.catalog.models import Module
+from apps.deployments.batch import BatchDeployError, batch_names, create_batch
+from apps.deployments.bulk import (
+    BulkActionError,
+    enqueue_bulk_action,
+    select_instances,
+)
+from apps.deployments.idle import is_idle_suspended, wake_instance
+from apps.deployments.jobs import enqueue_job
+from apps.deployments.metrics import RETENTION, query_metrics
 from apps.deployments.models import Instance
-from core.docker.deploy import (
-    deploy_instance,
-    get_random_free_port,
-    set_pangolin_labels,
-    pause_instance,
-    unpause_instance,
-    destroy_instance,
+from core.docker.capacity import (
+    NoCapacityError,
+    admission_status,
+    requested_resources,
 )
-from core.utils.permissions_check import user_can_deploy
+from core.docker.deploy import set_pangolin_labels
+from core.docker.ports import NoFreePortError, reserve_port
+from core.docker.scheduler import NoHostAvailableError, pick_host
+from core.utils.budgets import BudgetExceededError, check_budget
+from core.utils.common import STATUS_CHOICES
+from core.utils.pagination import keyset_page
+from core.utils.permissions_check import user_can_administrate, user_can_deploy
 
 
 class DeployView(LoginRequiredMixin, UserPassesTestMixin, View):
@@ -36,7 +54,7 @@ class DeployView(LoginRequiredMixin, UserPassesTestMixin, View):
 
         name = f"{request.POST.get('name')}_{request.user.username}"
 
-        if Instance.objects.filter(name__iexact=name).exists():
+        if Instance.name_taken(name):
             return render(
                 request,
                 self.template_name,
@@ -46,42 +64,146 @@ class DeployView(LoginRequiredMixin, UserPassesTestMixin, View):
                 },
             )
 
-        instance = Instance.objects.create(
-            name=name,
-            owner=request.user,
-            module=module,
-            status="pending",
-            image_name=module.image_name,
-            container_port=module.container_port,
-            host_port=get_random_free_port() if module.container_port else None,
-            environment=module.default_env,
-            default_restart_policy=module.default_restart_policy,
-        )
+        try:
+            with transaction.atomic():
+                check_budget(request.user, module)
+                requested = requested_resources(module)
+                host = pick_host(requested)
+                instance = Instance.for_module(
+                    module,
+                    name=name,
+                    owner=request.user,
+                    host=host,
+                    status=admission_status(host, requested),
+                )
+                instance.save()
+        except (BudgetExceededError, NoCapacityError, NoHostAvailableError) as e:
+            return render(
+                request,
+                self.template_name,
+                {"module": module, "error": str(e)},
+            )
+        if module.container_port:
+            try:
+                reserve_port(instance, host)
+            except NoFreePortError as e:
+                instance.delete()
+                return render(
+                    request,
+                    self.template_name,
+                    {"module": module, "error": str(e)},
+                )
         set_pangolin_labels(instance.id, False)
 
-        threading.Thread(
-            target=deploy_instance, args=(instance.id,), daemon=True
-        ).start()
+        enqueue_job("deploy", instance.id)
 
         return redirect("deployments:instance-list")
 
 
-class InstanceListView(generic.ListView):
-    """Generic class-based view for a list of instances."""
+class BatchDeployView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Deploy ``count`` instances of a module named ``<name>-<n>_<username>``
+    (POST), and report how far each of them got (GET ?name=...), as JSON.
+    """
+
+    def test_func(self):
+        return user_can_deploy(self.request.user)
+
+    def get(self, request, slug):
+        module = get_object_or_404(Module, slug=slug)
+        try:
+            count = int(request.GET.get("count", settings.BATCH_DEPLOY_MAX))
+        except ValueError:
+            count = settings.BATCH_DEPLOY_MAX
+        count = min(max(count, 1), settings.BATCH_DEPLOY_MAX)
+        names = batch_names(request.GET.get("name", ""), request.user, count)
+        instances = Instance.objects.filter(
+            module=module, owner=request.user, name__in=names
+        ).order_by("created_at", "id")
+        return JsonResponse(
+            {"instances": [self.describe(instance) for instance in instances]}
+        )
+
+    def post(self, request, slug):
+        module = get_object_or_404(Module, slug=slug)
+        name = request.POST.get("name", "")
+        try:
+            count = int(request.POST.get("count", ""))
+        except ValueError:
+            return JsonResponse({"error": "count must be a number"}, status=400)
+        if not name or any(char.isspace() for char in name):
+            return JsonResponse({"error": "Whitespace is not allowed"}, status=400)
+
+        try:
+            instances = create_batch(module, request.user, name, count)
+        except (
+            BatchDeployError,
+            BudgetExceededError,
+            NoCapacityError,
+            NoHostAvailableError,
+            NoFreePortError,
+        ) as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        return JsonResponse(
+            {"instances": [self.describe(instance) for instance in instances]},
+            status=201,
+        )
+
+    @staticmethod
+    def describe(instance):
+        output = instance.docker_output or {}
+        return {
+            "id": str(instance.id),
+            "name": instance.name,
+            "slug": instance.slug,
+            "host_port": instance.host_port,
+            "status": instance.status,
+            "error": output.get("error", ""),
+        }
+
+
+class InstanceListView(LoginRequiredMixin, generic.ListView):
+    """
+    Instances visible to the user, filterable by status, module and owner
+    and paginated by keyset (``?after=<cursor>``).
+    """
 
     model = Instance
-    paginate_by = 10
+    paginate_by = 12
 
-    def get_context_data(self, **kwargs):
+    def get_queryset(self):
         user = self.request.user
-        owned_instances = Instance.objects.filter(owner=user)
+        params = self.request.GET
+        instances = Instance.objects.select_related("module", "owner", "host")
+
+        if not user_can_administrate(user):
+            instances = instances.filter(owner=user)
+        elif params.get("owner"):
+            instances = instances.filter(owner__username=params["owner"])
 
-        if user.is_superuser or user.groups.filter(name="editor").exists():
-            owned_instances = Instance.objects.all()
-        new_context = {
-            "owned_Instances": owned_instances,
+        if params.get("status"):
+            instances = instances.filter(status=params["status"])
+        if params.get("module"):
+            instances = instances.filter(module__slug=params["module"])
+        return instances
+
+    def get_context_data(self, **kwargs):
+        params = self.request.GET
+        instances, next_cursor = keyset_page(
+            self.get_queryset(), params.get("after"), self.paginate_by
+        )
+        filters = params.copy()
+        filters.pop("after", None)
+
+        return {
+            "owned_Instances": instances,
+            "next_cursor": next_cursor,
+            "is_first_page": "after" not in params,
+            "filters": filters,
+            "status_choices": STATUS_CHOICES,
+            "modules": Module.objects.order_by("name").only("name", "slug"),
         }
-        return new_context
 
 
 class InstanceDetailView(LoginRequiredMixin, UserPassesTestMixin, generic.DetailView):
@@ -95,30 +217,104 @@ class InstanceDetailView(LoginRequiredMixin, UserPassesTestMixin, generic.Detail
     slug_field = "slug"
     slug_url_kwarg = "slug"
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["idle_suspended"] = is_idle_suspended(self.object)
+        return context
+
+
+class InstanceMetricsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Stored resource usage of an instance as JSON, e.g. ?window=3600."""
+
+    def test_func(self):
+        user = self.request.user
+        instance = get_object_or_404(Instance, id=self.kwargs["instance_id"])
+        return user.is_superuser or user == instance.owner
+
+    def get(self, request, instance_id):
+        try:
+            window = int(request.GET.get("window", 3600))
+        except ValueError:
+            window = 3600
+        window = min(max(window, 60), max(RETENTION.values()))
+
+        samples = query_metrics(instance_id, timedelta(seconds=window))
+        return JsonResponse({"samples": samples})
+
 
 @require_POST
 def instance_action_view(request, instance_id):
     """
-    Handle pause or destroy actions for an instance.
+    Queue pause, unpause or destroy actions for an instance.
     The action type comes from a POST parameter: 'action' = 'pause' | 'destroy'
     """
     instance = get_object_or_404(Instance, id=instance_id)
     action = request.POST.get("action")
 
-    try:
-        if action == "pause":
-            pause_instance(instance.id)
-            messages.success(request, f"Instance '{instance.name}' paused.")
-        elif action == "unpause":
-            unpause_instance(instance.id)
-            messages.success(request, f"Instance '{instance.name}' unpaused.")
-        elif action == "destroy":
-            destroy_instance(instance.id)
-            messages.success(request, f"Instance '{instance.name}' destroyed.")
-            return redirect("index")
-        else:
-            messages.error(request, "Unknown action.")
-    except Exception as e:
-        messages.error(request, f"Failed to perform action '{action}': {e}")
+    if action == "pause":
+        enqueue_job("pause", instance.id)
+        messages.success(request, f"Instance '{instance.name}' will be paused.")
+    elif action == "unpause":
+        enqueue_job("unpause", instance.id)
+        messages.success(request, f"Instance '{instance.name}' will be unpaused.")
+    elif action == "destroy":
+        enqueue_job("destroy", instance.id)
+        messages.success(request, f"Instance '{instance.name}' will be destroyed.")
+        return redirect("index")
+    else:
+        messages.error(request, "Unknown action.")
+
+    return redirect("deployments:instance-detail", instance.slug)
+
+
+@require_POST
+@login_required
+def wake_instance_view(request, slug):
+    """
+    Wake an instance paused for inactivity on behalf of its owner or an
+    admin, and show its detail page while it starts.
+    """
+    instance = get_object_or_404(Instance, slug=slug)
+    if request.user != instance.owner and not user_can_administrate(request.user):
+        raise PermissionDenied
 
+    if wake_instance(instance):
+        messages.success(request, f"Instance '{instance.name}' is waking up.")
+    elif instance.status != "running":
+        messages.error(request, f"Instance '{instance.name}' was not paused as idle.")
     return redirect("deployments:instance-detail", instance.slug)
+
+
+@require_POST
+def bulk_action_view(request):
+    """
+    Queue pause, unpause or destroy for many instances at once, selected by
+    'ids' or by the 'owner', 'module', 'status' and 'older_than' (hours)
+    filters. Progress is streamed over ws/bulk/<job>/.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Login required"}, status=401)
+
+    params = request.POST
+    try:
+        older_than = float(params["older_than"]) if params.get("older_than") else None
+        instances = select_instances(
+            request.user,
+            ids=params.getlist("ids"),
+            owner=params.get("owner", ""),
+            module=params.get("module", ""),
+            status=params.get("status", ""),
+            older_than=older_than,
+        )
+        job = enqueue_bulk_action(params.get("action", ""), instances, request.user)
+    except (BulkActionError, ValueError, ValidationError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(
+        {
+            "job": job.pk,
+            "total": job.progress["total"],
+            "progress_url": f"/ws/bulk/{job.pk}/",
+        },
+        status=202,
+    )
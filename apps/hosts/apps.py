@@ -12,8 +12,6 @@ class HostsConfig(AppConfig):
         docker_host = django_apps.get_model("hosts", "DockerHost")
 
         try:
-            docker_host.objects.update(active=False)
-
             if not docker_host.objects.exists():
                 docker_host.objects.create(
                     name="Default Docker host",
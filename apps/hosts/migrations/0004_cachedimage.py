@@ -0,0 +1,51 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hosts", "0003_dockerhost_default_domain"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedImage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("image_name", models.CharField(max_length=200)),
+                ("size_bytes", models.BigIntegerField(default=0)),
+                (
+                    "last_used_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "host",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="images",
+                        to="hosts.dockerhost",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["last_used_at"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("host", "image_name"), name="unique_cached_image"
+                    )
+                ],
+            },
+        ),
+    ]
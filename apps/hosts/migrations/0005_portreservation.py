@@ -0,0 +1,61 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("deployments", "0005_job_image_name_alter_job_action_and_more"),
+        ("hosts", "0004_cachedimage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PortReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("port", models.PositiveIntegerField()),
+                (
+                    "reserved_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "host",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="port_reservations",
+                        to="hosts.dockerhost",
+                    ),
+                ),
+                (
+                    "instance",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="port_reservation",
+                        to="deployments.instance",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["host", "port"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("host", "port"), name="unique_port_reservation"
+                    )
+                ],
+            },
+        ),
+    ]
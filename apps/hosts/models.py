@@ -1,6 +1,8 @@
 import uuid
+from urllib.parse import urlparse
 
 from django.db import models
+from django.utils import timezone
 
 from core.docker.client import test_client_config
 
@@ -25,3 +27,72 @@ class DockerHost(models.Model):
 
     def test_config(self):
         return test_client_config(self.base_url)
+
+    @property
+    def address(self) -> str:
+        """Address published ports are reachable at, e.g. 10.0.0.5."""
+        hostname = urlparse(self.base_url).hostname
+        if not hostname or self.base_url.startswith("unix"):
+            return "127.0.0.1"
+        return hostname
+
+
+class CachedImage(models.Model):
+    """
+    An image Heimwerk pulled onto a host.
+
+    Tracks size and last use, so popular images can be kept warm and the
+    least recently used ones evicted when the host exceeds its disk budget.
+    """
+
+    host = models.ForeignKey(
+        DockerHost, on_delete=models.CASCADE, related_name="images"
+    )
+    image_name = models.CharField(max_length=200)
+    size_bytes = models.BigIntegerField(default=0)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["last_used_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["host", "image_name"], name="unique_cached_image"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.image_name} on {self.host}"
+
+
+class PortReservation(models.Model):
+    """
+    A host port handed out to an instance, or found in use on the host.
+
+    The unique constraint makes reserving a port a single atomic insert.
+    Reservations are released together with their instance; reservations
+    without one are kept in sync with Docker by ``reconcile_ports``.
+    """
+
+    host = models.ForeignKey(
+        DockerHost, on_delete=models.CASCADE, related_name="port_reservations"
+    )
+    port = models.PositiveIntegerField()
+    instance = models.OneToOneField(
+        "deployments.Instance",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="port_reservation",
+    )
+    reserved_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["host", "port"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["host", "port"], name="unique_port_reservation"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.port} on {self.host}"
@@ -5,4 +5,6 @@ from . import views
 
 urlpatterns = [
     path("", views.HostView.as_view(), name="host-form"),
+    path("new", views.HostView.as_view(), {"new": True}, name="host-new"),
+    path("<uuid:pk>", views.HostView.as_view(), name="host-detail"),
 ]
@@ -1,34 +1,50 @@
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, redirect, render
 from django.views import View
 
 from apps.catalog.views import user_can_edit
 from apps.hosts.models import DockerHost
-from core.docker.client import test_client_config, init_docker
+from core.docker.client import client_pool, test_client_config
 
 
 class HostView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Settings of one Docker host; without a pk the first host is shown."""
+
     template_name = "hosts/host_form.html"
 
     def test_func(self):
         return user_can_edit(self.request.user)
 
     def get_object(self):
-        host, _ = DockerHost.objects.get_or_create(
-            defaults={
-                "name": "Default Docker host",
-                "base_url": "",
-                "active": False,
-                "pangolin_features": False,
+        if self.kwargs.get("new"):
+            return DockerHost(name="New Docker host")
+        if "pk" in self.kwargs:
+            return get_object_or_404(DockerHost, pk=self.kwargs["pk"])
+
+        host = DockerHost.objects.order_by("name").first()
+        if host is None:
+            host = DockerHost.objects.create(
+                name="Default Docker host",
+                base_url="",
+                active=False,
+                pangolin_features=False,
+            )
+        return host
+
+    def render_form(self, docker_host, **context):
+        context.update(
+            {
+                "docker_host": docker_host,
+                "docker_hosts": DockerHost.objects.order_by("name"),
+                "is_new": docker_host._state.adding,
             }
         )
-        return host
+        return render(self.request, self.template_name, context)
 
-    def get(self, request):
-        docker_host = self.get_object()
-        return render(request, self.template_name, {"docker_host": docker_host})
+    def get(self, request, **kwargs):
+        return self.render_form(self.get_object())
 
-    def post(self, request):
+    def post(self, request, **kwargs):
         docker_host = self.get_object()
         action = request.POST.get("action")
         error = None
@@ -36,39 +52,32 @@ class HostView(LoginRequiredMixin, UserPassesTestMixin, View):
         if action == "test":
             connection = test_client_config(request.POST.get("base_url"))
             if not connection:
-                return render(
-                    request,
-                    self.template_name,
-                    {
-                        "docker_host": docker_host,
-                        "error": "Connection failed, please check your config",
-                    },
+                return self.render_form(
+                    docker_host, error="Connection failed, please check your config"
                 )
-            return render(
-                request,
-                self.template_name,
-                {"docker_host": docker_host, "connection": "Connection successful"},
-            )
+            return self.render_form(docker_host, connection="Connection successful")
+
+        elif action == "deactivate" and not docker_host._state.adding:
+            docker_host.active = False
+            docker_host.save(update_fields=["active"])
+            client_pool.discard(docker_host.pk)
+            return self.render_form(docker_host, success="Host deactivated")
 
         elif action == "save":
+            created = docker_host._state.adding
+            docker_host.name = request.POST.get("name") or docker_host.name
             docker_host.base_url = request.POST.get("base_url", "")
             docker_host.pangolin_features = "pangolin_features" in request.POST
             docker_host.default_domain = request.POST.get("resource_domain", "")
+            docker_host.active = docker_host.test_config()
             docker_host.save()
+            client_pool.discard(docker_host.pk)
 
-            if docker_host.test_config():
-                docker_host.active = True
-                init_docker(docker_host.base_url)
-                docker_host.save()
-            else:
+            if not docker_host.active:
                 error = "Connection failed, please check your config"
+            if created:
+                return redirect("host-detail", pk=docker_host.pk)
 
-            return render(
-                request,
-                self.template_name,
-                {
-                    "docker_host": docker_host,
-                    "success": "Settings saved",
-                    "error": error,
-                },
-            )
+            return self.render_form(docker_host, success="Settings saved", error=error)
+
+        return self.render_form(docker_host)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-17 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="cpu_budget",
+            field=models.FloatField(
+                blank=True,
+                help_text="CPU cores all instances of the user may use together",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="memory_budget",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Memory in MiB all instances of the user may use together",
+                null=True,
+            ),
+        ),
+    ]
@@ -14,6 +14,16 @@ class UserProfile(models.Model):
     quota = models.PositiveIntegerField(
         default=3, help_text="Maximum number of instances user can create"
     )
+    memory_budget = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text="Memory in MiB all instances of the user may use together",
+    )
+    cpu_budget = models.FloatField(
+        blank=True,
+        null=True,
+        help_text="CPU cores all instances of the user may use together",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
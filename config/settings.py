@@ -82,6 +82,120 @@ TEMPLATES = [
 
 ASGI_APPLICATION = "config.asgi.application"
 
+# Channels
+# A single Daphne process serves all sockets, so the in-memory layer is enough
+# to fan out status updates between consumers.
+
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+    },
+}
+
+# Metrics
+# Sampling interval in seconds and parallel Docker requests of collect_metrics.
+
+METRICS_INTERVAL = int(os.getenv("METRICS_INTERVAL", "5"))
+METRICS_WORKERS = int(os.getenv("METRICS_WORKERS", "8"))
+
+# Idle instances
+# Running instances are paused after this many minutes without activity
+# (0 never pauses them; modules can override it). Activity means CPU above
+# the percentage or network traffic above the bytes per minute, as recorded
+# by collect_metrics. The worker checks every interval (seconds, 0 disables).
+
+IDLE_SUSPEND_AFTER = int(os.getenv("IDLE_SUSPEND_AFTER", "0"))
+IDLE_CPU_PERCENT = float(os.getenv("IDLE_CPU_PERCENT", "2"))
+IDLE_NETWORK_BYTES_PER_MINUTE = int(os.getenv("IDLE_NETWORK_BYTES_PER_MINUTE", "16384"))
+IDLE_CHECK_INTERVAL = int(os.getenv("IDLE_CHECK_INTERVAL", "300"))
+
+# Jobs
+# Concurrency of manage.py worker, overall and per Docker host, and how failed
+# jobs are retried (backoff doubles with every attempt, in seconds).
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+WORKER_PER_HOST_LIMIT = int(os.getenv("WORKER_PER_HOST_LIMIT", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF = int(os.getenv("JOB_RETRY_BACKOFF", "10"))
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "3600"))
+
+# Admission
+# Hosts offer their memory, minus what is kept for the system (MiB), and
+# their CPUs, each times its overcommit ratio. Instances are accounted with
+# their limits, or the defaults below (MiB, cores) if their module sets
+# none. Deployments that do not fit are "queue"d until room frees up,
+# retried every interval (seconds), or "reject"ed right away.
+
+ADMISSION_POLICY = os.getenv("ADMISSION_POLICY", "queue")
+HOST_RESERVED_MEMORY_MIB = int(os.getenv("HOST_RESERVED_MEMORY_MIB", "512"))
+HOST_MEMORY_OVERCOMMIT = float(os.getenv("HOST_MEMORY_OVERCOMMIT", "1"))
+HOST_CPU_OVERCOMMIT = float(os.getenv("HOST_CPU_OVERCOMMIT", "2"))
+ADMISSION_DEFAULT_MEMORY_MIB = int(os.getenv("ADMISSION_DEFAULT_MEMORY_MIB", "256"))
+ADMISSION_DEFAULT_CPU = float(os.getenv("ADMISSION_DEFAULT_CPU", "0.25"))
+ADMISSION_RETRY_INTERVAL = int(os.getenv("ADMISSION_RETRY_INTERVAL", "30"))
+
+# Batches
+# Largest batch a single request may deploy, how many containers
+# manage.py batch_deploy starts at a time, and how many Docker calls a bulk
+# pause, unpause or destroy makes at a time.
+
+BATCH_DEPLOY_MAX = int(os.getenv("BATCH_DEPLOY_MAX", "50"))
+BATCH_DEPLOY_PARALLELISM = int(os.getenv("BATCH_DEPLOY_PARALLELISM", "10"))
+BULK_ACTION_CONCURRENCY = int(os.getenv("BULK_ACTION_CONCURRENCY", "10"))
+
+# Images
+# When deployments pull their image: "always", "if-not-present" or "auto"
+# (missing images plus untagged and :latest references).
+
+IMAGE_PULL_POLICY = os.getenv("IMAGE_PULL_POLICY", "auto")
+
+# Warm-up pre-pulls the images of the most deployed modules of the last days
+# every interval (seconds, 0 disables it). Pulled images are evicted least
+# recently used first once they exceed the budget (MiB, 0 means unlimited).
+
+IMAGE_WARMUP_INTERVAL = int(os.getenv("IMAGE_WARMUP_INTERVAL", "3600"))
+IMAGE_WARMUP_MODULES = int(os.getenv("IMAGE_WARMUP_MODULES", "10"))
+IMAGE_WARMUP_WINDOW_DAYS = int(os.getenv("IMAGE_WARMUP_WINDOW_DAYS", "30"))
+IMAGE_CACHE_BUDGET_MB = int(os.getenv("IMAGE_CACHE_BUDGET_MB", "0"))
+
+# Ports
+# Range host ports are reserved from, random guesses before falling back to
+# scanning the reservations, and how often the worker reconciles them with
+# Docker (seconds, 0 disables it).
+
+HOST_PORT_RANGE_START = int(os.getenv("HOST_PORT_RANGE_START", "49152"))
+HOST_PORT_RANGE_END = int(os.getenv("HOST_PORT_RANGE_END", "65535"))
+HOST_PORT_RANDOM_ATTEMPTS = int(os.getenv("HOST_PORT_RANDOM_ATTEMPTS", "8"))
+PORT_RECONCILE_INTERVAL = int(os.getenv("PORT_RECONCILE_INTERVAL", "300"))
+
+
+# Docker clients
+# Connections kept per Docker host for control calls and, separately, for
+# long-lived streams (events, logs, stats, pulls), the timeout of control
+# calls and how long idle connections of the async client are kept open
+# (seconds). Connection tests use their own, short timeout.
+
+DOCKER_POOL_SIZE = int(os.getenv("DOCKER_POOL_SIZE", "10"))
+DOCKER_STREAM_POOL_SIZE = int(os.getenv("DOCKER_STREAM_POOL_SIZE", "50"))
+DOCKER_TIMEOUT = int(os.getenv("DOCKER_TIMEOUT", "60"))
+DOCKER_KEEPALIVE_EXPIRY = int(os.getenv("DOCKER_KEEPALIVE_EXPIRY", "30"))
+DOCKER_TEST_TIMEOUT = int(os.getenv("DOCKER_TEST_TIMEOUT", "5"))
+
+
+# Cache
+# Holds the instance and module counters of the navigation. A directory,
+# so the web, worker and metrics processes share it; all of them must see
+# the same CACHE_LOCATION. Counters are recounted after the interval
+# (seconds) to repair drift.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / "cache")),
+    }
+}
+COUNTER_RECOUNT_INTERVAL = int(os.getenv("COUNTER_RECOUNT_INTERVAL", "300"))
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
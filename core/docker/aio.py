@@ -0,0 +1,332 @@
+import json
+import struct
+
+import httpx
+from django.conf import settings
+from docker.utils import parse_repository_tag
+
+from core.docker.client import get_docker_base_url
+
+_clients = {}
+
+# Header of a frame in a multiplexed (non-TTY) attach/logs stream:
+# stream type, three padding bytes and the payload size.
+STREAM_HEADER = struct.Struct(">BxxxL")
+
+
+class DockerAPIError(Exception):
+    """Raised when the Docker daemon answers with an error status."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class NotFound(DockerAPIError):
+    pass
+
+
+class AsyncDockerClient:
+    """
+    Minimal asyncio client for the Docker Engine API.
+
+    Talks to the daemon over a unix socket or TCP via httpx, so containers,
+    images, logs, stats and events can be used from the Daphne event loop
+    without a thread per stream. Streams use their own connection pool, so
+    followers never block control calls.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "unix:///var/run/docker.sock",
+        timeout: int | None = None,
+        pool_size: int | None = None,
+        stream_pool_size: int | None = None,
+    ):
+        self.base_url = base_url
+        socket_path = None
+
+        if base_url.startswith("unix://"):
+            socket_path = base_url[len("unix://") :]
+            if not socket_path.startswith("/"):
+                socket_path = f"/{socket_path}"
+            http_url = "http://docker"
+        elif base_url.startswith("tcp://"):
+            http_url = f"http://{base_url[len('tcp://'):]}"
+        else:
+            http_url = base_url
+
+        def http_client(max_connections):
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=settings.DOCKER_KEEPALIVE_EXPIRY,
+            )
+            return httpx.AsyncClient(
+                base_url=http_url,
+                transport=httpx.AsyncHTTPTransport(uds=socket_path, limits=limits),
+                timeout=timeout or settings.DOCKER_TIMEOUT,
+            )
+
+        self._http = http_client(pool_size or settings.DOCKER_POOL_SIZE)
+        self._stream_http = http_client(
+            stream_pool_size or settings.DOCKER_STREAM_POOL_SIZE
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self._http.aclose()
+        await self._stream_http.aclose()
+
+    # Plumbing
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        response = await self._http.request(method, path, **kwargs)
+        await _raise_for_status(response)
+        return response
+
+    async def _json(self, method: str, path: str, **kwargs):
+        response = await self._request(method, path, **kwargs)
+        return response.json() if response.content else None
+
+    async def _stream_json(self, method: str, path: str, **kwargs):
+        """Yield the newline-delimited JSON objects of a streaming endpoint."""
+        async with self._stream_http.stream(
+            method, path, timeout=None, **kwargs
+        ) as response:
+            await _raise_for_status(response)
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    # System
+
+    async def ping(self) -> bool:
+        response = await self._request("GET", "/_ping")
+        return response.text == "OK"
+
+    async def info(self) -> dict:
+        return await self._json("GET", "/info")
+
+    async def events(self, filters: dict | None = None, since: int | None = None):
+        params = {}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        if since is not None:
+            params["since"] = since
+        async for event in self._stream_json("GET", "/events", params=params):
+            yield event
+
+    # Containers
+
+    async def containers(self, all: bool = False, filters: dict | None = None):
+        params = {"all": int(all)}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        return await self._json("GET", "/containers/json", params=params)
+
+    async def inspect_container(self, container: str) -> dict:
+        return await self._json("GET", f"/containers/{container}/json")
+
+    async def create_container(self, config: dict, name: str | None = None) -> dict:
+        params = {"name": name} if name else {}
+        return await self._json(
+            "POST", "/containers/create", params=params, json=config
+        )
+
+    async def start(self, container: str):
+        await self._request("POST", f"/containers/{container}/start")
+
+    async def stop(self, container: str, timeout: int | None = None):
+        params = {"t": timeout} if timeout is not None else {}
+        await self._request(
+            "POST", f"/containers/{container}/stop", params=params, timeout=None
+        )
+
+    async def pause(self, container: str):
+        await self._request("POST", f"/containers/{container}/pause")
+
+    async def unpause(self, container: str):
+        await self._request("POST", f"/containers/{container}/unpause")
+
+    async def remove_container(self, container: str, force: bool = False):
+        await self._request(
+            "DELETE", f"/containers/{container}", params={"force": int(force)}
+        )
+
+    async def wait(self, container: str) -> dict:
+        return await self._json("POST", f"/containers/{container}/wait", timeout=None)
+
+    async def stats(self, container: str, stream: bool = True):
+        """Yield stats payloads; a single one when ``stream`` is False."""
+        params = {"stream": int(stream)}
+        async for stats in self._stream_json(
+            "GET", f"/containers/{container}/stats", params=params
+        ):
+            yield stats
+
+    async def logs(
+        self,
+        container: str,
+        follow: bool = False,
+        tail: int | str = "all",
+        stdout: bool = True,
+        stderr: bool = True,
+    ):
+        """Yield raw log chunks, one per frame written by the container."""
+        tty = (await self.inspect_container(container))["Config"].get("Tty", False)
+        params = {
+            "follow": int(follow),
+            "tail": tail,
+            "stdout": int(stdout),
+            "stderr": int(stderr),
+        }
+        async with self._stream_http.stream(
+            "GET", f"/containers/{container}/logs", params=params, timeout=None
+        ) as response:
+            await _raise_for_status(response)
+            if tty:
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+                return
+
+            buffer = b""
+            async for chunk in response.aiter_bytes():
+                buffer += chunk
+                while len(buffer) >= STREAM_HEADER.size:
+                    _, size = STREAM_HEADER.unpack_from(buffer)
+                    end = STREAM_HEADER.size + size
+                    if len(buffer) < end:
+                        break
+                    yield buffer[STREAM_HEADER.size : end]
+                    buffer = buffer[end:]
+
+    # Images
+
+    async def inspect_image(self, image: str) -> dict:
+        return await self._json("GET", f"/images/{image}/json")
+
+    async def pull(self, image_name: str):
+        """Pull an image and yield the progress messages of the daemon."""
+        repository, tag = parse_repository_tag(image_name)
+        params = {"fromImage": repository, "tag": tag or "latest"}
+        async for progress in self._stream_json(
+            "POST", "/images/create", params=params
+        ):
+            if "error" in progress:
+                raise DockerAPIError(500, progress["error"])
+            yield progress
+
+
+async def _raise_for_status(response: httpx.Response):
+    if response.is_success:
+        return
+
+    await response.aread()
+    try:
+        message = response.json().get("message", response.text)
+    except ValueError:
+        message = response.text
+
+    error_class = NotFound if response.status_code == 404 else DockerAPIError
+    raise error_class(response.status_code, message)
+
+
+def get_async_docker_client(base_url: str | None = None) -> AsyncDockerClient:
+    """
+    Shared async client for a Docker host, by default the host of the
+    blocking client.
+
+    The underlying connection pools belong to the event loop that first uses
+    them, i.e. the Daphne loop.
+    """
+    base_url = base_url or get_docker_base_url()
+    if base_url not in _clients:
+        _clients[base_url] = AsyncDockerClient(base_url)
+    return _clients[base_url]
+
+
+async def pull_image(client: AsyncDockerClient, image_name: str):
+    """Pull an image from Docker Hub."""
+    async for _ in client.pull(image_name):
+        pass
+
+
+# Keyword arguments of ``containers.run`` and their HostConfig keys.
+HOST_CONFIG_LIMITS = {
+    "mem_limit": "Memory",
+    "nano_cpus": "NanoCpus",
+    "pids_limit": "PidsLimit",
+    "blkio_weight": "BlkioWeight",
+}
+
+
+async def start_container(
+    client: AsyncDockerClient,
+    image_name: str,
+    container_name: str,
+    ports: dict[str, int] | None = None,
+    environment: dict[str, str] | None = None,
+    detach: bool = True,
+    restart_policy: dict | None = None,
+    labels: dict[str, str] | None = None,
+    limits: dict | None = None,
+) -> dict:
+    """
+    Create and start a Docker container.
+
+    Takes the same parameters as ``core.docker.client.start_container`` and
+    returns the inspected container. Without ``detach`` the call waits until
+    the container has exited.
+    """
+    ports = ports or {}
+    host_config = {
+        "PortBindings": {
+            container_port: [{"HostPort": str(host_port)}]
+            for container_port, host_port in ports.items()
+        },
+    }
+    if restart_policy:
+        host_config["RestartPolicy"] = restart_policy
+    for key, value in (limits or {}).items():
+        host_config[HOST_CONFIG_LIMITS[key]] = value
+
+    config = {
+        "Image": image_name,
+        "Env": [f"{key}={value}" for key, value in (environment or {}).items()],
+        "Labels": labels or {},
+        "ExposedPorts": {container_port: {} for container_port in ports},
+        "HostConfig": host_config,
+    }
+
+    created = await client.create_container(config, name=container_name)
+    await client.start(created["Id"])
+    if not detach:
+        await client.wait(created["Id"])
+    return await client.inspect_container(created["Id"])
+
+
+async def stop_container(client: AsyncDockerClient, container_name: str):
+    await client.stop(container_name)
+
+
+async def unstop_container(client: AsyncDockerClient, container_name: str):
+    await client.start(container_name)
+
+
+async def destroy_container(client: AsyncDockerClient, container_name: str):
+    await client.remove_container(container_name, force=True)
+
+
+def container_stats(client: AsyncDockerClient, container_name: str):
+    return client.stats(container_name, stream=True)
+
+
+async def container_logs(client: AsyncDockerClient, container_name: str) -> bytes:
+    return b"".join([chunk async for chunk in client.logs(container_name)])
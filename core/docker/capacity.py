@@ -0,0 +1,129 @@
+import logging
+
+from django.conf import settings
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.deployments.models import Instance
+from apps.hosts.models import DockerHost
+from core.docker.client import client_pool
+
+logger = logging.getLogger(__name__)
+
+# Statuses whose instances hold resources on their host. Queued instances
+# wait for room, and paused ones have a stopped container.
+HOLDING_STATUSES = ["pending", "running"]
+
+
+class NoCapacityError(Exception):
+    pass
+
+
+def requested_resources(source) -> dict:
+    """
+    Memory (MiB) and CPU (cores) an instance or module is accounted with:
+    its limits, or the admission defaults where it has none.
+    """
+    return {
+        "memory": source.memory_limit or settings.ADMISSION_DEFAULT_MEMORY_MIB,
+        "cpu": source.cpu_limit or settings.ADMISSION_DEFAULT_CPU,
+    }
+
+
+def host_capacity(host: DockerHost) -> dict:
+    """
+    Memory and CPU a host offers to instances, from ``docker info``: its
+    total minus the share kept for the system, times the overcommit ratio.
+    """
+    info = client_pool.info(host)
+    memory = info.get("MemTotal", 0) / (1024 * 1024) - settings.HOST_RESERVED_MEMORY_MIB
+    return {
+        "memory": max(memory, 0) * settings.HOST_MEMORY_OVERCOMMIT,
+        "cpu": info.get("NCPU", 0) * settings.HOST_CPU_OVERCOMMIT,
+    }
+
+
+def reserved_resources(hosts, exclude=None) -> dict:
+    """
+    Ledger of resources held per host, summed from the limits of their
+    instances in one query. ``exclude`` leaves an instance out, e.g. the one
+    being admitted.
+    """
+    instances = Instance.objects.filter(host__in=hosts, status__in=HOLDING_STATUSES)
+    if exclude is not None:
+        instances = instances.exclude(pk=exclude.pk)
+
+    rows = (
+        instances.values("host")
+        .annotate(
+            memory=Sum(
+                Coalesce(
+                    F("memory_limit"), Value(settings.ADMISSION_DEFAULT_MEMORY_MIB)
+                )
+            ),
+            cpu=Sum(Coalesce(F("cpu_limit"), Value(settings.ADMISSION_DEFAULT_CPU))),
+        )
+        .order_by()
+    )
+    reserved = {host.pk: {"memory": 0, "cpu": 0.0} for host in hosts}
+    for row in rows:
+        reserved[row["host"]] = {"memory": row["memory"], "cpu": row["cpu"]}
+    return reserved
+
+
+def headroom(hosts) -> dict:
+    """Capacity left on every host, per resource; negative if oversubscribed."""
+    reserved = reserved_resources(hosts)
+    result = {}
+    for host in hosts:
+        capacity = host_capacity(host)
+        result[host] = {
+            resource: capacity[resource] - reserved[host.pk][resource]
+            for resource in capacity
+        }
+    return result
+
+
+def fits(free: dict, requested: dict, count: int = 1) -> bool:
+    return all(free[resource] >= requested[resource] * count for resource in free)
+
+
+def free_resources(host: DockerHost, exclude=None) -> dict:
+    """
+    Capacity left on ``host`` for admissions.
+
+    Call it in the transaction that moves instances into a holding status:
+    the host row is locked, so concurrent admissions to the same host are
+    decided one after another against an up-to-date ledger.
+    """
+    DockerHost.objects.select_for_update().filter(pk=host.pk).first()
+    capacity = host_capacity(host)
+    reserved = reserved_resources([host], exclude=exclude)[host.pk]
+    return {resource: capacity[resource] - reserved[resource] for resource in capacity}
+
+
+def admit(host: DockerHost, requested: dict, count: int = 1, exclude=None) -> bool:
+    """
+    Whether ``count`` instances needing ``requested`` fit on ``host`` now;
+    see ``free_resources`` for the transaction to call it in.
+    """
+    free = free_resources(host, exclude=exclude)
+    admitted = fits(free, requested, count)
+    if not admitted:
+        logger.info(
+            f"Not admitting {count} instances to {host}: need {requested} each, "
+            f"{free} free"
+        )
+    return admitted
+
+
+def admission_status(host: DockerHost, requested: dict, count: int = 1) -> str:
+    """
+    Status new instances start with: "pending" if they are admitted, else
+    "queued" or, if ADMISSION_POLICY is "reject", ``NoCapacityError``.
+    """
+    if admit(host, requested, count):
+        return "pending"
+    if settings.ADMISSION_POLICY == "reject":
+        raise NoCapacityError(f"{host} has no capacity left for this deployment")
+    return "queued"
@@ -1,8 +1,36 @@
+import threading
+import time
+
 import docker
+from django.conf import settings
 from docker import DockerClient
+from docker.errors import APIError
 from docker.models.containers import Container
+from docker.utils import parse_repository_tag
 
 _client = None
+_stream_client = None
+_base_url = "tcp://127.0.0.1:2375"
+
+
+def create_docker_client(
+    base_url: str, stream: bool = False, timeout: int | None = None
+) -> DockerClient:
+    """
+    Build a client with the configured connection pool and timeout.
+
+    Long-lived streams (events, logs, stats, pulls) hold a connection each
+    for as long as they run, so they get their own, larger pool and can
+    never use up the connections of short control calls like ``stop``.
+    Idle connections stay open in the pool and are reused (keep-alive).
+    """
+    return docker.DockerClient(
+        base_url=base_url,
+        timeout=timeout or settings.DOCKER_TIMEOUT,
+        max_pool_size=(
+            settings.DOCKER_STREAM_POOL_SIZE if stream else settings.DOCKER_POOL_SIZE
+        ),
+    )
 
 
 def init_docker(host_url: str = "tcp://127.0.0.1:2375", local: bool = False):
@@ -24,22 +52,25 @@ def init_docker(host_url: str = "tcp://127.0.0.1:2375", local: bool = False):
     docker.DockerClient
         An instance of DockerClient connected to the specified Docker host.
     """
-    global _client
+    global _client, _base_url
     if _client is None:
         if local:
-            base_url = "unix://var/run/docker.sock"
-            _client = docker.DockerClient(base_url=base_url)
+            _base_url = "unix://var/run/docker.sock"
         else:
-            _client = docker.DockerClient(base_url=host_url)
+            _base_url = host_url
+        _client = create_docker_client(_base_url)
     return _client
 
 
 def test_client_config(host_url: str = "tcp://127.0.0.1:2375"):
     try:
-        test_client = docker.DockerClient(base_url=host_url)
-        test_client.ping()
-        test_client.close()
-        return True
+        test_client = docker.APIClient(
+            base_url=host_url,
+            version=docker.constants.DEFAULT_DOCKER_API_VERSION,
+            timeout=settings.DOCKER_TEST_TIMEOUT,
+        )
+        with test_client:
+            return test_client.ping()
     except Exception:
         return False
 
@@ -52,16 +83,109 @@ def test_connection():
         return False
 
 
-def get_docker_client():
-    global _client
+class DockerClientPool:
+    """
+    Clients for all configured Docker hosts, keyed by host ID and kind.
+
+    Every host has a control client and a separate stream client, see
+    ``create_docker_client``. Clients connect on first use and are replaced
+    when the host's URL changes. ``is_healthy`` pings a host at most once per ``health_ttl``
+    seconds, ``info`` caches the daemon info for as long.
+    """
+
+    def __init__(self, health_ttl: int = 30):
+        self.health_ttl = health_ttl
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._health = {}
+        self._info = {}
+
+    def get(self, host, stream: bool = False) -> DockerClient:
+        key = (host.pk, stream)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None or entry[0] != host.base_url:
+                if entry:
+                    entry[1].close()
+                entry = (host.base_url, create_docker_client(host.base_url, stream))
+                self._clients[key] = entry
+            return entry[1]
+
+    def discard(self, host_id):
+        with self._lock:
+            entries = [
+                self._clients.pop((host_id, stream), None) for stream in (False, True)
+            ]
+            self._health.pop(host_id, None)
+            self._info.pop(host_id, None)
+        for entry in entries:
+            if entry:
+                entry[1].close()
+
+    def is_healthy(self, host) -> bool:
+        checked_at, healthy = self._health.get(host.pk, (0.0, False))
+        if time.monotonic() - checked_at < self.health_ttl:
+            return healthy
+
+        try:
+            healthy = self.get(host).ping()
+        except Exception:
+            healthy = False
+            self.discard(host.pk)
+        self._health[host.pk] = (time.monotonic(), healthy)
+        return healthy
+
+    def info(self, host) -> dict:
+        fetched_at, info = self._info.get(host.pk, (0.0, None))
+        if info is None or time.monotonic() - fetched_at >= self.health_ttl:
+            info = self.get(host).info()
+            self._info[host.pk] = (time.monotonic(), info)
+        return info
+
+
+client_pool = DockerClientPool()
+
+
+def get_docker_base_url(host=None) -> str:
+    """Base URL of ``host``, or of the Docker host the shared client talks to."""
+    if host is not None:
+        return host.base_url
+    return _base_url
+
+
+def get_docker_client(host=None, stream: bool = False):
+    """
+    Client for ``host``, or the shared client if no host is given. Pass
+    ``stream=True`` for calls that follow a stream.
+    """
+    if host is not None:
+        return client_pool.get(host, stream)
+
+    global _client, _stream_client
     if _client is None:
         _client = init_docker()
-    return _client
+    if not stream:
+        return _client
+    if _stream_client is None:
+        _stream_client = create_docker_client(_base_url, stream=True)
+    return _stream_client
+
 
+def pull_image(client: DockerClient, image_name: str, progress_callback=None):
+    """
+    Pull an image from Docker Hub.
 
-def pull_image(client: DockerClient, image_name: str):
-    """Pull an image from Docker Hub."""
-    client.images.pull(image_name)
+    The pull is streamed; every progress message of the daemon is passed to
+    ``progress_callback`` if one is given.
+    """
+    repository, tag = parse_repository_tag(image_name)
+    for progress in client.api.pull(
+        repository, tag=tag or "latest", stream=True, decode=True
+    ):
+        if "error" in progress:
+            raise APIError(progress["error"])
+        if progress_callback:
+            progress_callback(progress)
 
 
 def build_labels(
@@ -92,6 +216,7 @@ def start_container(
     detach: bool = True,
     restart_policy: dict | None = None,
     labels: dict[str, str] | None = None,
+    limits: dict | None = None,
 ) -> Container:
     """
     Start a Docker container.
@@ -104,6 +229,7 @@ def start_container(
         environment: Environment variables
         detach: Run container in background
         restart_policy: Restart policy dict, e.g. {"Name": "always"}
+        limits: Resource limits, e.g. {"mem_limit": 536870912, "pids_limit": 256}
 
     Returns:
         Container instance
@@ -116,6 +242,7 @@ def start_container(
         detach=detach,
         restart_policy=restart_policy,
         labels=labels,
+        **(limits or {}),
     )
     return container
 
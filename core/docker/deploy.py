@@ -2,19 +2,26 @@ import logging
 import random
 import time
 
-from django.db import connection, close_old_connections
+from django.conf import settings
+from django.db import connection, close_old_connections, transaction
+from docker.errors import NotFound
+
 from apps.deployments.models import Instance
 from apps.hosts.models import DockerHost
+from core.docker.capacity import NoCapacityError, admit, requested_resources
 from core.docker.client import (
     destroy_container,
     get_docker_client,
-    pull_image,
     start_container,
     stop_container,
     unstop_container,
     build_labels,
     container_stats,
 )
+from core.docker.images import image_puller
+from core.docker.inventory import get_container_inventory
+from core.docker.scheduler import NoHostAvailableError
+from core.docker.warmup import evict_images, record_image_use
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,64 +37,110 @@ DOCKER_TO_INSTANCE_STATUS = {
 }
 
 
-def get_image(image_name):
+def get_instance_host(instance):
+    """Host an instance was placed on; older instances fall back to an active one."""
+    return instance.host or DockerHost.objects.filter(active=True).first()
+
+
+def get_image(image_name, on_progress=None, host=None) -> bool:
+    """Make sure ``image_name`` is on ``host``; returns whether it was pulled."""
     try:
-        client = get_docker_client()
-        logger.info(f"Pulling {image_name}...")
-        pull_image(client, image_name)
+        client = get_docker_client(host, stream=True)
+        pulled = image_puller.ensure_image(
+            client, image_name, settings.IMAGE_PULL_POLICY, on_progress
+        )
+        record_image_use(image_name, host)
         logger.info(f"Image {image_name} ready.")
+        return pulled
     except Exception as e:
         logger.exception(f"Pull failed: {image_name} | {e}")
         raise
 
 
-def update_instance_status(instance, container):
-    container.reload()
-    docker_status = container.status.lower().split()[0]
-    instance.status = DOCKER_TO_INSTANCE_STATUS.get(docker_status, "pending")
-    instance.save()
+def keep_images_in_budget(host):
+    """Evict images after a pull; a failure here never fails a deployment."""
+    try:
+        evict_images(host)
+    except Exception:
+        logger.exception(f"Image eviction failed on {host}")
+
+
+def record_pull_progress(instance, min_interval=1.0):
+    """
+    Progress callback that stores the pull summary on the instance, at most
+    once per ``min_interval`` seconds plus once when the pull completes.
+    """
+    last_write = 0.0
+
+    def on_progress(summary):
+        nonlocal last_write
+        now = time.monotonic()
+        if now - last_write < min_interval and summary["percent"] < 100:
+            return
+        last_write = now
+        instance.pull_progress = summary
+        Instance.objects.filter(pk=instance.pk).update(pull_progress=summary)
+
+    return on_progress
+
+
+def update_instance_status(instance, container, host=None):
+    docker_status = get_container_inventory(host).status(container.id)
+    if docker_status is None:
+        raise NotFound(f"Container {container.name} is gone")
+    instance.transition_status(
+        DOCKER_TO_INSTANCE_STATUS.get(docker_status, "pending"),
+        reason=f"docker: {docker_status}",
+    )
     return docker_status
 
 
-def monitor_container(
-    instance, container, max_checks=None, interval=10, ignore_exit_codes=False
-):
-    exit_codes = ["running", "exited", "dead", "failed"]
-    count = 0
-
-    while True:
-        try:
-            status = update_instance_status(instance, container)
-            logger.info(f"[{instance.name}] Status: {status}")
-        except Exception:
-            logger.exception(f"[{instance.name}] Status update failed")
-            break
-
-        if status in exit_codes and not ignore_exit_codes:
-            break
-
-        count += 1
-        if max_checks and count >= max_checks:
-            break
-
-        time.sleep(interval)
-
-
-def deploy_instance(instance_id):
+def admit_instance(instance, host, reason="admitted"):
+    """
+    Move an instance to pending once its host has room for it, or raise
+    ``NoCapacityError`` to retry later. As pending it holds its resources,
+    so the host lock is not needed while its container starts.
+    """
+    if host is None:
+        raise NoHostAvailableError(f"No active Docker host for {instance.name}")
+    with transaction.atomic():
+        if not admit(host, requested_resources(instance), exclude=instance):
+            raise NoCapacityError(f"Waiting for capacity on {host}")
+        instance.transition_status("pending", reason=reason)
+
+
+def deploy_instance(instance_id, replace_existing=False, retry=False):
+    """
+    Start the container of an instance, admitting it to its host first if
+    it is queued. With ``retry`` a failed attempt puts the instance back in
+    the queue, so the next attempt is admitted again, instead of failing it.
+    """
     close_old_connections()
+    instance = Instance.objects.select_related("host").get(id=instance_id)
+    if instance.status == "queued":
+        admit_instance(instance, get_instance_host(instance))
+
     try:
-        instance = Instance.objects.get(id=instance_id)
-        host = DockerHost.objects.get(active=True)
-        logger.info(f"Starting deployment: {instance.name}")
+        host = get_instance_host(instance)
+        logger.info(f"Starting deployment: {instance.name} on {host}")
 
-        client = get_docker_client()
-        get_image(instance.image_name)
+        client = get_docker_client(host)
+        timings = {}
+
+        started = time.monotonic()
+        pulled = get_image(
+            instance.image_name, on_progress=record_pull_progress(instance), host=host
+        )
+        timings["pull"] = round(time.monotonic() - started, 2)
 
         ports = (
             {f"{instance.container_port}/tcp": instance.host_port}
             if instance.container_port
             else None
         )
+        if replace_existing:
+            remove_leftover_container(client, instance.name)
+
         restart_policy = {"Name": instance.default_restart_policy}
         labels = (
             build_labels(
@@ -97,10 +150,11 @@ def deploy_instance(instance_id):
                 instance.pangolin_target_protocol,
                 instance.pangolin_port,
             )
-            if host.pangolin_features
+            if host and host.pangolin_features
             else None
         )
 
+        started = time.monotonic()
         container = start_container(
             client,
             instance.image_name,
@@ -110,81 +164,84 @@ def deploy_instance(instance_id):
             True,
             restart_policy,
             labels,
+            instance.container_limits(),
         )
-        logger.info(f"Container started: {instance.name}")
+        timings["start"] = round(time.monotonic() - started, 2)
+        get_container_inventory(host).refresh_container(container.id)
+        logger.info(f"Container started: {instance.name} | timings: {timings}")
 
-        monitor_container(instance, container)
-        monitor_container(instance, container, max_checks=10, ignore_exit_codes=True)
+        instance.docker_output = {"timings": timings}
+        Instance.objects.filter(pk=instance.pk).update(
+            docker_output=instance.docker_output
+        )
+
+        # Later transitions are picked up by the status reconciler.
+        update_instance_status(instance, container, host)
         logger.info(f"Deployment successful: {instance.name}")
 
+        # Only now is the new image in use and safe from eviction.
+        if pulled:
+            keep_images_in_budget(host)
+
     except Exception as e:
         logger.exception(f"Deployment failed for ID {instance_id}")
         close_old_connections()
         instance = Instance.objects.get(id=instance_id)
-        instance.status = "failed"
-        instance.docker_output = {"error": str(e)}
-        instance.save()
+        if retry:
+            instance.transition_status("queued", reason="deploy failed, retrying")
+        else:
+            instance.transition_status("failed", reason="deploy failed")
+        Instance.objects.filter(pk=instance.pk).update(docker_output={"error": str(e)})
+        raise
     finally:
         close_old_connections()
 
 
-def pause_instance(instance_id):
+def remove_leftover_container(client, container_name):
+    """Remove a container a failed deployment attempt left behind."""
+    try:
+        destroy_container(client, container_name)
+        logger.info(f"Removed leftover container: {container_name}")
+    except NotFound:
+        pass
+
+
+def pause_instance(instance_id, reason="paused by user"):
     instance = Instance.objects.get(id=instance_id)
-    client = get_docker_client()
+    client = get_docker_client(get_instance_host(instance))
     stop_container(client, instance.name)
-    instance.status = "paused"
-    instance.save()
+    instance.transition_status("paused", reason=reason)
     logger.info(f"Paused: {instance.name}")
 
 
 def unpause_instance(instance_id):
-    instance = Instance.objects.get(id=instance_id)
-    client = get_docker_client()
-    unstop_container(client, instance.name)
-    instance.status = "running"
-    instance.save()
+    instance = Instance.objects.select_related("host").get(id=instance_id)
+    host = get_instance_host(instance)
+    # A started container holds resources again, so it needs admission too.
+    admit_instance(instance, host, reason="admitted to unpause")
+    try:
+        unstop_container(get_docker_client(host), instance.name)
+    except Exception:
+        instance.transition_status("paused", reason="unpause failed")
+        raise
+    instance.transition_status("running", reason="unpaused by user")
     logger.info(f"Unpaused: {instance.name}")
 
 
 def destroy_instance(instance_id):
     instance = Instance.objects.get(id=instance_id)
-    client = get_docker_client()
+    client = get_docker_client(get_instance_host(instance))
     try:
         destroy_container(client, instance.name)
         Instance.objects.filter(id=instance_id).delete()
         logger.info(f"Destroyed: {instance.name}")
     except Exception:
         logger.exception(f"Destroy failed: {instance.name}")
+        raise
 
 
-def get_allocated_ports():
-    client = get_docker_client()
-    containers = client.containers.list()
-    used_ports = set()
-    for container in containers:
-        container.reload()
-        ports = container.attrs["NetworkSettings"]["Ports"] or {}
-        for container_port, host_bindings in ports.items():
-            if host_bindings:
-                for binding in host_bindings:
-                    host_port = binding.get("HostPort")
-                    if host_port:
-                        used_ports.add(int(host_port))
-    return used_ports
-
-
-def get_random_free_port():
-    range_lower = 49152
-    range_upper = 65535
-    while True:
-        port = random.randint(range_lower, range_upper)
-        if port not in get_allocated_ports():
-            return port
-
-
-def set_pangolin_labels(instance_id, container_secured_backend):
-    instance = Instance.objects.get(id=instance_id)
-    host = DockerHost.objects.get(active=True)
+def apply_pangolin_labels(instance, host, container_secured_backend):
+    """Fill in the Pangolin fields of an instance without saving it."""
     pangolin_name = instance.name.replace(" ", "_")
     rand_id = random.randint(1000, 9999)
     domain = f"{instance.owner.username}-{instance.module.name}-{rand_id}.{host.default_domain}".replace(
@@ -196,10 +253,17 @@ def set_pangolin_labels(instance_id, container_secured_backend):
     instance.pangolin_protocol = "http"
     instance.pangolin_target_protocol = "https" if container_secured_backend else "http"
     instance.pangolin_port = instance.host_port
+
+
+def set_pangolin_labels(instance_id, container_secured_backend):
+    instance = Instance.objects.get(id=instance_id)
+    apply_pangolin_labels(
+        instance, get_instance_host(instance), container_secured_backend
+    )
     instance.save()
 
 
 def get_instance_stats(instance_id):
     instance = Instance.objects.get(id=instance_id)
-    client = get_docker_client()
+    client = get_docker_client(get_instance_host(instance), stream=True)
     return container_stats(client, instance.name)
@@ -0,0 +1,146 @@
+import logging
+import threading
+
+from django.db import close_old_connections
+
+from apps.hosts.models import DockerHost
+from core.docker.client import get_docker_client
+
+logger = logging.getLogger(__name__)
+
+# Container event actions mapped to the Docker state they leave the container in.
+EVENT_TO_DOCKER_STATUS = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+    "destroy": "removing",
+    "health_status: healthy": "running",
+}
+
+# Container event actions that leave the container in place but its
+# instance broken, mapped to the reason recorded with the failure.
+EVENT_TO_FAILURE = {
+    "oom": "out of memory",
+    "health_status: unhealthy": "health check failing",
+}
+
+
+def _parse_container_event(event: dict, mapping: dict) -> tuple[str, str, str] | None:
+    if event.get("Type") != "container":
+        return None
+
+    value = mapping.get(event.get("Action", ""))
+    if value is None:
+        return None
+
+    actor = event.get("Actor", {})
+    name = actor.get("Attributes", {}).get("name")
+    if not name:
+        return None
+
+    return name, actor.get("ID", ""), value
+
+
+def container_event_status(event: dict) -> tuple[str, str, str] | None:
+    """
+    Extract the container name, ID and resulting Docker status from an event.
+
+    Returns None for events that are not container state changes,
+    e.g. exec or attach events.
+    """
+    return _parse_container_event(event, EVENT_TO_DOCKER_STATUS)
+
+
+def container_event_failure(event: dict) -> tuple[str, str, str] | None:
+    """
+    Extract the container name, ID and failure reason from an OOM kill or a
+    failing health check; None for every other event.
+    """
+    return _parse_container_event(event, EVENT_TO_FAILURE)
+
+
+def watch_container_events(
+    callback,
+    stop_event: threading.Event | None = None,
+    retry_interval: int = 5,
+    host=None,
+):
+    """
+    Block and feed every Docker container event of ``host`` into ``callback``.
+
+    The stream is reopened after errors (daemon restarts, host changes),
+    resuming from the last seen event so no transition is lost.
+    """
+    stop_event = stop_event or threading.Event()
+    since = None
+
+    while not stop_event.is_set():
+        try:
+            client = get_docker_client(host, stream=True)
+            stream = client.events(
+                decode=True, filters={"type": "container"}, since=since
+            )
+            for event in stream:
+                since = event.get("time", since)
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception("Handling Docker event failed")
+                if stop_event.is_set():
+                    break
+        except Exception:
+            logger.exception("Docker event stream interrupted")
+
+        stop_event.wait(retry_interval)
+
+
+def watch_all_hosts(
+    callback, stop_event: threading.Event, refresh_interval: int = 30, name="events"
+):
+    """
+    Block and follow the events of every active Docker host, one thread per
+    host, feeding ``callback(host, event)``.
+
+    Every ``refresh_interval`` seconds hosts activated later are picked up
+    and the watchers of deactivated hosts are stopped.
+    """
+    watchers = {}
+    while not stop_event.is_set():
+        close_old_connections()
+        try:
+            hosts = list(DockerHost.objects.filter(active=True))
+        except Exception:
+            logger.exception("Loading Docker hosts failed")
+            hosts = None
+
+        if hosts is not None:
+            active = {host.pk for host in hosts}
+            for pk in list(watchers):
+                if pk not in active:
+                    watchers.pop(pk)[1].set()
+
+        for host in hosts or []:
+            if host.pk in watchers and watchers[host.pk][0].is_alive():
+                continue
+            host_stop_event = threading.Event()
+            thread = threading.Thread(
+                target=watch_container_events,
+                args=(
+                    lambda event, host=host: callback(host, event),
+                    host_stop_event,
+                ),
+                kwargs={"host": host},
+                name=f"{name}-{host.name}",
+                daemon=True,
+            )
+            watchers[host.pk] = (thread, host_stop_event)
+            thread.start()
+
+        stop_event.wait(refresh_interval)
+
+    for _, host_stop_event in watchers.values():
+        host_stop_event.set()
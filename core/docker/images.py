@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from docker import DockerClient
+from docker.errors import ImageNotFound
+from docker.utils import parse_repository_tag
+
+from core.docker.client import pull_image
+
+logger = logging.getLogger(__name__)
+
+# "always" pulls on every deploy, "if-not-present" only pulls missing images
+# and "auto" additionally re-checks mutable references (untagged or :latest).
+PULL_POLICIES = ["always", "if-not-present", "auto"]
+
+
+def is_mutable_reference(image_name: str) -> bool:
+    _, tag = parse_repository_tag(image_name)
+    return tag is None or tag == "latest"
+
+
+class PullProgress:
+    """
+    Aggregates the per-layer messages of a streaming pull into one record.
+
+    ``summary()`` returns the layer count, finished layers and downloaded
+    versus total bytes of the layers whose size is known so far.
+    """
+
+    FINISHED_STATUSES = ("Pull complete", "Already exists")
+
+    def __init__(self):
+        self.layers = {}
+
+    def update(self, message: dict):
+        layer_id = message.get("id")
+        detail = message.get("progressDetail") or {}
+        status = message.get("status", "")
+        # Messages without an ID or about the reference itself carry no layer.
+        if not layer_id or status.startswith("Pulling from"):
+            return
+
+        layer = self.layers.setdefault(
+            layer_id, {"current": 0, "total": 0, "finished": False}
+        )
+        if status in self.FINISHED_STATUSES:
+            layer["finished"] = True
+            layer["current"] = layer["total"]
+        elif status == "Downloading" and detail.get("total"):
+            layer["current"] = detail.get("current", 0)
+            layer["total"] = detail["total"]
+
+    def summary(self) -> dict:
+        current = sum(layer["current"] for layer in self.layers.values())
+        total = sum(layer["total"] for layer in self.layers.values())
+        finished = sum(layer["finished"] for layer in self.layers.values())
+        if self.layers and finished == len(self.layers):
+            percent = 100.0
+        else:
+            percent = round(current / total * 100, 1) if total else 0.0
+
+        return {
+            "layers": len(self.layers),
+            "finished": finished,
+            "current": current,
+            "total": total,
+            "percent": percent,
+        }
+
+
+class ImagePullCoordinator:
+    """
+    Makes sure images are present before containers start, pulling each
+    reference at most once at a time.
+
+    Concurrent requests for the same image on the same host share one
+    in-flight pull, and images known to be present are not inspected again
+    until ``presence_ttl`` expires. Every caller of a shared pull receives its
+    progress through its own ``on_progress`` callback.
+    """
+
+    def __init__(self, presence_ttl: int = 300, history_size: int = 100):
+        self.presence_ttl = presence_ttl
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._listeners = {}
+        self._present = {}
+        self.pull_durations = deque(maxlen=history_size)
+
+    def _is_present(self, client: DockerClient, key) -> bool:
+        checked_at = self._present.get(key)
+        if checked_at and time.monotonic() - checked_at < self.presence_ttl:
+            return True
+
+        try:
+            client.images.get(key[1])
+        except ImageNotFound:
+            return False
+        self._present[key] = time.monotonic()
+        return True
+
+    def forget(self, client: DockerClient, image_name: str):
+        """Drop the cached presence of an image, e.g. after removing it."""
+        self._present.pop((client.api.base_url, image_name), None)
+
+    def needs_pull(self, client: DockerClient, image_name: str, policy: str) -> bool:
+        if policy == "always":
+            return True
+        if not self._is_present(client, (client.api.base_url, image_name)):
+            return True
+        return policy == "auto" and is_mutable_reference(image_name)
+
+    def ensure_image(
+        self,
+        client: DockerClient,
+        image_name: str,
+        policy: str = "auto",
+        on_progress=None,
+    ) -> bool:
+        """
+        Pull ``image_name`` if the policy asks for it. Returns whether a pull
+        was started or joined.
+        """
+        if not self.needs_pull(client, image_name, policy):
+            logger.info(f"Image {image_name} already present, skipping pull.")
+            return False
+
+        key = (client.api.base_url, image_name)
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self._listeners[key] = []
+            if on_progress:
+                self._listeners[key].append(on_progress)
+
+        if not owner:
+            logger.info(f"Waiting for running pull of {image_name}...")
+            future.result()
+            return True
+
+        progress = PullProgress()
+
+        def publish(message):
+            progress.update(message)
+            summary = progress.summary()
+            for listener in list(self._listeners[key]):
+                try:
+                    listener(summary)
+                except Exception:
+                    logger.exception(f"Pull progress listener failed: {image_name}")
+
+        try:
+            started = time.monotonic()
+            logger.info(f"Pulling {image_name}...")
+            pull_image(client, image_name, progress_callback=publish)
+            duration = time.monotonic() - started
+
+            self._present[key] = time.monotonic()
+            self.pull_durations.append((image_name, duration))
+            logger.info(f"Image {image_name} pulled in {duration:.1f}s.")
+            future.set_result(duration)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                del self._listeners[key]
+        return True
+
+
+image_puller = ImagePullCoordinator()
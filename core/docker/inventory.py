@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+
+from core.docker.client import get_docker_base_url, get_docker_client
+from core.docker.events import container_event_status
+
+logger = logging.getLogger(__name__)
+
+
+def summarize_container(container: dict) -> dict:
+    """Reduce an entry of ``/containers/json`` to what Heimwerk looks at."""
+    names = container.get("Names") or []
+    return {
+        "id": container["Id"],
+        "name": names[0].lstrip("/") if names else container["Id"][:12],
+        "status": container.get("State", ""),
+        "image_id": container.get("ImageID", ""),
+        "ports": sorted(
+            {
+                port["PublicPort"]
+                for port in container.get("Ports") or []
+                if port.get("PublicPort")
+            }
+        ),
+        "labels": container.get("Labels") or {},
+    }
+
+
+class ContainerInventory:
+    """
+    Snapshot of all containers on a Docker host, indexed by name and ID.
+
+    A refresh is a single ``/containers/json?all=1`` call, however many
+    containers exist, and is repeated once the snapshot is older than
+    ``max_age`` seconds. In between, status changes from the events stream
+    are applied through ``apply_event``; events for unknown containers mark
+    the snapshot stale instead.
+    """
+
+    def __init__(self, host=None, max_age: float = 15):
+        self.host = host
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_name = {}
+        self._base_url = None
+        self._refreshed_at = 0.0
+
+    def _is_stale(self, max_age) -> bool:
+        max_age = self.max_age if max_age is None else max_age
+        return (
+            self._base_url != get_docker_base_url(self.host)
+            or time.monotonic() - self._refreshed_at >= max_age
+        )
+
+    def refresh(self):
+        client = get_docker_client(self.host)
+        containers = [
+            summarize_container(container)
+            for container in client.api.containers(all=True)
+        ]
+        with self._lock:
+            self._by_id = {container["id"]: container for container in containers}
+            self._by_name = {container["name"]: container for container in containers}
+            self._base_url = get_docker_base_url(self.host)
+            self._refreshed_at = time.monotonic()
+
+    def refresh_container(self, container_id: str):
+        """
+        Update the entry of one container, e.g. after creating it, with a
+        listing filtered to its ID instead of refreshing the whole snapshot.
+        """
+        if self._is_stale(None):
+            return
+        client = get_docker_client(self.host)
+        found = [
+            summarize_container(container)
+            for container in client.api.containers(
+                all=True, filters={"id": container_id}
+            )
+        ]
+        with self._lock:
+            for container in found:
+                self._by_id[container["id"]] = container
+                self._by_name[container["name"]] = container
+
+    def containers(self, max_age: float | None = None) -> list[dict]:
+        """All containers, refreshed first if older than ``max_age`` seconds."""
+        if self._is_stale(max_age):
+            self.refresh()
+        with self._lock:
+            return list(self._by_id.values())
+
+    def get(self, name_or_id: str, max_age: float | None = None) -> dict | None:
+        if self._is_stale(max_age):
+            self.refresh()
+        with self._lock:
+            return self._by_name.get(name_or_id) or self._by_id.get(name_or_id)
+
+    def status(self, name_or_id: str) -> str | None:
+        """Docker state of a container, e.g. "running", or None if it is gone."""
+        container = self.get(name_or_id)
+        return container["status"] if container else None
+
+    def published_ports(self, max_age: float | None = None) -> set[int]:
+        return {
+            port
+            for container in self.containers(max_age)
+            for port in container["ports"]
+        }
+
+    def apply_event(self, event: dict):
+        parsed = container_event_status(event)
+        if parsed is None:
+            return
+
+        name, container_id, docker_status = parsed
+        with self._lock:
+            container = self._by_id.get(container_id) or self._by_name.get(name)
+            if container is None:
+                if docker_status != "removing":
+                    self._refreshed_at = 0.0
+                return
+
+            if docker_status == "removing":
+                self._by_id.pop(container["id"], None)
+                self._by_name.pop(container["name"], None)
+            else:
+                container["status"] = docker_status
+
+
+_inventories = {}
+
+
+def get_container_inventory(host=None) -> ContainerInventory:
+    """Shared inventory of ``host``, or of the shared client's Docker host."""
+    key = host.pk if host is not None else None
+    inventory = _inventories.get(key)
+    if inventory is None:
+        inventory = _inventories[key] = ContainerInventory(host)
+    elif host is not None:
+        inventory.host = host
+    return inventory
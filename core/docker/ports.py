@@ -0,0 +1,146 @@
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.deployments.models import Instance
+from apps.hosts.models import DockerHost, PortReservation
+from core.docker.inventory import get_container_inventory
+
+logger = logging.getLogger(__name__)
+
+
+class NoFreePortError(Exception):
+    pass
+
+
+def port_range() -> range:
+    return range(settings.HOST_PORT_RANGE_START, settings.HOST_PORT_RANGE_END + 1)
+
+
+def _try_reserve(host, port, instance) -> PortReservation | None:
+    try:
+        with transaction.atomic():
+            return PortReservation.objects.create(
+                host=host, port=port, instance=instance
+            )
+    except IntegrityError:
+        return None
+
+
+def reserve_port(instance: Instance, host: DockerHost | None = None) -> int:
+    """
+    Reserve a free host port for ``instance`` and store it as its host port.
+
+    Random guesses are claimed by inserting them directly, which costs one
+    indexed insert per guess and cannot hand out a port twice. Only when the
+    range is crowded are the free ports computed from the reservations.
+    """
+    host = host or instance.host or DockerHost.objects.filter(active=True).first()
+    if host is None:
+        raise NoFreePortError("No active Docker host to reserve a port on")
+    ports = port_range()
+
+    reservation = None
+    for _ in range(settings.HOST_PORT_RANDOM_ATTEMPTS):
+        reservation = _try_reserve(host, random.choice(ports), instance)
+        if reservation:
+            break
+
+    while reservation is None:
+        reserved = set(host.port_reservations.values_list("port", flat=True))
+        free = [port for port in ports if port not in reserved]
+        if not free:
+            raise NoFreePortError(f"No free port left on {host}")
+        reservation = _try_reserve(host, random.choice(free), instance)
+
+    instance.host_port = reservation.port
+    Instance.objects.filter(id=instance.id).update(host_port=reservation.port)
+    return reservation.port
+
+
+def reserve_ports(instances: list[Instance], host: DockerHost) -> list[int]:
+    """
+    Reserve one free host port per instance on ``host`` with a single bulk
+    insert, and store them as their host ports.
+
+    The free ports are computed once from the reservations; if a concurrent
+    reservation takes one of them in the meantime, the batch is retried.
+    """
+    ports = port_range()
+    for _ in range(settings.HOST_PORT_RANDOM_ATTEMPTS):
+        reserved = set(host.port_reservations.values_list("port", flat=True))
+        free = [port for port in ports if port not in reserved]
+        if len(free) < len(instances):
+            raise NoFreePortError(
+                f"Only {len(free)} free ports left on {host}, {len(instances)} needed"
+            )
+
+        chosen = random.sample(free, len(instances))
+        try:
+            with transaction.atomic():
+                PortReservation.objects.bulk_create(
+                    PortReservation(host=host, port=port, instance=instance)
+                    for port, instance in zip(chosen, instances)
+                )
+        except IntegrityError:
+            continue
+
+        for port, instance in zip(chosen, instances):
+            instance.host_port = port
+        Instance.objects.bulk_update(instances, ["host_port"])
+        return chosen
+
+    raise NoFreePortError(f"Could not reserve {len(instances)} ports on {host}")
+
+
+def reconcile_ports(host: DockerHost | None = None, grace: int = 300) -> dict:
+    """
+    Bring the reservations of a host, by default of every active host, in
+    line with Docker.
+
+    Ports published by containers Heimwerk does not know are reserved so they
+    are never handed out, instances from before the ledger get their
+    reservation, and unowned reservations of ports no longer in use are
+    released once they are older than ``grace`` seconds.
+    """
+    if host is None:
+        totals = {"added": 0, "released": 0}
+        for active_host in DockerHost.objects.filter(active=True):
+            result = reconcile_ports(active_host, grace)
+            totals = {key: totals[key] + result[key] for key in totals}
+        return totals
+
+    in_use = get_container_inventory(host).published_ports(max_age=0)
+    reservations = host.port_reservations.all()
+    reserved = set(reservations.values_list("port", flat=True))
+
+    missing = Instance.objects.filter(
+        host=host, host_port__isnull=False, port_reservation__isnull=True
+    ).exclude(host_port__in=reserved)
+    new = [
+        PortReservation(host=host, port=instance.host_port, instance=instance)
+        for instance in missing
+    ]
+    reserved.update(reservation.port for reservation in new)
+    new += [
+        PortReservation(host=host, port=port)
+        for port in in_use - reserved
+        if port in port_range()
+    ]
+    PortReservation.objects.bulk_create(new, ignore_conflicts=True)
+
+    released, _ = (
+        reservations.filter(
+            instance__isnull=True,
+            reserved_at__lt=timezone.now() - timedelta(seconds=grace),
+        )
+        .exclude(port__in=in_use)
+        .delete()
+    )
+    if new or released:
+        logger.info(f"Reconciled ports on {host}: +{len(new)} -{released}")
+    return {"added": len(new), "released": released}
@@ -0,0 +1,103 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from apps.deployments.models import InstanceMetric
+from apps.hosts.models import DockerHost
+from core.docker.capacity import fits, headroom
+from core.docker.client import client_pool
+from core.docker.ports import port_range
+
+logger = logging.getLogger(__name__)
+
+
+class NoHostAvailableError(Exception):
+    pass
+
+
+def recent_usage(hosts, window: int = 300) -> dict:
+    """
+    CPU (100 per core) and memory (MiB) used per host, from the raw metric
+    samples of the last ``window`` seconds, averaged per instance.
+    """
+    samples = (
+        InstanceMetric.objects.filter(
+            instance__host__in=hosts,
+            instance__status="running",
+            resolution=InstanceMetric.RESOLUTION_RAW,
+            timestamp__gte=timezone.now() - timedelta(seconds=window),
+        )
+        .values("instance__host", "instance")
+        .annotate(cpu=Avg("cpu_percent"), memory=Avg("memory_mib"))
+        .order_by()
+    )
+
+    usage = defaultdict(lambda: {"cpu": 0.0, "memory": 0.0})
+    for sample in samples:
+        usage[sample["instance__host"]]["cpu"] += sample["cpu"]
+        usage[sample["instance__host"]]["memory"] += sample["memory"]
+    return usage
+
+
+def host_scores(hosts) -> dict:
+    """
+    Free share of CPU, memory and ports of every healthy host, between 0
+    and 1. Unreachable hosts are left out.
+    """
+    usage = recent_usage(hosts)
+    reserved_ports = dict(
+        DockerHost.objects.filter(pk__in=[host.pk for host in hosts])
+        .annotate(ports=Count("port_reservations"))
+        .values_list("pk", "ports")
+    )
+    port_count = len(port_range())
+
+    scores = {}
+    for host in hosts:
+        if not client_pool.is_healthy(host):
+            logger.warning(f"Skipping unreachable Docker host: {host}")
+            continue
+
+        info = client_pool.info(host)
+        cpu_capacity = info.get("NCPU", 1) * 100
+        memory_capacity = info.get("MemTotal", 0) / (1024 * 1024) or 1
+        scores[host] = {
+            "cpu": max(1 - usage[host.pk]["cpu"] / cpu_capacity, 0),
+            "memory": max(1 - usage[host.pk]["memory"] / memory_capacity, 0),
+            "ports": max(1 - reserved_ports.get(host.pk, 0) / port_count, 0),
+        }
+    return scores
+
+
+def pick_host(requested: dict | None = None, count: int = 1) -> DockerHost:
+    """
+    Active host with the most headroom for a new instance.
+
+    Hosts are ranked by their scarcest resource, so a host with plenty of
+    memory but no free CPU is not preferred; ties go to the host with more
+    free resources overall. Given the ``requested`` memory and CPU, hosts
+    whose ledger still has room for ``count`` such instances come first;
+    if none has, admission decides what happens on the chosen one.
+    """
+    hosts = list(DockerHost.objects.filter(active=True))
+    scores = {
+        host: score for host, score in host_scores(hosts).items() if score["ports"] > 0
+    }
+    if not scores:
+        raise NoHostAvailableError("No active Docker host has capacity left")
+
+    if requested:
+        free = headroom(list(scores))
+        scores = {
+            host: score
+            for host, score in scores.items()
+            if fits(free[host], requested, count)
+        } or scores
+
+    return max(
+        scores,
+        key=lambda host: (min(scores[host].values()), sum(scores[host].values())),
+    )
@@ -0,0 +1,60 @@
+def summarize_stats(stats: dict) -> dict | None:
+    """
+    Reduce a raw Docker stats payload to the values shown to users.
+
+    CPU usage is the delta against the previous reading embedded in the same
+    payload, memory excludes the page cache. Returns None for payloads that
+    do not carry both CPU readings yet, e.g. the first one of a stream.
+    """
+    if "cpu_stats" not in stats or "precpu_stats" not in stats:
+        return None
+
+    cpu_percent = calculate_cpu_percent(stats["cpu_stats"], stats["precpu_stats"])
+
+    return {
+        "memory_mib": calculate_memory_mib(stats),
+        "cpu_percent": round(cpu_percent, 2),
+    }
+
+
+def calculate_cpu_percent(cpu_stats: dict, precpu_stats: dict) -> float:
+    """CPU usage between two ``cpu_stats`` readings, 100 per busy core."""
+    total_usage = cpu_stats.get("cpu_usage", {}).get("total_usage", 0)
+    previous_usage = precpu_stats.get("cpu_usage", {}).get("total_usage", 0)
+    cpu_delta = total_usage - previous_usage
+    system_delta = cpu_stats.get("system_cpu_usage", 0) - precpu_stats.get(
+        "system_cpu_usage", 0
+    )
+
+    if system_delta > 0.0 and cpu_delta > 0.0:
+        online_cpus = cpu_stats.get("online_cpus", 1)
+        return (cpu_delta / system_delta) * online_cpus * 100.0
+    return 0.0
+
+
+def calculate_memory_mib(stats: dict) -> float:
+    """Memory in use without the inactive page cache, in MiB."""
+    mem_stats = stats.get("memory_stats", {})
+    usage = mem_stats.get("usage", 0)
+    inactive_file = mem_stats.get("stats", {}).get("inactive_file", 0)
+    return round((usage - inactive_file) / (1024 * 1024), 2)
+
+
+def io_counters(stats: dict) -> dict[str, int]:
+    """Cumulative network and block I/O byte counters of a stats payload."""
+    networks = (stats.get("networks") or {}).values()
+    blkio = (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+
+    def blkio_total(op):
+        return sum(
+            entry.get("value", 0)
+            for entry in blkio
+            if entry.get("op", "").lower() == op
+        )
+
+    return {
+        "net_rx_bytes": sum(network.get("rx_bytes", 0) for network in networks),
+        "net_tx_bytes": sum(network.get("tx_bytes", 0) for network in networks),
+        "blk_read_bytes": blkio_total("read"),
+        "blk_write_bytes": blkio_total("write"),
+    }
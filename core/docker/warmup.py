@@ -0,0 +1,141 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+from docker.errors import ImageNotFound
+from docker.utils import parse_repository_tag
+
+from apps.catalog.models import Module
+from apps.deployments.models import Job
+from apps.hosts.models import CachedImage, DockerHost
+from core.docker.client import get_docker_client
+from core.docker.images import image_puller
+from core.docker.inventory import get_container_inventory
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_image_name(image_name: str) -> str:
+    """Image reference as listed in ``RepoTags``, e.g. nginx -> nginx:latest."""
+    repository, tag = parse_repository_tag(image_name)
+    if tag and tag.startswith("sha256:"):
+        return f"{repository}@{tag}"
+    return f"{repository}:{tag or 'latest'}"
+
+
+def record_image_use(image_name: str, host: DockerHost | None, used: bool = True):
+    """
+    Track an image pulled onto a host. Deployments mark it as used, warm-ups
+    only register it.
+    """
+    if host is None:
+        return
+
+    try:
+        size = get_docker_client(host).images.get(image_name).attrs.get("Size", 0)
+    except ImageNotFound:
+        return
+
+    defaults = {"size_bytes": size}
+    if used:
+        defaults["last_used_at"] = timezone.now()
+    CachedImage.objects.update_or_create(
+        host=host, image_name=image_name, defaults=defaults
+    )
+
+
+def warm_image(image_name: str, host: DockerHost | None):
+    """Pre-pull an image onto a host and keep its image cache in budget."""
+    image_puller.ensure_image(
+        get_docker_client(host, stream=True), image_name, settings.IMAGE_PULL_POLICY
+    )
+    record_image_use(image_name, host, used=False)
+    evict_images(host)
+
+
+def schedule_image_warmup():
+    """
+    Queue warm-up jobs for the images of the most deployed modules, except
+    on hosts that are already warming them.
+    """
+    from apps.deployments.jobs import enqueue_job
+
+    since = timezone.now() - timedelta(days=settings.IMAGE_WARMUP_WINDOW_DAYS)
+    image_names = list(
+        Module.objects.annotate(
+            recent_deploys=Count(
+                "instances", filter=Q(instances__created_at__gte=since)
+            )
+        )
+        .filter(recent_deploys__gt=0)
+        .order_by("-recent_deploys")
+        .values_list("image_name", flat=True)[: settings.IMAGE_WARMUP_MODULES]
+    )
+    hosts = list(DockerHost.objects.filter(active=True))
+    warming = set(
+        Job.objects.filter(
+            action="warm",
+            image_name__in=image_names,
+            status__in=["queued", "running"],
+        ).values_list("host_id", "image_name")
+    )
+    for image_name in set(image_names):
+        for host in hosts:
+            if (host.pk, image_name) not in warming:
+                enqueue_job("warm", host=host, image_name=image_name)
+
+
+def evict_images(host: DockerHost | None, budget_mb: int | None = None) -> list[str]:
+    """
+    Remove the least recently used tracked images of a host until they fit
+    into the disk budget. Images used by any container are kept, and images
+    Heimwerk did not pull are never touched.
+    """
+    budget_mb = settings.IMAGE_CACHE_BUDGET_MB if budget_mb is None else budget_mb
+    if not budget_mb or host is None:
+        return []
+
+    client = get_docker_client(host)
+    local_images = {
+        tag: image for image in client.api.images() for tag in image["RepoTags"] or []
+    }
+    in_use = {
+        container["image_id"]
+        for container in get_container_inventory(host).containers(max_age=0)
+    }
+
+    cached = list(CachedImage.objects.filter(host=host))
+    present = {}
+    for entry in cached:
+        image = local_images.get(normalize_image_name(entry.image_name))
+        if image is None:
+            entry.delete()
+        else:
+            present[entry.pk] = image
+
+    total = sum(image["Size"] for image in present.values())
+    budget = budget_mb * 1024 * 1024
+    evicted = []
+
+    for entry in cached:
+        if total <= budget:
+            break
+        image = present.get(entry.pk)
+        if image is None or image["Id"] in in_use:
+            continue
+
+        try:
+            client.api.remove_image(entry.image_name)
+        except Exception as e:
+            logger.warning(f"Evicting {entry.image_name} failed | {e}")
+            continue
+
+        image_puller.forget(client, entry.image_name)
+        entry.delete()
+        total -= image["Size"]
+        evicted.append(entry.image_name)
+        logger.info(f"Evicted image {entry.image_name}")
+
+    return evicted
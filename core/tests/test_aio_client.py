@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import SimpleTestCase
+
+from core.docker import aio
+from core.docker.aio import STREAM_HEADER, AsyncDockerClient, NotFound
+
+
+def json_lines(*objects):
+    return b"".join(json.dumps(obj).encode() + b"\n" for obj in objects)
+
+
+class FakeDockerDaemon:
+    """Answers a handful of Engine API routes over a unix socket."""
+
+    def __init__(self):
+        self.requests = []
+        self.containers = {}
+
+    def route(self, method, path, query, body):
+        if path == "/_ping":
+            return 200, b"OK"
+        if path == "/containers/create":
+            name = query["name"][0]
+            self.containers[name] = {"config": json.loads(body), "status": "created"}
+            return 201, json.dumps({"Id": name}).encode()
+        if path == "/events":
+            return 200, json_lines(
+                {"Type": "container", "Action": "start"},
+                {"Type": "container", "Action": "die"},
+            )
+        if path == "/images/create":
+            return 200, json_lines(
+                {"status": "Downloading", "id": "a1"},
+                {"status": "Pull complete", "id": "a1"},
+            )
+
+        parts = path.strip("/").split("/")
+        if parts[0] != "containers" or parts[1] not in self.containers:
+            return 404, json.dumps({"message": "No such container"}).encode()
+
+        container = self.containers[parts[1]]
+        action = parts[2] if len(parts) > 2 else ""
+        if action in ("start", "stop"):
+            container["status"] = "running" if action == "start" else "exited"
+            return 204, b""
+        if action == "json":
+            return (
+                200,
+                json.dumps(
+                    {
+                        "Id": parts[1],
+                        "Config": {"Tty": False},
+                        "State": {"Status": container["status"]},
+                    }
+                ).encode(),
+            )
+        if action == "stats":
+            return 200, json_lines({"read": "1"}, {"read": "2"})
+        if action == "logs":
+            return 200, b"".join(
+                STREAM_HEADER.pack(stream, len(line)) + line
+                for stream, line in ((1, b"hello\n"), (2, b"oops\n"))
+            )
+        return 404, b"{}"
+
+    async def handle(self, reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_line, *header_lines = head.decode().split("\r\n")
+        method, target, _ = request_line.split(" ")
+        headers = dict(
+            line.lower().split(": ", 1) for line in header_lines if ": " in line
+        )
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        url = urlsplit(target)
+        self.requests.append((method, url.path))
+        status, payload = self.route(method, url.path, parse_qs(url.query), body)
+
+        writer.write(
+            f"HTTP/1.1 {status} X\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+        writer.close()
+
+
+@asynccontextmanager
+async def fake_docker():
+    daemon = FakeDockerDaemon()
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "docker.sock")
+        server = await asyncio.start_unix_server(daemon.handle, path=socket_path)
+        async with server, AsyncDockerClient(f"unix://{socket_path}") as client:
+            yield daemon, client
+
+
+class AsyncDockerClientTestCase(SimpleTestCase):
+
+    async def test_ping(self):
+        async with fake_docker() as (_, client):
+            self.assertTrue(await client.ping())
+
+    async def test_container_lifecycle(self):
+        async with fake_docker() as (daemon, client):
+            container = await aio.start_container(
+                client,
+                "nginx:latest",
+                "web",
+                ports={"80/tcp": 49152},
+                environment={"A": "1"},
+                restart_policy={"Name": "always"},
+                limits={"mem_limit": 512 * 1024 * 1024, "pids_limit": 256},
+            )
+            self.assertEqual(container["State"]["Status"], "running")
+
+            config = daemon.containers["web"]["config"]
+            self.assertEqual(config["Env"], ["A=1"])
+            self.assertEqual(
+                config["HostConfig"]["PortBindings"],
+                {"80/tcp": [{"HostPort": "49152"}]},
+            )
+            self.assertEqual(config["HostConfig"]["Memory"], 512 * 1024 * 1024)
+            self.assertEqual(config["HostConfig"]["PidsLimit"], 256)
+
+            await aio.stop_container(client, "web")
+            inspected = await client.inspect_container("web")
+            self.assertEqual(inspected["State"]["Status"], "exited")
+
+    async def test_missing_container_raises_not_found(self):
+        async with fake_docker() as (_, client):
+            with self.assertRaises(NotFound):
+                await client.inspect_container("missing")
+
+    async def test_streams(self):
+        async with fake_docker() as (daemon, client):
+            await aio.start_container(client, "nginx", "web")
+
+            stats = [s async for s in aio.container_stats(client, "web")]
+            self.assertEqual([s["read"] for s in stats], ["1", "2"])
+
+            logs = await aio.container_logs(client, "web")
+            self.assertEqual(logs, b"hello\noops\n")
+
+            events = [e["Action"] async for e in client.events()]
+            self.assertEqual(events, ["start", "die"])
+
+            await aio.pull_image(client, "nginx")
+            self.assertIn(("POST", "/images/create"), daemon.requests)
@@ -0,0 +1,80 @@
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance
+from apps.hosts.models import DockerHost
+from core.utils.budgets import BudgetExceededError, check_budget
+
+
+class BudgetTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="pw")
+        self.user.groups.add(Group.objects.get(name="user"))
+        self.user.profile.memory_budget = 1024
+        self.user.profile.cpu_budget = 1.5
+        self.user.profile.save()
+        self.module = Module.objects.create(
+            name="Wiki",
+            image_name="wiki:2",
+            memory_limit=512,
+            cpu_limit=0.5,
+            pids_limit=128,
+            blkio_weight=300,
+        )
+
+    def deploy(self, name, status="running"):
+        instance = Instance.for_module(
+            self.module, name=name, owner=self.user, status=status
+        )
+        instance.save()
+        return instance
+
+    def test_instances_copy_module_limits_as_container_arguments(self):
+        self.assertEqual(
+            self.deploy("wiki").container_limits(),
+            {
+                "mem_limit": 512 * 1024 * 1024,
+                "nano_cpus": 500_000_000,
+                "pids_limit": 128,
+                "blkio_weight": 300,
+            },
+        )
+        self.assertEqual(Instance(name="plain").container_limits(), {})
+
+    def test_budget_counts_limits_of_all_but_failed_instances(self):
+        self.deploy("wiki1")
+        self.deploy("wiki2", status="failed")
+
+        with self.assertNumQueries(2):
+            check_budget(self.user, self.module)
+
+        self.deploy("wiki3", status="paused")
+        with self.assertRaisesMessage(BudgetExceededError, "1536 of 1024 MiB"):
+            check_budget(self.user, self.module)
+
+    def test_modules_without_limits_cannot_be_deployed_under_a_budget(self):
+        unlimited = Module.objects.create(name="Shell", image_name="alpine")
+
+        with self.assertRaisesMessage(BudgetExceededError, "sets no limit"):
+            check_budget(self.user, unlimited)
+
+        self.user.profile.memory_budget = self.user.profile.cpu_budget = None
+        self.user.profile.save()
+        check_budget(self.user, unlimited)
+
+    def test_deploy_is_refused_before_placing_the_instance(self):
+        self.deploy("wiki1")
+        self.deploy("wiki2")
+        DockerHost.objects.create(name="Server1", active=True)
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            reverse("deployments:deploy-instance", args=[self.module.slug]),
+            {"name": "wiki3"},
+        )
+
+        self.assertContains(response, "Budget exceeded")
+        self.assertEqual(Instance.objects.count(), 2)
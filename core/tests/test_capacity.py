@@ -0,0 +1,170 @@
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from apps.catalog.models import Module
+from apps.deployments.jobs import enqueue_job, run_job
+from apps.deployments.models import Instance, Job
+from apps.hosts.models import DockerHost
+from core.docker.capacity import (
+    NoCapacityError,
+    admission_status,
+    requested_resources,
+    reserved_resources,
+)
+from core.docker.deploy import unpause_instance
+from core.docker.scheduler import NoHostAvailableError
+
+INFO = {"NCPU": 2, "MemTotal": 4608 * 1024 * 1024}
+
+
+@override_settings(
+    HOST_RESERVED_MEMORY_MIB=512,
+    HOST_MEMORY_OVERCOMMIT=1,
+    HOST_CPU_OVERCOMMIT=1,
+    ADMISSION_DEFAULT_MEMORY_MIB=256,
+    ADMISSION_DEFAULT_CPU=0.25,
+    ADMISSION_POLICY="queue",
+)
+class AdmissionTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+        self.owner = User.objects.create(username="alice")
+        self.module = Module.objects.create(
+            name="Wiki", image_name="wiki:2", memory_limit=1024, cpu_limit=0.5
+        )
+        for patcher in [
+            patch("core.docker.capacity.client_pool.info", return_value=INFO),
+            patch("core.docker.client.DockerClientPool.get", return_value=MagicMock()),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def create(self, name, status, module=None):
+        instance = Instance.for_module(
+            module or self.module,
+            name=name,
+            owner=self.owner,
+            host=self.host,
+            status=status,
+        )
+        instance.save()
+        return instance
+
+    def test_ledger_counts_limits_of_instances_holding_resources(self):
+        plain = Module.objects.create(name="Shell", image_name="alpine")
+        self.create("wiki1", "running")
+        self.create("shell", "pending", module=plain)
+        self.create("wiki2", "paused")
+        self.create("wiki3", "queued")
+
+        self.assertEqual(
+            reserved_resources([self.host]),
+            {self.host.pk: {"memory": 1280, "cpu": 0.75}},
+        )
+
+    def test_instances_beyond_capacity_are_queued_or_rejected(self):
+        requested = requested_resources(self.module)
+        self.assertEqual(admission_status(self.host, requested, 4), "pending")
+        self.assertEqual(admission_status(self.host, requested, 5), "queued")
+
+        with self.settings(ADMISSION_POLICY="reject"):
+            with self.assertRaises(NoCapacityError):
+                admission_status(self.host, requested, 5)
+
+    def test_queued_deploys_wait_without_using_up_attempts(self):
+        for i in range(4):
+            self.create(f"wiki{i}", "running")
+        queued = self.create("late", "queued")
+        job = enqueue_job("deploy", queued.pk)
+        job.attempts = 1
+        job.save()
+
+        with patch("core.docker.deploy.get_image") as get_image:
+            run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("queued", 0))
+        self.assertIn("Waiting for capacity", job.last_error)
+        get_image.assert_not_called()
+
+        Instance.objects.filter(name="wiki0").update(status="paused")
+        job.attempts = 1
+        job.save()
+        with patch("core.docker.deploy.get_image", side_effect=RuntimeError("stop")):
+            run_job(job)
+
+        self.assertEqual(
+            list(
+                queued.status_changes.order_by("changed_at").values_list(
+                    "new_status", flat=True
+                )
+            ),
+            ["pending", "queued"],
+        )
+
+    def test_retries_after_a_failed_attempt_are_admitted_again(self):
+        queued = self.create("late", "queued")
+        job = enqueue_job("deploy", queued.pk)
+        job.attempts = 1
+        job.save()
+        with patch("core.docker.deploy.get_image", side_effect=RuntimeError("stop")):
+            run_job(job)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "queued")
+
+        for i in range(4):
+            self.create(f"wiki{i}", "running")
+        job.refresh_from_db()
+        job.attempts += 1
+        job.save()
+        with (
+            patch("core.docker.deploy.get_image") as get_image,
+            patch("core.docker.deploy.start_container") as start_container,
+        ):
+            run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertIn("Waiting for capacity", job.last_error)
+        get_image.assert_not_called()
+        start_container.assert_not_called()
+
+        Instance.objects.filter(name__startswith="wiki").update(status="paused")
+        job.attempts = job.max_attempts
+        job.save()
+        with patch("core.docker.deploy.get_image", side_effect=RuntimeError("stop")):
+            run_job(job)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "failed")
+
+    def test_unpause_holds_resources_before_the_container_starts(self):
+        for i in range(3):
+            self.create(f"wiki{i}", "running")
+        paused = self.create("paused", "paused")
+        late = self.create("late", "paused")
+
+        unpause_instance(paused.pk)
+        with self.assertRaises(NoCapacityError):
+            unpause_instance(late.pk)
+
+        self.assertEqual(
+            list(
+                paused.status_changes.order_by("changed_at").values_list(
+                    "new_status", flat=True
+                )
+            ),
+            ["pending", "running"],
+        )
+        late.refresh_from_db()
+        self.assertEqual(late.status, "paused")
+
+    def test_unpause_without_active_host_fails_cleanly(self):
+        paused = self.create("paused", "paused")
+        Instance.objects.filter(pk=paused.pk).update(host=None)
+        DockerHost.objects.update(active=False)
+
+        with self.assertRaises(NoHostAvailableError):
+            unpause_instance(paused.pk)
@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance
+from core.utils.counters import adjust_counter, get_counter, user_counter
+
+
+# Counters are cached; keep them out of the shared file cache.
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "counters-tests",
+        }
+    }
+)
+class CountersTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create(username="alice")
+        self.module = Module.objects.create(name="Nginx", image_name="nginx:1.27")
+
+    def counts(self):
+        return (
+            get_counter("instances", Instance.objects.count),
+            get_counter(
+                user_counter(self.owner.pk),
+                Instance.objects.filter(owner=self.owner).count,
+            ),
+            get_counter("modules", Module.objects.count),
+        )
+
+    def test_counters_follow_saves_and_deletes_without_recounting(self):
+        self.assertEqual(self.counts(), (0, 0, 1))
+
+        with self.assertNumQueries(1):
+            instance = Instance.objects.create(
+                name="web", slug="web", owner=self.owner, module=self.module
+            )
+            self.assertEqual(self.counts(), (1, 1, 1))
+
+        instance.delete()
+        Module.objects.create(name="Redis", image_name="redis:7")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.counts(), (0, 0, 2))
+
+    @override_settings(COUNTER_RECOUNT_INTERVAL=60)
+    @patch("core.utils.counters.time")
+    def test_adjustments_do_not_postpone_the_recount(self, time):
+        time.time.return_value = 1000
+        self.assertEqual(get_counter("modules", lambda: 1), 1)
+
+        time.time.return_value = 1059
+        adjust_counter("modules", 1)
+        self.assertEqual(get_counter("modules", lambda: 1), 2)
+
+        time.time.return_value = 1060
+        self.assertEqual(get_counter("modules", lambda: 1), 1)
@@ -0,0 +1,54 @@
+import time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apps.hosts.models import DockerHost
+from core.docker.events import watch_all_hosts
+
+
+class Rounds:
+    """Stop event that runs one callback per refresh, then stops."""
+
+    def __init__(self, *between):
+        self.between = list(between)
+
+    def is_set(self):
+        return not self.between
+
+    def wait(self, timeout):
+        self.between.pop(0)()
+
+
+class WatchAllHostsTestCase(TestCase):
+
+    def setUp(self):
+        self.first = DockerHost.objects.create(name="Server1", active=True)
+        self.second = DockerHost.objects.create(name="Server2", active=True)
+        self.stop_events = {}
+
+        def watch(callback, stop_event, host=None):
+            self.stop_events[host.name] = stop_event
+            stop_event.wait(5)
+
+        patcher = patch("core.docker.events.watch_container_events", watch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_watchers_of_deactivated_hosts_are_stopped(self):
+        stopped = []
+
+        def deactivate():
+            while len(self.stop_events) < 2:
+                time.sleep(0.01)
+            DockerHost.objects.filter(pk=self.second.pk).update(active=False)
+
+        def check():
+            stopped.extend(
+                name for name, event in self.stop_events.items() if event.is_set()
+            )
+
+        watch_all_hosts(lambda host, event: None, Rounds(deactivate, check))
+
+        self.assertEqual(stopped, ["Server2"])
+        self.assertTrue(self.stop_events["Server1"].is_set())
@@ -0,0 +1,80 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+from docker.errors import ImageNotFound
+
+from core.docker.images import ImagePullCoordinator, PullProgress
+
+PARTIAL = {"current": 5, "total": 20}
+
+
+def fake_client(present=False):
+    client = MagicMock()
+    client.api.base_url = "http+docker://localhost"
+    if not present:
+        client.images.get.side_effect = ImageNotFound("missing")
+
+    def pull(repository, tag, stream, decode):
+        time.sleep(0.05)
+        client.images.get.side_effect = None
+        yield {"status": "Downloading", "id": "l1", "progressDetail": PARTIAL}
+        yield {"status": "Pull complete", "id": "l1"}
+
+    client.api.pull.side_effect = pull
+    return client
+
+
+class ImagePullCoordinatorTestCase(SimpleTestCase):
+
+    def test_concurrent_pulls_of_one_image_are_shared(self):
+        client = fake_client()
+        puller = ImagePullCoordinator()
+
+        updates = []
+        threads = [
+            threading.Thread(
+                target=puller.ensure_image,
+                args=(client, "nginx:1.27", "auto", updates.append),
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        client.api.pull.assert_called_once()
+        self.assertEqual(updates[-1]["percent"], 100.0)
+        self.assertEqual(len(puller.pull_durations), 1)
+        self.assertFalse(puller.ensure_image(client, "nginx:1.27"))
+
+    def test_policy(self):
+        client = fake_client(present=True)
+        puller = ImagePullCoordinator()
+
+        self.assertFalse(puller.needs_pull(client, "nginx:1.27", "auto"))
+        self.assertTrue(puller.needs_pull(client, "nginx:latest", "auto"))
+        self.assertTrue(puller.needs_pull(client, "nginx", "auto"))
+        self.assertFalse(puller.needs_pull(client, "nginx", "if-not-present"))
+        self.assertTrue(puller.needs_pull(client, "nginx:1.27", "always"))
+
+
+class PullProgressTestCase(SimpleTestCase):
+
+    def test_layers_are_aggregated(self):
+        progress = PullProgress()
+        for message in [
+            {"status": "Pulling from library/nginx", "id": "1.27"},
+            {"status": "Pulling fs layer", "id": "l1"},
+            {"status": "Already exists", "id": "l2"},
+            {"status": "Downloading", "id": "l1", "progressDetail": PARTIAL},
+            {"status": "Digest: sha256:abc"},
+        ]:
+            progress.update(message)
+
+        self.assertEqual(
+            progress.summary(),
+            {"layers": 2, "finished": 1, "current": 5, "total": 20, "percent": 25.0},
+        )
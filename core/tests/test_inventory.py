@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from core.docker.inventory import ContainerInventory
+
+
+def container_event(action, name, container_id):
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {"ID": container_id, "Attributes": {"name": name}},
+    }
+
+
+class ContainerInventoryTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.api.containers.return_value = [
+            {
+                "Id": "abc",
+                "Names": ["/web"],
+                "State": "running",
+                "Ports": [{"PrivatePort": 80, "PublicPort": 50000}],
+            },
+            {"Id": "def", "Names": ["/db"], "State": "exited", "Ports": []},
+        ]
+        patcher = patch("core.docker.client._client", self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.inventory = ContainerInventory(max_age=60)
+
+    def test_lookups_share_one_listing(self):
+        self.assertEqual(self.inventory.status("web"), "running")
+        self.assertEqual(self.inventory.status("def"), "exited")
+        self.assertIsNone(self.inventory.status("missing"))
+        self.assertEqual(self.inventory.published_ports(), {50000})
+
+        self.client.api.containers.assert_called_once_with(all=True)
+
+    def test_events_update_the_snapshot(self):
+        self.inventory.refresh()
+        self.inventory.apply_event(container_event("pause", "web", "abc"))
+        self.inventory.apply_event(container_event("destroy", "db", "def"))
+
+        self.assertEqual(self.inventory.status("web"), "paused")
+        self.assertIsNone(self.inventory.get("db"))
+        self.assertEqual(self.client.api.containers.call_count, 1)
+
+    def test_events_of_unknown_containers_force_a_refresh(self):
+        self.inventory.refresh()
+        self.inventory.apply_event(container_event("create", "new", "ghi"))
+        self.inventory.status("web")
+
+        self.assertEqual(self.client.api.containers.call_count, 2)
+
+    def test_new_containers_are_added_without_a_full_listing(self):
+        self.inventory.refresh()
+        self.client.api.containers.return_value = [
+            {"Id": "ghi", "Names": ["/new"], "State": "running", "Ports": []}
+        ]
+        self.inventory.refresh_container("ghi")
+
+        self.client.api.containers.assert_called_with(all=True, filters={"id": "ghi"})
+
+        self.assertEqual(self.inventory.status("ghi"), "running")
+        self.assertEqual(self.inventory.published_ports(), {50000})
+        self.assertEqual(self.client.api.containers.call_count, 2)
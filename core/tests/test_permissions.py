@@ -0,0 +1,29 @@
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.test import TestCase
+
+from core.utils.permissions_check import (
+    get_capabilities,
+    user_can_administrate,
+    user_can_deploy,
+    user_can_edit,
+)
+
+
+class CapabilitiesTestCase(TestCase):
+
+    def test_group_names_are_loaded_once_per_user(self):
+        user = User.objects.create_user(username="normalo")
+        user.groups.add(Group.objects.get(name="user"))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(user_can_deploy(user))
+            self.assertFalse(user_can_edit(user))
+            self.assertFalse(user_can_administrate(user))
+            self.assertIs(get_capabilities(user), get_capabilities(user))
+
+    def test_anonymous_users_may_do_nothing(self):
+        with self.assertNumQueries(0):
+            capabilities = get_capabilities(AnonymousUser())
+
+        self.assertFalse(capabilities.can_deploy)
+        self.assertFalse(capabilities.is_admin)
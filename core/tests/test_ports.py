@@ -0,0 +1,67 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance
+from apps.hosts.models import DockerHost, PortReservation
+from core.docker.ports import NoFreePortError, reconcile_ports, reserve_port
+
+
+@override_settings(
+    HOST_PORT_RANGE_START=50000, HOST_PORT_RANGE_END=50002, HOST_PORT_RANDOM_ATTEMPTS=2
+)
+class PortAllocatorTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+        owner = User.objects.create(username="alice")
+        module = Module.objects.create(name="Nginx", image_name="nginx:1.27")
+        self.instances = [
+            Instance.objects.create(name=f"web{i}", owner=owner, module=module)
+            for i in range(4)
+        ]
+
+    def test_reserves_distinct_ports_until_the_range_is_exhausted(self):
+        ports = {reserve_port(instance) for instance in self.instances[:3]}
+
+        self.assertEqual(ports, {50000, 50001, 50002})
+        self.assertEqual(
+            set(Instance.objects.values_list("host_port", flat=True)) - {None}, ports
+        )
+        with self.assertRaises(NoFreePortError):
+            reserve_port(self.instances[3])
+
+    def test_no_active_host_raises_no_free_port(self):
+        DockerHost.objects.update(active=False)
+
+        with self.assertRaises(NoFreePortError):
+            reserve_port(self.instances[0])
+
+    def test_destroying_an_instance_releases_its_port(self):
+        port = reserve_port(self.instances[0])
+        self.instances[0].delete()
+
+        self.assertFalse(PortReservation.objects.filter(port=port).exists())
+
+    def test_reconcile_reserves_foreign_ports_and_releases_stale_ones(self):
+        PortReservation.objects.create(
+            host=self.host,
+            port=50001,
+            reserved_at=timezone.now() - timedelta(hours=1),
+        )
+        client = MagicMock()
+        client.api.containers.return_value = [
+            {"Id": "c1", "Ports": [{"PrivatePort": 80, "PublicPort": 50002}]},
+            {"Id": "c2", "Ports": [{"PrivatePort": 22}]},
+        ]
+
+        with patch("core.docker.client.DockerClientPool.get", return_value=client):
+            self.assertEqual(reconcile_ports(), {"added": 1, "released": 1})
+
+        self.assertEqual(
+            list(PortReservation.objects.values_list("port", flat=True)), [50002]
+        )
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance, InstanceMetric
+from apps.hosts.models import DockerHost
+from core.docker.scheduler import NoHostAvailableError, pick_host
+
+INFO = {"NCPU": 4, "MemTotal": 8 * 1024**3}
+
+
+class PickHostTestCase(TestCase):
+
+    def setUp(self):
+        self.busy = DockerHost.objects.create(name="busy", active=True)
+        self.idle = DockerHost.objects.create(name="idle", active=True)
+        DockerHost.objects.create(name="off", active=False)
+
+        owner = User.objects.create(username="alice")
+        module = Module.objects.create(name="Nginx", image_name="nginx:1.27")
+        instance = Instance.objects.create(
+            name="web", owner=owner, module=module, host=self.busy, status="running"
+        )
+        InstanceMetric.objects.create(
+            instance=instance,
+            timestamp=timezone.now(),
+            cpu_percent=300,
+            memory_mib=1024,
+        )
+
+        self.healthy = {self.busy.pk, self.idle.pk}
+        for name, side_effect in [
+            ("is_healthy", lambda host: host.pk in self.healthy),
+            ("info", lambda host: INFO),
+        ]:
+            patcher = patch(
+                f"core.docker.scheduler.client_pool.{name}", side_effect=side_effect
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_prefers_the_host_with_most_headroom(self):
+        self.assertEqual(pick_host(), self.idle)
+
+    def test_skips_unreachable_hosts(self):
+        self.healthy = {self.busy.pk}
+        self.assertEqual(pick_host(), self.busy)
+
+        self.healthy = set()
+        with self.assertRaises(NoHostAvailableError):
+            pick_host()
+
+    def test_prefers_hosts_with_room_in_their_ledger(self):
+        Instance.objects.create(
+            name="db",
+            owner=User.objects.get(username="alice"),
+            module=Module.objects.get(name="Nginx"),
+            host=self.idle,
+            status="running",
+            memory_limit=7 * 1024,
+        )
+
+        self.assertEqual(pick_host({"memory": 1024, "cpu": 1}), self.busy)
+        self.assertEqual(pick_host({"memory": 64 * 1024, "cpu": 1}), self.idle)
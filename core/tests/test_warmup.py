@@ -0,0 +1,110 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.catalog.models import Module
+from apps.deployments.models import Instance, Job
+from apps.hosts.models import CachedImage, DockerHost
+from core.docker.deploy import deploy_instance
+from core.docker.warmup import (
+    evict_images,
+    normalize_image_name,
+    schedule_image_warmup,
+)
+
+MIB = 1024 * 1024
+
+
+class NormalizeImageNameTestCase(TestCase):
+
+    def test_untagged_images_default_to_latest(self):
+        self.assertEqual(normalize_image_name("nginx"), "nginx:latest")
+        self.assertEqual(normalize_image_name("nginx:1.27"), "nginx:1.27")
+
+
+class EvictImagesTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(
+            name="local", base_url="unix://var/run/docker.sock", active=True
+        )
+        now = timezone.now()
+        for age, image_name in enumerate(["new:1", "used:1", "old:1"]):
+            CachedImage.objects.create(
+                host=self.host,
+                image_name=image_name,
+                last_used_at=now - timedelta(days=age),
+            )
+
+        self.client = MagicMock()
+        self.client.api.images.return_value = [
+            {"Id": "sha256:new", "RepoTags": ["new:1"], "Size": 100 * MIB},
+            {"Id": "sha256:used", "RepoTags": ["used:1"], "Size": 100 * MIB},
+            {"Id": "sha256:old", "RepoTags": ["old:1"], "Size": 100 * MIB},
+            {"Id": "sha256:foreign", "RepoTags": ["foreign:1"], "Size": 900 * MIB},
+        ]
+        self.client.api.containers.return_value = [
+            {"Id": "c1", "Names": ["/web"], "ImageID": "sha256:used"}
+        ]
+
+    def patch_client(self):
+        return patch(
+            "core.docker.client.DockerClientPool.get", return_value=self.client
+        )
+
+    @override_settings(IMAGE_CACHE_BUDGET_MB=150)
+    def test_evicts_least_recently_used_images_not_in_use(self):
+        with self.patch_client():
+            evicted = evict_images(self.host)
+
+        self.assertEqual(evicted, ["old:1", "new:1"])
+        self.assertEqual(
+            list(CachedImage.objects.values_list("image_name", flat=True)),
+            ["used:1"],
+        )
+
+    @override_settings(IMAGE_CACHE_BUDGET_MB=0)
+    def test_unlimited_budget_evicts_nothing(self):
+        with self.patch_client():
+            self.assertEqual(evict_images(self.host), [])
+        self.client.api.remove_image.assert_not_called()
+
+
+class ImageWarmupTestCase(TestCase):
+
+    def setUp(self):
+        self.host = DockerHost.objects.create(name="Server1", active=True)
+        owner = User.objects.create(username="alice")
+        module = Module.objects.create(name="Nginx", image_name="nginx:1.27")
+        self.instance = Instance.objects.create(
+            name="web", owner=owner, module=module, host=self.host
+        )
+
+    def test_hosts_already_warming_an_image_are_skipped(self):
+        # Creating the module queued a warm job already.
+        schedule_image_warmup()
+        self.assertEqual(Job.objects.filter(action="warm").count(), 1)
+
+        Job.objects.update(status="done")
+        schedule_image_warmup()
+        self.assertEqual(Job.objects.filter(action="warm", status="queued").count(), 1)
+
+    def test_deploy_evicts_images_after_a_pull(self):
+        for pulled in (False, True):
+            with (
+                patch("core.docker.client.DockerClientPool.get"),
+                patch(
+                    "core.docker.deploy.image_puller.ensure_image",
+                    return_value=pulled,
+                ),
+                patch("core.docker.deploy.record_image_use"),
+                patch("core.docker.deploy.start_container"),
+                patch("core.docker.deploy.update_instance_status"),
+                patch("core.docker.deploy.evict_images") as evict,
+            ):
+                deploy_instance(self.instance.pk)
+
+            self.assertEqual(evict.call_count, int(pulled))
@@ -0,0 +1,54 @@
+from django.db.models import Sum
+
+from apps.deployments.models import Instance
+from apps.users.models import UserProfile
+
+# Budget field of the profile, limit field of modules and instances, unit.
+BUDGETS = [
+    ("memory_budget", "memory_limit", "MiB memory"),
+    ("cpu_budget", "cpu_limit", "CPU cores"),
+]
+
+
+class BudgetExceededError(Exception):
+    pass
+
+
+def check_budget(user, module, count: int = 1):
+    """
+    Make sure ``count`` more instances of ``module`` fit into the user's
+    budgets, raising ``BudgetExceededError`` otherwise.
+
+    Usage is the sum of the limits of the user's instances, taken in a
+    single query. Under a budget, modules must define the limit it is
+    counted in. Call it in the transaction creating the instances: the
+    profile row is locked, so concurrent deploys of a user queue up.
+    """
+    profile = UserProfile.objects.select_for_update().filter(user=user).first()
+    if profile is None:
+        return
+
+    budgets = [
+        (getattr(profile, budget), limit, unit)
+        for budget, limit, unit in BUDGETS
+        if getattr(profile, budget) is not None
+    ]
+    if not budgets:
+        return
+
+    used = (
+        Instance.objects.filter(owner=user)
+        .exclude(status="failed")
+        .aggregate(**{limit: Sum(limit) for _, limit, _ in budgets})
+    )
+    for budget, limit, unit in budgets:
+        requested = getattr(module, limit)
+        if requested is None:
+            raise BudgetExceededError(
+                f"{module.name} sets no limit on {unit}, which your budget requires"
+            )
+        total = (used[limit] or 0) + requested * count
+        if total > budget:
+            raise BudgetExceededError(
+                f"Budget exceeded: {total:g} of {budget:g} {unit} would be in use"
+            )
@@ -6,6 +6,7 @@ restart_choices = [
 ]
 
 STATUS_CHOICES = [
+    ("queued", "Queued"),
     ("pending", "Pending"),
     ("running", "Running"),
     ("paused", "Paused"),
@@ -14,3 +15,20 @@ STATUS_CHOICES = [
     ("destroyed", "Destroyed"),
     ("failed", "Failed"),
 ]
+
+JOB_ACTION_CHOICES = [
+    ("deploy", "Deploy"),
+    ("pause", "Pause"),
+    ("unpause", "Unpause"),
+    ("destroy", "Destroy"),
+    ("warm", "Warm image"),
+    ("bulk", "Bulk action"),
+    ("batch", "Batch deploy"),
+]
+
+JOB_STATUS_CHOICES = [
+    ("queued", "Queued"),
+    ("running", "Running"),
+    ("done", "Done"),
+    ("failed", "Failed"),
+]
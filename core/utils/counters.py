@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _key(name: str) -> str:
+    return f"counters:{name}"
+
+
+def _recounted_key(name: str) -> str:
+    return f"counters:{name}:recounted_at"
+
+
+def user_counter(user_id) -> str:
+    return f"instances:owner:{user_id}"
+
+
+def get_counter(name: str, recount) -> int:
+    """
+    Cached value of a counter, recounted with ``recount()`` if it is missing
+    or was last counted ``COUNTER_RECOUNT_INTERVAL`` seconds ago, so drift
+    from changes that bypass signals (e.g. bulk inserts) is repaired.
+
+    The time of the last count has its own key: adjustments rewrite the
+    counter entry, which would otherwise push its expiry out indefinitely.
+    """
+    cached = cache.get_many([_key(name), _recounted_key(name)])
+    value = cached.get(_key(name))
+    recounted_at = cached.get(_recounted_key(name))
+    if (
+        value is None
+        or recounted_at is None
+        or time.time() - recounted_at >= settings.COUNTER_RECOUNT_INTERVAL
+    ):
+        value = recount()
+        cache.set_many({_key(name): value, _recounted_key(name): time.time()}, None)
+    return value
+
+
+def adjust_counter(name: str, delta: int):
+    """Apply a change to a cached counter; missing counters are recounted later."""
+    try:
+        cache.incr(_key(name), delta)
+    except ValueError:
+        pass
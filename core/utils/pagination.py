@@ -0,0 +1,43 @@
+import base64
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj) -> str:
+    """Opaque cursor pointing behind ``obj`` in (-created_at, -id) order."""
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID] | None:
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, cursor: str | None, page_size: int):
+    """
+    One page of ``queryset`` in (-created_at, -id) order, starting behind
+    ``cursor``.
+
+    Unlike OFFSET pagination every page costs the same index range scan,
+    however deep it is. Returns the objects and the cursor of the next page,
+    or None on the last page.
+    """
+    queryset = queryset.order_by("-created_at", "-id")
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    objects = list(queryset[: page_size + 1])
+    if len(objects) <= page_size:
+        return objects, None
+    objects = objects[:page_size]
+    return objects, encode_cursor(objects[-1])
@@ -1,10 +1,43 @@
+class Capabilities:
+    """
+    What a user may do, derived from a single query of their group names.
+
+    Use ``get_capabilities`` to get the instance memoized on the user, so
+    context processors, views and consumers of one request share it.
+    """
+
+    def __init__(self, user):
+        self.is_authenticated = user.is_authenticated
+        self.group_names = (
+            set(user.groups.values_list("name", flat=True))
+            if self.is_authenticated
+            else set()
+        )
+
+        self.is_admin = self.is_authenticated and user.is_superuser
+        self.is_editor = "editor" in self.group_names
+        self.is_user = "user" in self.group_names
+
+        self.can_deploy = self.is_admin or self.is_editor or self.is_user
+        self.can_edit = self.is_admin or self.is_editor
+        self.can_administrate = self.is_admin or self.is_editor
+
+
+def get_capabilities(user) -> Capabilities:
+    capabilities = getattr(user, "_capabilities", None)
+    if capabilities is None:
+        capabilities = Capabilities(user)
+        user._capabilities = capabilities
+    return capabilities
+
+
 def user_can_deploy(user):
-    return user.is_superuser or user.groups.filter(name__in=["user", "editor"]).exists()
+    return get_capabilities(user).can_deploy
 
 
 def user_can_edit(user):
-    return user.is_superuser or user.groups.filter(name="editor").exists()
+    return get_capabilities(user).can_edit
 
 
 def user_can_administrate(user):
-    return user.is_superuser or user.groups.filter(name="editor").exists()
+    return get_capabilities(user).can_administrate